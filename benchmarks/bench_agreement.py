@@ -0,0 +1,70 @@
+"""
+Compare a pandas resampling loop with the vectorized bootstrap engine, serial and over a process pool
+
+Usage: python -m benchmarks.bench_agreement --proposals 2000 --variants 4 --resamples 2000
+"""
+
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from src.agreement import agreement_statistics, analyze_agreement, VOTE_ORDER
+
+def pandas_bootstrap(llm_votes: np.ndarray, human_votes: np.ndarray, resamples: int, seed: int = 0) -> np.ndarray:
+    """The straightforward approach: resample rows and recompute agreement with pandas each time"""
+    df = pd.DataFrame({'llm': llm_votes, 'human': human_votes})
+    return np.array([
+        (sample['llm'] == sample['human']).mean()
+        for sample in (df.sample(frac=1, replace=True, random_state=seed + i) for i in range(resamples))
+    ])
+
+def make_inputs(proposals: int, variants: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    human = rng.integers(0, len(VOTE_ORDER), proposals)
+    counts = rng.multinomial(5, [0.05, 0.15, 0.6, 0.2], size=proposals)
+    counts[np.arange(proposals), human] += 3
+    merged_df = pd.DataFrame({'id': np.arange(proposals).astype(str), 'vote_most_common_vote': np.array(VOTE_ORDER)[human]})
+    for i, vote in enumerate(VOTE_ORDER):
+        merged_df[f'vote_counts_{vote}'] = counts[:, i]
+    long_df = pd.concat([
+        pd.DataFrame({'proposal_id': merged_df['id'], 'vote': rng.choice(VOTE_ORDER, proposals), 'variant': f'v{v}'})
+        for v in range(variants)
+    ], ignore_index=True)
+    long_df['variant'] = long_df['variant'].astype('category')
+    return merged_df, long_df, human, counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bootstrap agreement statistics")
+    parser.add_argument("--proposals", type=int, default=2000, help="Number of synthetic proposals")
+    parser.add_argument("--variants", type=int, default=4, help="Number of LLM variants")
+    parser.add_argument("--resamples", type=int, default=2000, help="Bootstrap resamples")
+    parser.add_argument("--workers", type=int, default=4, help="Processes for the pooled run")
+    args = parser.parse_args()
+    
+    merged_df, long_df, human, counts = make_inputs(args.proposals, args.variants)
+    llm = np.random.default_rng(1).integers(0, len(VOTE_ORDER), args.proposals)
+    
+    sample = min(args.resamples, 200)
+    start_time = time.perf_counter()
+    pandas_bootstrap(llm, human, sample)
+    pandas_time = (time.perf_counter() - start_time) / sample * args.resamples * args.variants
+    
+    start_time = time.perf_counter()
+    agreement_statistics(llm, human, counts, resamples=args.resamples)
+    single_time = time.perf_counter() - start_time
+    
+    timings = {}
+    for workers in (1, args.workers):
+        start_time = time.perf_counter()
+        analyze_agreement(merged_df, long_df, resamples=args.resamples, workers=workers)
+        timings[workers] = time.perf_counter() - start_time
+    
+    print(f"pandas loop (agreement only, extrapolated) {pandas_time:8.2f}s")
+    print(f"numpy engine, one variant (all six statistics) {single_time:8.3f}s")
+    for workers, elapsed in timings.items():
+        print(f"numpy engine, {args.variants} variants, workers={workers:<3} {elapsed:8.3f}s")
+
+if __name__ == "__main__":
+    main()
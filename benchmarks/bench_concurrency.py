@@ -0,0 +1,34 @@
+"""
+Benchmark the async review engine against a fake chain with injected latency
+
+Usage: python -m benchmarks.bench_concurrency --proposals 200 --latency 0.2
+"""
+
+import time
+import argparse
+
+from src.fake_llm import FakeReviewChain
+from src.llm_review import process_proposals
+from benchmarks.synthetic import make_proposals
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark review concurrency with a fake chain")
+    parser.add_argument("--proposals", type=int, default=200, help="Number of synthetic proposals")
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake LLM latency in seconds")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64], help="Concurrency levels to measure")
+    args = parser.parse_args()
+    
+    proposal_df = make_proposals(args.proposals)
+    
+    for concurrency in args.concurrency:
+        chain = FakeReviewChain(latency=args.latency, jitter=args.latency / 2, seed=0)
+        start_time = time.perf_counter()
+        results = process_proposals(proposal_df, chain, sleep_time=0, concurrency=concurrency)
+        wall_time = time.perf_counter() - start_time
+        
+        in_order = [r['proposal_id'] for r in results] == list(proposal_df.id)
+        print(f"concurrency={concurrency:<4} wall={wall_time:7.2f}s "
+              f"throughput={len(results) / wall_time:8.1f} proposals/s in_order={in_order}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Time near-duplicate detection and check recall on synthetic resubmissions
+
+Usage: python -m benchmarks.bench_dedup --proposals 1000 10000
+"""
+
+import time
+import random
+import string
+import argparse
+
+from src.dedup import find_near_duplicates
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+
+def make_texts(n: int, duplicate_rate: float, seed: int = 0):
+    """Random proposal texts where a share are lightly edited copies of an earlier one"""
+    rng = random.Random(seed)
+    texts, expected = {}, {}
+    for i in range(n):
+        if i and rng.random() < duplicate_rate:
+            source = rng.randrange(i)
+            while str(source) in expected:
+                source = rng.randrange(i)
+            words = texts[str(source)].split()
+            words[rng.randrange(len(words))] = _word(rng)
+            texts[str(i)] = " ".join(words)
+            expected[str(i)] = str(source)
+        else:
+            texts[str(i)] = " ".join(_word(rng) for _ in range(300))
+    return texts, expected
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MinHash/LSH near-duplicate detection")
+    parser.add_argument("--proposals", type=int, nargs="+", default=[1000, 10000], help="Synthetic corpus sizes")
+    parser.add_argument("--duplicate-rate", type=float, default=0.1, help="Share of proposals that are edited copies")
+    args = parser.parse_args()
+    
+    for n in args.proposals:
+        texts, expected = make_texts(n, args.duplicate_rate)
+        start_time = time.perf_counter()
+        matches = find_near_duplicates(texts)
+        elapsed = time.perf_counter() - start_time
+        
+        found = sum(matches.get(key, (None,))[0] == source for key, source in expected.items())
+        false_positives = sum(key not in expected for key in matches)
+        print(f"proposals={n:<7} time={elapsed:7.2f}s per_proposal={elapsed / n * 1000:6.2f}ms "
+              f"recall={found / max(1, len(expected)):6.1%} false_positives={false_positives}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Measure self-consistency sampling with and without early stopping on a noisy fake model
+
+Usage: python -m benchmarks.bench_ensemble --proposals 500 --samples 5
+"""
+
+import re
+import time
+import random
+import argparse
+
+import numpy as np
+
+from src import config
+from src.fake_llm import FakeReviewChain
+from src.llm_review import process_proposals
+from src.ensemble import ensemble_summary
+from benchmarks.synthetic import make_proposals, VOTES
+
+def make_vote_sampler(proposals: int, seed: int = 0):
+    """Per-proposal vote distributions from easy (one dominant vote) to contested, and each proposal's true vote"""
+    rng = np.random.default_rng(seed)
+    truth = rng.choice(VOTES, proposals)
+    strength = rng.choice([0.95, 0.8, 0.6, 0.45], proposals)
+
+    def sampler(inputs, random_state: random.Random) -> str:
+        index = int(re.search(r"title: title (\d+)", inputs["PROPOSAL_INFO"]).group(1))
+        if random_state.random() < strength[index]:
+            return truth[index]
+        return random_state.choice(VOTES)
+
+    return sampler, truth
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark self-consistency sampling with a fake model")
+    parser.add_argument("--proposals", type=int, default=500, help="Number of synthetic proposals")
+    parser.add_argument("--samples", type=int, default=5, help="Maximum samples per proposal")
+    parser.add_argument("--min-samples", type=int, default=config.ENSEMBLE_MIN_SAMPLES, help="Samples before an early stop")
+    parser.add_argument("--latency", type=float, default=0.01, help="Fake LLM latency in seconds")
+    parser.add_argument("--concurrency", type=int, default=32, help="Maximum number of in-flight requests")
+    args = parser.parse_args()
+
+    proposal_df = make_proposals(args.proposals)
+    sampler, truth = make_vote_sampler(args.proposals)
+    runs = [("single", 1, 1), ("full", args.samples, args.samples), ("early_stop", args.samples, args.min_samples)]
+
+    for name, samples, min_samples in runs:
+        chain = FakeReviewChain(latency=args.latency, seed=1, vote_sampler=sampler)
+        start_time = time.perf_counter()
+        results = process_proposals(proposal_df, chain, sleep_time=0, concurrency=args.concurrency,
+                                    samples=samples, min_samples=min_samples)
+        wall_time = time.perf_counter() - start_time
+
+        votes = np.array([result['vote'] for result in results])
+        correct = votes == truth[[int(result['proposal_id']) for result in results]]
+        accuracy = correct.mean()
+        line = f"{name:<11} samples={samples} calls={chain.calls:<6} wall={wall_time:6.2f}s majority_accuracy={accuracy:6.1%}"
+        if samples > 1:
+            summary = ensemble_summary(results, samples)
+            confident = np.array([result['confidence'] >= config.ENSEMBLE_LOW_CONFIDENCE for result in results])
+            line += (f" early_stopped={summary['early_stopped']:<5} mean_confidence={summary['mean_confidence']:.2f} "
+                     f"accuracy_confident={correct[confident].mean():6.1%} "
+                     f"accuracy_low={correct[~confident].mean() if (~confident).any() else float('nan'):6.1%}")
+        print(line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Measure start-up import time with `python -X importtime` and hold the CLI to a budget
+
+Usage: python -m benchmarks.bench_importtime --budget-ms 300
+"""
+
+import re
+import sys
+import time
+import argparse
+import subprocess
+from typing import Dict, List, Tuple
+
+from src import config
+
+# Modules the entry point must not load before a code path needs them
+HEAVY_MODULES = ["langchain_core", "langchain_google_genai", "google.genai", "pandas", "numpy"]
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+def import_times(module: str) -> Tuple[Dict[str, int], List[Tuple[str, int]]]:
+    """Cumulative microseconds per module for a fresh `import module`, and the outermost imports it triggered"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=config.BASE_DIR, check=True
+    )
+    cumulative = {}
+    top_level = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        _, total, indent, name = match.groups()
+        cumulative[name] = int(total)
+        # -X importtime indents nested imports by two spaces per level
+        if len(indent) <= 3 and name != module:
+            top_level.append((name, int(total)))
+    return cumulative, top_level
+
+def wall_time(args: List[str], repeat: int) -> float:
+    """Best wall time in seconds of running a command in a fresh interpreter"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], capture_output=True, cwd=config.BASE_DIR, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark start-up import time")
+    parser.add_argument("--modules", nargs="+", default=["src.main", "src.merge_data", "src.llm_review"],
+                        help="Modules to import, each in a fresh interpreter")
+    parser.add_argument("--budget-ms", type=float, default=300, help="Import time budget for src.main")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of `run.py --help`, best one counts")
+    parser.add_argument("--top", type=int, default=5, help="Slowest top-level imports to list per module")
+    args = parser.parse_args()
+
+    failures = []
+    for module in args.modules:
+        cumulative, top_level = import_times(module)
+        total_ms = cumulative.get(module, 0) / 1000
+        print(f"{module}: {total_ms:.1f} ms cumulative import time, slowest imports:")
+        for name, micros in sorted(top_level, key=lambda item: -item[1])[:args.top]:
+            print(f"  {name:<32} {micros / 1000:8.1f} ms")
+
+        if module == "src.main":
+            loaded = [name for name in HEAVY_MODULES if name in cumulative]
+            if loaded:
+                failures.append(f"src.main imports heavy modules eagerly: {', '.join(loaded)}")
+            if total_ms > args.budget_ms:
+                failures.append(f"src.main import took {total_ms:.1f} ms, over the {args.budget_ms:.0f} ms budget")
+
+    help_time = wall_time(["run.py", "--help"], args.repeat)
+    print(f"run.py --help: {help_time * 1000:.0f} ms wall time (best of {args.repeat})")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+Compare a full nightly re-review with an incremental one when only a few proposals changed
+
+Usage: python -m benchmarks.bench_incremental --proposals 1000 --changed 20
+"""
+
+import os
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+from src import config
+from src.fake_llm import FakeGeminiChat
+from src.llm_review import ReviewVariant, run_llm_review_variants
+from src.rate_limit import reset_rate_limiters
+from src.storage import write_table
+from benchmarks.synthetic import make_proposals
+
+def review(proposal_file: str, output_file: str, incremental: bool, args):
+    reset_rate_limiters()
+    llm = FakeGeminiChat(latency=args.latency, latency_distribution="lognormal", seed=0)
+    variant = ReviewVariant("complete", str(config.FULL_PROMPT_FILE), config.FLASH_MODEL, output_file)
+    start_time = time.perf_counter()
+    results = run_llm_review_variants([variant], proposal_file=proposal_file, concurrency=args.concurrency,
+                                      use_cache=False, resume=False, incremental=incremental, llm=llm)[variant.name]
+    return time.perf_counter() - start_time, llm.calls, len(results)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental re-review against a full re-review")
+    parser.add_argument("--proposals", type=int, default=1000, help="Number of synthetic proposals")
+    parser.add_argument("--changed", type=int, default=20, help="Proposals edited between the two nightly runs")
+    parser.add_argument("--new", type=int, default=10, help="Proposals submitted between the two nightly runs")
+    parser.add_argument("--latency", type=float, default=0.05, help="Median fake LLM latency in seconds")
+    parser.add_argument("--concurrency", type=int, default=16, help="Maximum number of in-flight requests")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Keep the benchmark's manifests and journals out of the real output directory
+        config.MANIFEST_DIR = Path(directory) / "manifests"
+        config.JOURNAL_DIR = Path(directory) / "journals"
+        proposal_file = os.path.join(directory, "proposals.parquet")
+        proposal_df = make_proposals(args.proposals + args.new)
+        write_table(proposal_df.iloc[:args.proposals], proposal_file)
+        wall_time, calls, _ = review(proposal_file, os.path.join(directory, "night1.parquet"), False, args)
+        print(f"night 1     wall={wall_time:7.2f}s calls={calls}")
+
+        proposal_df.loc[proposal_df.index[:args.changed], 'abstract'] += " (edited)"
+        write_table(proposal_df, proposal_file)
+        # Incremental first, so it diffs against night 1 and not against the full re-run
+        incremental_wall, calls, reviews = review(proposal_file, os.path.join(directory, "incremental.parquet"), True, args)
+        print(f"incremental wall={incremental_wall:7.2f}s calls={calls} reviews={reviews}")
+        full_wall, calls, reviews = review(proposal_file, os.path.join(directory, "full.parquet"), False, args)
+        print(f"full        wall={full_wall:7.2f}s calls={calls} reviews={reviews} "
+              f"incremental speedup={full_wall / incremental_wall:5.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Compare writing LLM results in one DataFrame at the end with streaming them through an output sink
+
+Usage: python -m benchmarks.bench_output --results 100000 --formats parquet csv jsonl
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+import pandas as pd
+
+from src import config
+from src.sink import open_sink
+from src.storage import write_table
+from benchmarks.synthetic import VOTES
+
+def make_result(i: int) -> dict:
+    """One review record shaped like the LLM output, with realistic text lengths"""
+    return {
+        'summary': f"summary {i} " + "lorem ipsum dolor sit amet " * 6,
+        'comment': f"comment {i} " + "consectetur adipiscing elit " * 20,
+        'vote': VOTES[i % len(VOTES)],
+        'proposal_id': str(i),
+    }
+
+def measure(write) -> tuple:
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    write()
+    wall_time = time.perf_counter() - start_time
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return wall_time, peak / 2**20
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark end-of-run output writing against a streaming sink")
+    parser.add_argument("--results", type=int, default=100000, help="Number of synthetic review records")
+    parser.add_argument("--formats", nargs="+", choices=config.SUPPORTED_FORMATS, default=["parquet", "csv", "jsonl"], help="Formats to measure")
+    parser.add_argument("--buffer-rows", type=int, default=config.OUTPUT_BUFFER_ROWS, help="Rows buffered by the sink")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt in args.formats:
+            path = os.path.join(directory, f"results.{fmt}")
+
+            def at_end():
+                # The old path: every result held until the run ends, then one DataFrame write
+                results = [make_result(i) for i in range(args.results)]
+                write_table(pd.DataFrame(results), path)
+
+            def streamed():
+                with open_sink(path, buffer_rows=args.buffer_rows) as sink:
+                    for i in range(args.results):
+                        sink.write(make_result(i))
+
+            # tracemalloc sees Python allocations only, not pyarrow's own buffers
+            for name, write in [("at_end", at_end), ("streamed", streamed)]:
+                wall_time, peak = measure(write)
+                print(f"{fmt:<8} {name:<9} wall={wall_time:6.2f}s peak_python_memory={peak:8.1f}MiB "
+                      f"size={os.path.getsize(path) / 2**20:7.1f}MiB")
+
+if __name__ == "__main__":
+    main()
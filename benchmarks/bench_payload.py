@@ -0,0 +1,42 @@
+"""
+Compare per-ID DataFrame scans with the single-pass payload builder
+
+Usage: python -m benchmarks.bench_payload --rows 1000 10000 50000
+"""
+
+import time
+import argparse
+
+from src import config
+from src.payload import build_proposal_payloads
+from benchmarks.synthetic import make_proposals
+
+def scan_per_id(proposal_df, ids):
+    """The previous lookup: one boolean-mask scan and copy per proposal"""
+    for proposal_id in ids:
+        proposal_df[proposal_df.id == proposal_id][config.PROPOSAL_INFO_COLUMNS].to_dict(orient='records')[0]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark proposal payload building")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 50000], help="Synthetic frame sizes")
+    parser.add_argument("--sample", type=int, default=200, help="IDs timed for the per-ID scan (extrapolated to all rows)")
+    args = parser.parse_args()
+    
+    for rows in args.rows:
+        proposal_df = make_proposals(rows)
+        
+        sample = list(proposal_df.id[:args.sample])
+        start_time = time.perf_counter()
+        scan_per_id(proposal_df, sample)
+        scan_time = (time.perf_counter() - start_time) / len(sample) * rows
+        
+        start_time = time.perf_counter()
+        payloads = build_proposal_payloads(proposal_df)
+        build_time = time.perf_counter() - start_time
+        assert len(payloads) == rows
+        
+        print(f"rows={rows:<7} per-id scan={scan_time:9.3f}s (extrapolated) "
+              f"single pass={build_time:7.3f}s speedup={scan_time / build_time:8.0f}x")
+
+if __name__ == "__main__":
+    main()
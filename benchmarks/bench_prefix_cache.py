@@ -0,0 +1,51 @@
+"""
+Measure prompt prefix reuse with a fake Gemini model and context-cache client
+
+Usage: python -m benchmarks.bench_prefix_cache --proposals 200
+"""
+
+import time
+import argparse
+
+from src import config
+from src.fake_llm import FakeGeminiChat, FakeGenAIClient
+from src.llm_review import setup_llm_chain, process_proposals
+from src.prompt_cache import ContextCache
+from src.telemetry import Telemetry
+from benchmarks.synthetic import make_proposals
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prompt prefix caching with a fake model")
+    parser.add_argument("--proposals", type=int, default=200, help="Number of synthetic proposals")
+    parser.add_argument("--latency", type=float, default=0.01, help="Fake LLM latency in seconds")
+    parser.add_argument("--concurrency", type=int, default=16, help="Maximum number of in-flight requests")
+    parser.add_argument("--prompt-file", default=str(config.FULL_PROMPT_FILE), help="Prompt template to split")
+    args = parser.parse_args()
+    
+    proposal_df = make_proposals(args.proposals)
+    baseline = None
+    
+    for mode in config.PREFIX_CACHE_MODES:
+        client = FakeGenAIClient()
+        context_cache = ContextCache(config.FLASH_MODEL, client=client) if mode == "provider" else None
+        chain = setup_llm_chain(
+            args.prompt_file, config.FLASH_MODEL,
+            split_prefix=mode != "off", context_cache=context_cache,
+            llm=FakeGeminiChat(latency=args.latency, client=client)
+        )
+        telemetry = Telemetry(model_name=config.FLASH_MODEL)
+        start_time = time.perf_counter()
+        process_proposals(proposal_df, chain, sleep_time=0, concurrency=args.concurrency, telemetry=telemetry)
+        wall_time = time.perf_counter() - start_time
+        if context_cache is not None:
+            context_cache.close()
+        
+        summary = telemetry.summary()
+        sent = client.tokens_sent + client.caches.uploaded_tokens
+        baseline = baseline or sent
+        print(f"prefix_cache={mode:<9} wall={wall_time:6.2f}s prefix_sends={client.total_prefix_sends:<5} "
+              f"tokens_sent={sent:<8} cached_input={summary['cached_tokens']:<8} "
+              f"saved={1 - sent / baseline:6.1%} cost=${summary['cost_usd']:.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Compare load/save times of the supported table formats
+
+Usage: python -m benchmarks.bench_storage --rows 10000 100000
+"""
+
+import os
+import time
+import argparse
+import tempfile
+
+from src import config
+from src.storage import read_table, write_table
+from benchmarks.synthetic import make_reviews
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark table storage formats")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000], help="Synthetic review table sizes")
+    parser.add_argument("--formats", nargs="+", choices=config.SUPPORTED_FORMATS, default=config.SUPPORTED_FORMATS, help="Formats to measure")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in args.rows:
+            df = make_reviews(rows)
+            for fmt in args.formats:
+                path = os.path.join(tmp_dir, f"reviews_{rows}.{fmt}")
+                
+                start_time = time.perf_counter()
+                write_table(df, path)
+                save_time = time.perf_counter() - start_time
+                
+                start_time = time.perf_counter()
+                loaded = read_table(path, dtype={'vote': str, 'proposal_id': str})
+                load_time = time.perf_counter() - start_time
+                assert len(loaded) == rows
+                
+                size_mb = os.path.getsize(path) / 1e6
+                print(f"rows={rows:<8} format={fmt:<8} save={save_time:8.3f}s load={load_time:8.3f}s size={size_mb:7.1f}MB")
+
+if __name__ == "__main__":
+    main()
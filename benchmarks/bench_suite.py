@@ -0,0 +1,170 @@
+"""
+Throughput suite: review loop, merge and analysis at synthetic scales, saved for regression comparison
+
+The review loop runs the real chain (prompt, rate limiter, telemetry, structured output) against
+FakeGeminiChat with a latency distribution, transient errors and 429 bursts.
+
+Usage: python -m benchmarks.bench_suite --scales 1000 10000 100000
+       python -m benchmarks.bench_suite --scales 1000 --compare benchmarks/results/suite_20260101_120000.json
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+from datetime import datetime
+from typing import Dict, Any
+
+import pandas as pd
+
+from src import config
+from src.fake_llm import FakeGeminiChat, LATENCY_DISTRIBUTIONS, load_recorded_responses
+from src.llm_review import setup_llm_chain, process_proposals
+from src.merge_data import calculate_vote_statistics, merge_data
+from src.variants import stack_variants, analyze_variants
+from src.agreement import analyze_agreement
+from src.rate_limit import RateLimiter
+from src.telemetry import Telemetry
+from benchmarks.synthetic import make_proposals, make_reviews
+
+RESULTS_DIR = config.BASE_DIR / "benchmarks" / "results"
+
+# Metrics where a larger value is a regression
+LOWER_IS_BETTER = ["review_wall", "latency_p95", "latency_p99", "merge_wall", "analysis_wall"]
+
+def bench_review(proposal_df: pd.DataFrame, args) -> Dict[str, Any]:
+    """Review every proposal through the full chain against the fake Gemini backend"""
+    llm = FakeGeminiChat(
+        latency=args.latency, latency_distribution=args.latency_distribution, seed=0,
+        error_rate=args.error_rate, burst_interval=args.burst_interval, burst_duration=args.burst_duration,
+        responses=load_recorded_responses(args.replay) if args.replay else None
+    )
+    # Quota high enough not to bind, so the limiter's overhead is measured but not its waiting
+    limiter = RateLimiter(rpm=1e9, tpm=1e12, name="bench")
+    chain = setup_llm_chain(str(config.FULL_PROMPT_FILE), config.FLASH_MODEL, rate_limiter=limiter, llm=llm)
+    telemetry = Telemetry(model_name=config.FLASH_MODEL)
+
+    start_time = time.perf_counter()
+    results = process_proposals(proposal_df, chain, sleep_time=args.sleep_time,
+                                concurrency=args.concurrency, telemetry=telemetry)
+    wall_time = time.perf_counter() - start_time
+
+    summary = telemetry.summary()
+    return {
+        "review_wall": wall_time,
+        "proposals_per_sec": len(results) / wall_time,
+        "latency_p50": summary["latency_p50"],
+        "latency_p95": summary["latency_p95"],
+        "latency_p99": summary["latency_p99"],
+        "total_time_p95": summary["total_time_p95"],
+        "calls": llm.calls,
+        "retries": summary["retries"],
+        "errors_503": llm.errors,
+        "errors_429": llm.rate_limited,
+        "reviews": pd.DataFrame(results),
+    }
+
+def bench_merge_and_analysis(proposal_df: pd.DataFrame, llm_df: pd.DataFrame, args) -> Dict[str, Any]:
+    """Vote statistics and merge over synthetic human reviews, then the variant analysis and bootstrap"""
+    vote_df = make_reviews(len(proposal_df) * args.reviews_per_proposal, len(proposal_df))
+    vote_df['vote_int'] = vote_df['vote'].astype(int)
+    llm_df = llm_df.assign(proposal_id=llm_df['proposal_id'].astype(str))
+
+    start_time = time.perf_counter()
+    merged_df = merge_data(proposal_df, calculate_vote_statistics(vote_df), complete_df=llm_df)
+    merge_wall = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    long_df = stack_variants({'complete': llm_df})
+    analyze_variants(merged_df, long_df)
+    analyze_agreement(merged_df, long_df, resamples=args.resamples)
+    analysis_wall = time.perf_counter() - start_time
+
+    return {
+        "merge_wall": merge_wall,
+        "merge_rows_per_sec": len(vote_df) / merge_wall,
+        "analysis_wall": analysis_wall,
+    }
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=config.BASE_DIR).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "pandas": pd.__version__,
+    }
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, min_delta: float) -> list:
+    """Metrics that got worse than the baseline by more than `tolerance` (and `min_delta` seconds), per scale in both runs"""
+    regressions = []
+    for scale, metrics in results["scales"].items():
+        before = baseline["scales"].get(scale)
+        if before is None:
+            continue
+        for metric in LOWER_IS_BETTER:
+            if metric not in metrics or metric not in before or before[metric] <= 0:
+                continue
+            ratio = metrics[metric] / before[metric]
+            print(f"scale={scale:<7} {metric:<15} {before[metric]:9.3f} -> {metrics[metric]:9.3f} ({ratio - 1:+.1%})")
+            # Sub-second stages are noisy; a slowdown must also be large in absolute terms
+            if ratio > 1 + tolerance and metrics[metric] - before[metric] > min_delta:
+                regressions.append(f"{metric} at {scale} proposals is {ratio - 1:.0%} slower")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark review, merge and analysis throughput with a fake Gemini backend")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 10000, 100000], help="Synthetic proposal counts")
+    parser.add_argument("--concurrency", type=int, default=256, help="Maximum number of in-flight requests")
+    parser.add_argument("--latency", type=float, default=0.05, help="Median fake LLM latency in seconds")
+    parser.add_argument("--latency-distribution", choices=LATENCY_DISTRIBUTIONS, default="lognormal",
+                        help="Distribution of the fake LLM latency")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="Share of calls failing with a transient 503")
+    parser.add_argument("--burst-interval", type=float, default=30.0, help="Seconds between 429 bursts (0 disables)")
+    parser.add_argument("--burst-duration", type=float, default=1.0, help="Length of each 429 burst in seconds")
+    parser.add_argument("--sleep-time", type=int, default=2, help="Maximum backoff between retries")
+    parser.add_argument("--replay", help="LLM review output whose recorded reviews the fake model replays")
+    parser.add_argument("--reviews-per-proposal", type=int, default=5, help="Synthetic human reviews per proposal")
+    parser.add_argument("--resamples", type=int, default=200, help="Bootstrap resamples in the analysis stage")
+    parser.add_argument("--output", help="Results JSON (default: benchmarks/results/suite_<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown against --compare before failing")
+    parser.add_argument("--min-delta", type=float, default=0.05, help="Ignore slowdowns smaller than this many seconds")
+    args = parser.parse_args()
+
+    results = {"environment": environment(), "args": vars(args), "scales": {}}
+    for scale in args.scales:
+        proposal_df = make_proposals(scale)
+        review = bench_review(proposal_df, args)
+        metrics = {key: value for key, value in review.items() if key != "reviews"}
+        metrics.update(bench_merge_and_analysis(proposal_df, review["reviews"], args))
+        results["scales"][str(scale)] = metrics
+        print(f"scale={scale:<7} review={metrics['review_wall']:7.2f}s ({metrics['proposals_per_sec']:7.1f} proposals/s, "
+              f"p50/p95/p99 {metrics['latency_p50']:.3f}/{metrics['latency_p95']:.3f}/{metrics['latency_p99']:.3f}s, "
+              f"{metrics['retries']} retries: {metrics['errors_503']} x 503, {metrics['errors_429']} x 429) "
+              f"merge={metrics['merge_wall']:6.2f}s analysis={metrics['analysis_wall']:6.2f}s")
+
+    output = args.output or str(RESULTS_DIR / f"suite_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.min_delta)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
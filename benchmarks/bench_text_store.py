@@ -0,0 +1,116 @@
+"""
+Memory of the proposal corpus: whole export frame, prompt columns only, and the memory-mapped text store
+
+Each mode runs in a fresh interpreter and reports the resident memory it added by loading the corpus and
+by one pass over every proposal's text (as payload building and near-duplicate indexing do).
+
+Usage: python -m benchmarks.bench_text_store --proposals 20000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+import numpy as np
+import pandas as pd
+
+from src import config
+
+MODES = ["object_frame", "full_frame", "prompt_columns", "text_store"]
+
+# Columns of the Metabase export that the review never reads
+EXTRA_COLUMNS = ['speaker_bio', 'speaker_name', 'speaker_email', 'notes', 'reviewer_notes', 'slides_url',
+                 'recording_release', 'python_level', 'category', 'language', 'created_at', 'last_modified']
+
+def make_corpus(n: int, seed: int = 0) -> pd.DataFrame:
+    """Proposals with export-like text lengths: long descriptions and many columns besides the prompt ones"""
+    rng = np.random.default_rng(seed)
+    words = np.array(["python", "async", "typing", "pandas", "測試", "資料", "performance", "packaging", "web", "社群"])
+    lengths = {'title': 8, 'abstract': 120, 'detailed_description': 600, 'outline': 200, 'objective': 60}
+    data = {'id': [str(i) for i in range(n)]}
+    for column in config.PROPOSAL_INFO_COLUMNS:
+        size = lengths.get(column, 100)
+        data[column] = [" ".join(rng.choice(words, size)) for _ in range(n)]
+    for column in EXTRA_COLUMNS:
+        data[column] = [" ".join(rng.choice(words, 40)) for _ in range(n)]
+    return pd.DataFrame(data)
+
+def resident_mib(field: str = "VmRSS") -> float:
+    """Current (VmRSS) or peak (VmHWM) resident memory of this process; Linux only"""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+def run_mode(mode: str, parquet_file: str, store_file: str) -> dict:
+    """Load the corpus one way and read every proposal's prompt text once"""
+    from src.storage import read_table
+    from src.llm_review import load_proposal_data
+    from src.text_store import TextStore
+    baseline = resident_mib()
+    start_time = time.perf_counter()
+
+    if mode == "text_store":
+        proposals = TextStore(store_file)
+        records = (proposals[proposal_id] for proposal_id in proposals)
+    else:
+        if mode == "object_frame":
+            # The frame as pandas < 3 held it: every text cell a Python str object
+            pd.set_option("future.infer_string", False)
+        proposals = read_table(parquet_file, dtype={'id': str}) if mode != "prompt_columns" else load_proposal_data(parquet_file)
+        records = proposals[config.PROPOSAL_INFO_COLUMNS].to_dict(orient='records')
+    load_time = time.perf_counter() - start_time
+    loaded = resident_mib() - baseline
+
+    characters = sum(len(text) for record in records for text in record.values() if text)
+    return {
+        "mode": mode,
+        "loaded_mib": loaded,
+        # ru_maxrss would include the parent's memory from before exec, the high-water mark does not
+        "peak_mib": resident_mib("VmHWM") - baseline,
+        "load_seconds": load_time,
+        "total_seconds": time.perf_counter() - start_time,
+        "characters": characters,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark proposal corpus memory: frames against the text store")
+    parser.add_argument("--proposals", type=int, default=20000, help="Number of synthetic proposals")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES, help="Modes to measure")
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--files", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_mode(args.worker, *args.files)))
+        return
+
+    from src.storage import write_table
+    from src.text_store import write_text_store
+    with tempfile.TemporaryDirectory() as directory:
+        parquet_file = os.path.join(directory, "proposals.parquet")
+        store_file = os.path.join(directory, "proposals" + config.TEXT_STORE_SUFFIX)
+        corpus = make_corpus(args.proposals)
+        write_table(corpus, parquet_file)
+        start_time = time.perf_counter()
+        write_text_store(store_file, [corpus])
+        print(f"corpus: {args.proposals} proposals, parquet {os.path.getsize(parquet_file) / 2**20:.1f} MiB, "
+              f"text store {os.path.getsize(store_file) / 2**20:.1f} MiB (built in {time.perf_counter() - start_time:.2f}s)")
+        del corpus
+
+        for mode in args.modes:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_text_store", "--worker", mode, "--files", parquet_file, store_file],
+                capture_output=True, text=True, check=True, cwd=config.BASE_DIR
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:<15} loaded={result['loaded_mib']:7.1f}MiB peak={result['peak_mib']:7.1f}MiB "
+                  f"load={result['load_seconds']:5.2f}s load+read={result['total_seconds']:5.2f}s chars={result['characters']}")
+
+if __name__ == "__main__":
+    main()
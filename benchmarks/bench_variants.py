@@ -0,0 +1,62 @@
+"""
+Compare reviewing two prompt variants one after the other with one shared multi-variant pass
+
+Both modes run at most --concurrency requests in flight in total, so the difference is the shared
+load and payloads and the interleaving, not extra concurrency.
+
+Usage: python -m benchmarks.bench_variants --proposals 1000 --latency 0.05 --concurrency 16
+"""
+
+import os
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+from src import config
+from src.fake_llm import FakeGeminiChat
+from src.llm_review import ReviewVariant, run_llm_review_variants
+from src.rate_limit import reset_rate_limiters
+from src.storage import write_table
+from benchmarks.synthetic import make_proposals
+
+def make_variants(directory: str, tag: str):
+    return [
+        ReviewVariant("simple", str(config.SIMPLE_PROMPT_FILE), config.FLASH_MODEL, os.path.join(directory, f"simple_{tag}.parquet")),
+        ReviewVariant("complete", str(config.FULL_PROMPT_FILE), config.FLASH_MODEL, os.path.join(directory, f"complete_{tag}.parquet")),
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multi-variant review against sequential runs")
+    parser.add_argument("--proposals", type=int, default=1000, help="Number of synthetic proposals")
+    parser.add_argument("--latency", type=float, default=0.05, help="Median fake LLM latency in seconds")
+    parser.add_argument("--concurrency", type=int, default=16, help="Maximum number of in-flight requests")
+    parser.add_argument("--input-format", default="xlsx", help="Format of the proposal file (the sheet is xlsx in production)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Keep the benchmark's manifests and journals out of the real output directory
+        config.MANIFEST_DIR = Path(directory) / "manifests"
+        config.JOURNAL_DIR = Path(directory) / "journals"
+        proposal_file = os.path.join(directory, f"proposals.{args.input_format}")
+        write_table(make_proposals(args.proposals), proposal_file)
+        options = dict(proposal_file=proposal_file, concurrency=args.concurrency, use_cache=False, resume=False)
+
+        # Each mode starts from a full quota, as a fresh process would
+        reset_rate_limiters()
+        llm = FakeGeminiChat(latency=args.latency, latency_distribution="lognormal", seed=0)
+        start_time = time.perf_counter()
+        for variant in make_variants(directory, "sequential"):
+            run_llm_review_variants([variant], llm=llm, **options)
+        sequential = time.perf_counter() - start_time
+        print(f"sequential wall={sequential:7.2f}s calls={llm.calls}")
+
+        reset_rate_limiters()
+        llm = FakeGeminiChat(latency=args.latency, latency_distribution="lognormal", seed=0)
+        start_time = time.perf_counter()
+        run_llm_review_variants(make_variants(directory, "shared"), llm=llm, max_in_flight=args.concurrency, **options)
+        shared = time.perf_counter() - start_time
+        print(f"shared     wall={shared:7.2f}s calls={llm.calls} speedup={sequential / shared:5.2f}x")
+
+if __name__ == "__main__":
+    main()
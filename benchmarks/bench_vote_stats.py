@@ -0,0 +1,67 @@
+"""
+Compare the vectorized vote statistics with the previous per-group lambda version
+
+Usage: python -m benchmarks.bench_vote_stats --rows 1000000
+"""
+
+import time
+import argparse
+import numpy as np
+
+from src.merge_data import calculate_vote_statistics
+from benchmarks.synthetic import make_reviews
+
+def legacy_vote_statistics(vote_df):
+    """The previous implementation, kept here as the reference"""
+    vote_stats = vote_df.groupby('proposal_id', as_index=False).agg({
+        'vote': [
+            ('most_common_vote', lambda x: x.mode().iloc[0] if not x.empty else None),
+            ('vote_counts', lambda x: x.value_counts().to_dict())
+        ],
+        'vote_int': [
+            ('mean', 'mean'),
+            ('std', 'std'),
+            ('count', 'count'),
+            ('median', 'median')
+        ]
+    })
+    vote_stats.columns = ['proposal_id' if col[0] == 'proposal_id'
+                         else f'{col[0]}_{col[1]}' for col in vote_stats.columns]
+    return vote_stats
+
+def check_identical(legacy, fast):
+    """Assert both implementations agree on every statistic"""
+    assert list(legacy['proposal_id']) == list(fast['proposal_id'])
+    assert (legacy['vote_most_common_vote'].to_numpy() == fast['vote_most_common_vote'].to_numpy()).all()
+    for column in ['vote_int_mean', 'vote_int_std', 'vote_int_median']:
+        np.testing.assert_allclose(legacy[column], fast[column], rtol=1e-12, equal_nan=True)
+    assert (legacy['vote_int_count'].to_numpy() == fast['vote_int_count'].to_numpy()).all()
+    count_columns = [c for c in fast.columns if c.startswith('vote_counts_')]
+    for legacy_counts, row in zip(legacy['vote_vote_counts'], fast[count_columns].to_numpy()):
+        flat = {c[len('vote_counts_'):]: n for c, n in zip(count_columns, row) if n}
+        assert legacy_counts == flat
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vote statistics")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000000], help="Synthetic review table sizes")
+    parser.add_argument("--proposals", type=int, help="Distinct proposals (default: rows / 5)")
+    args = parser.parse_args()
+    
+    for rows in args.rows:
+        vote_df = make_reviews(rows, args.proposals)
+        vote_df['vote_int'] = vote_df['vote'].astype(int)
+        
+        start_time = time.perf_counter()
+        legacy = legacy_vote_statistics(vote_df)
+        legacy_time = time.perf_counter() - start_time
+        
+        start_time = time.perf_counter()
+        fast = calculate_vote_statistics(vote_df)
+        fast_time = time.perf_counter() - start_time
+        
+        check_identical(legacy, fast)
+        print(f"rows={rows:<8} proposals={len(fast):<7} lambdas={legacy_time:8.2f}s "
+              f"vectorized={fast_time:7.3f}s speedup={legacy_time / fast_time:6.0f}x identical=True")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Simulate an open CFP: proposals trickle into the job queue while one warm review worker drains it
+
+Reports the time from enqueue to finished review, against re-launching a full one-shot run per arrival.
+
+Usage: python -m benchmarks.bench_worker --initial 200 --arrivals 50 --interval 0.1
+"""
+
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+
+import numpy as np
+
+from src import config
+from src.fake_llm import FakeGeminiChat
+from src.job_queue import ReviewQueue
+from src.worker import ReviewWorker
+from src.storage import write_table
+from benchmarks.synthetic import make_proposals
+
+async def simulate(worker: ReviewWorker, queue: ReviewQueue, args) -> None:
+    task = asyncio.create_task(worker.run())
+    queue.enqueue(dict.fromkeys(map(str, range(args.initial))))
+    for i in range(args.initial, args.initial + args.arrivals):
+        await asyncio.sleep(args.interval)
+        queue.enqueue({str(i): None})
+    while queue.counts()["pending"] or queue.counts()["running"]:
+        await asyncio.sleep(0.05)
+    worker.stop()
+    await task
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the review worker on a trickle of new proposals")
+    parser.add_argument("--initial", type=int, default=200, help="Proposals queued when the worker starts")
+    parser.add_argument("--arrivals", type=int, default=50, help="Proposals arriving one by one afterwards")
+    parser.add_argument("--interval", type=float, default=0.1, help="Seconds between arrivals")
+    parser.add_argument("--latency", type=float, default=0.05, help="Median fake LLM latency in seconds")
+    parser.add_argument("--concurrency", type=int, default=16, help="Maximum number of in-flight requests")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        proposal_file = os.path.join(directory, "proposals.parquet")
+        write_table(make_proposals(args.initial + args.arrivals), proposal_file)
+        queue_file = os.path.join(directory, "queue.sqlite")
+        llm = FakeGeminiChat(latency=args.latency, latency_distribution="lognormal", seed=0)
+        worker = ReviewWorker(
+            str(config.FULL_PROMPT_FILE), config.FLASH_MODEL, os.path.join(directory, "live.parquet"),
+            proposal_file=proposal_file, queue_file=queue_file, concurrency=args.concurrency,
+            poll_interval=0.05, use_cache=False, llm=llm
+        )
+        queue = ReviewQueue(queue_file)
+        start_time = time.perf_counter()
+        asyncio.run(simulate(worker, queue, args))
+        wall_time = time.perf_counter() - start_time
+        worker.close()
+
+        arrivals = np.array([
+            updated_at - enqueued_at for proposal_id, _, enqueued_at, updated_at in queue.jobs("done")
+            if int(proposal_id) >= args.initial
+        ])
+        print(f"worker   wall={wall_time:6.2f}s calls={llm.calls} reviewed={worker.reviewed} "
+              f"arrival enqueue->review p50/p95={np.percentile(arrivals, 50):.3f}/{np.percentile(arrivals, 95):.3f}s")
+        # Re-launching a full run for each arrival reviews everything known so far again (without the response cache)
+        relaunch_calls = sum(range(args.initial, args.initial + args.arrivals + 1))
+        print(f"relaunch calls={relaunch_calls} ({relaunch_calls / llm.calls:.0f}x the worker's)")
+        queue.close()
+
+if __name__ == "__main__":
+    main()
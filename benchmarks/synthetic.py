@@ -0,0 +1,28 @@
+"""Synthetic data shared by the benchmark scripts"""
+
+import numpy as np
+import pandas as pd
+
+from src import config
+
+def make_proposals(n: int) -> pd.DataFrame:
+    """Build a synthetic proposal frame with the columns the review loop reads"""
+    data = {'id': [str(i) for i in range(n)]}
+    for column in config.PROPOSAL_INFO_COLUMNS:
+        data[column] = [f"{column} {i}" for i in range(n)]
+    return pd.DataFrame(data)
+
+VOTES = ['+1', '+0', '-0', '-1']
+
+def make_reviews(n: int, n_proposals: int = None, seed: int = 0) -> pd.DataFrame:
+    """Build a synthetic human review frame shaped like the reviews_review export"""
+    rng = np.random.default_rng(seed)
+    if n_proposals is None:
+        n_proposals = max(1, n // 5)
+    return pd.DataFrame({
+        'id': np.arange(n).astype(str),
+        'proposal_id': rng.integers(0, n_proposals, n).astype(str),
+        'reviewer_id': rng.integers(0, 200, n).astype(str),
+        'vote': rng.choice(VOTES, n, p=[0.2, 0.5, 0.2, 0.1]),
+        'comment': [f"review comment {i}" for i in range(n)],
+    })
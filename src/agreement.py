@@ -0,0 +1,163 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+# Ordinal order of the votes, for kappa categories and linear weights
+VOTE_ORDER = ['-1', '-0', '+0', '+1']
+
+def _interval(estimate: float, samples: np.ndarray, level: float) -> Dict[str, float]:
+    samples = samples[np.isfinite(samples)]
+    if not len(samples):
+        return {'estimate': float(estimate), 'ci_low': float('nan'), 'ci_high': float('nan')}
+    tail = (1 - level) / 2 * 100
+    low, high = np.percentile(samples, [tail, 100 - tail])
+    return {'estimate': float(estimate), 'ci_low': float(low), 'ci_high': float(high)}
+
+def cohen_kappa(confusion: np.ndarray, weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """Cohen's kappa from one (K x K) or a stack of (B x K x K) confusion count matrices; weights are disagreement costs"""
+    k = confusion.shape[-1]
+    if weights is None:
+        weights = 1 - np.eye(k)
+    total = confusion.sum(axis=(-2, -1))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        observed = (confusion * weights).sum(axis=(-2, -1)) / total
+        rows = confusion.sum(axis=-1) / total[..., None]
+        cols = confusion.sum(axis=-2) / total[..., None]
+        expected = np.einsum('...i,ij,...j->...', rows, weights, cols)
+        return 1 - observed / expected
+
+def linear_weights(k: int) -> np.ndarray:
+    """Linear disagreement weights |i - j| / (k - 1) for ordinal categories"""
+    index = np.arange(k)
+    return np.abs(index[:, None] - index[None, :]) / (k - 1)
+
+def fleiss_terms(counts: np.ndarray):
+    """Per-item agreement P_i and rater counts n_i for Fleiss' kappa with a varying number of raters"""
+    n = counts.sum(axis=1).astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p_item = ((counts ** 2).sum(axis=1) - n) / (n * (n - 1))
+    valid = n >= 2
+    return np.where(valid, p_item, 0.0), valid.astype(np.float64), n * valid
+
+def fleiss_kappa(weights: np.ndarray, counts: np.ndarray, p_item: np.ndarray, valid: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """Fleiss' kappa for each row of item weights (bootstrap multiplicities; a row of ones is the point estimate)"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        observed = (weights @ p_item) / (weights @ valid)
+        proportions = (weights @ (counts * valid[:, None])) / (weights @ n)[:, None]
+        expected = (proportions ** 2).sum(axis=1)
+        return (observed - expected) / (1 - expected)
+
+def agreement_statistics(
+    llm_votes: np.ndarray,
+    human_votes: np.ndarray,
+    human_counts: np.ndarray,
+    resamples: int = config.BOOTSTRAP_RESAMPLES,
+    level: float = config.BOOTSTRAP_CI_LEVEL,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """Agreement, Cohen's/weighted kappa, vote_int agreement and Fleiss' kappa with bootstrap intervals
+
+    `llm_votes` and `human_votes` are VOTE_ORDER codes per proposal, `human_counts` the per-proposal
+    human vote counts in VOTE_ORDER columns.
+    """
+    k = len(VOTE_ORDER)
+    n_items = len(llm_votes)
+    if n_items == 0:
+        return {'n': 0}
+    vote_ints = np.array([int(vote) for vote in VOTE_ORDER], dtype=np.float64)
+
+    # 每篇 proposal 的逐項數值；bootstrap 重抽樣只是對這些數值做加權加總
+    pair = np.zeros((n_items, k * k))
+    pair[np.arange(n_items), llm_votes * k + human_votes] = 1
+    agree = (llm_votes == human_votes).astype(np.float64)
+    int_agreement = 1 - np.abs(vote_ints[llm_votes] - vote_ints[human_votes]) / 2
+    with_llm = human_counts.astype(np.float64)
+    with_llm[np.arange(n_items), llm_votes] += 1
+    human_terms = fleiss_terms(human_counts.astype(np.float64))
+    llm_terms = fleiss_terms(with_llm)
+    weights = linear_weights(k)
+
+    def _statistics(item_weights: np.ndarray) -> Dict[str, np.ndarray]:
+        total = item_weights.sum(axis=1)
+        confusion = (item_weights @ pair).reshape(-1, k, k)
+        return {
+            'exact_agreement': item_weights @ agree / total,
+            'cohen_kappa': cohen_kappa(confusion),
+            'weighted_kappa': cohen_kappa(confusion, weights),
+            'weighted_agreement': item_weights @ int_agreement / total,
+            'fleiss_kappa_humans': fleiss_kappa(item_weights, human_counts, *human_terms),
+            'fleiss_kappa_with_llm': fleiss_kappa(item_weights, with_llm, *llm_terms),
+        }
+
+    point = _statistics(np.ones((1, n_items)))
+
+    # Resample proposals with replacement, as per-proposal multiplicities, in blocks to bound memory
+    rng = np.random.default_rng(seed)
+    block = max(1, min(resamples, config.BOOTSTRAP_BLOCK_CELLS // n_items))
+    samples = {name: [] for name in point}
+    for start in range(0, resamples, block):
+        size = min(block, resamples - start)
+        draws = rng.integers(0, n_items, (size, n_items)) + np.arange(size)[:, None] * n_items
+        item_weights = np.bincount(draws.ravel(), minlength=size * n_items).reshape(size, n_items)
+        for name, values in _statistics(item_weights.astype(np.float64)).items():
+            samples[name].append(values)
+
+    results = {'n': n_items, 'resamples': resamples, 'ci_level': level}
+    for name, estimate in point.items():
+        results[name] = _interval(estimate[0], np.concatenate(samples[name]), level)
+    return results
+
+def _variant_arrays(merged_df: pd.DataFrame, long_df: pd.DataFrame, variant: str):
+    """VOTE_ORDER codes of LLM and majority human votes plus human count columns, for one variant"""
+    human = merged_df.drop_duplicates('id').set_index('id')
+    llm = long_df[long_df['variant'] == variant].set_index('proposal_id')['vote']
+    ids = human.index.intersection(llm.index)
+    codes = {vote: i for i, vote in enumerate(VOTE_ORDER)}
+    llm_votes = llm.loc[ids].map(codes)
+    human_votes = human.loc[ids, 'vote_most_common_vote'].map(codes)
+    keep = (llm_votes.notna() & human_votes.notna()).to_numpy()
+
+    count_columns = [f'vote_counts_{vote}' for vote in VOTE_ORDER]
+    counts = human.loc[ids].reindex(columns=count_columns).fillna(0).to_numpy(dtype=np.int64)
+    return llm_votes.to_numpy()[keep].astype(np.int64), human_votes.to_numpy()[keep].astype(np.int64), counts[keep]
+
+def _variant_task(args) -> Dict[str, Any]:
+    return agreement_statistics(*args)
+
+def analyze_agreement(
+    merged_df: pd.DataFrame,
+    long_df: pd.DataFrame,
+    resamples: int = config.BOOTSTRAP_RESAMPLES,
+    workers: int = 1
+) -> Dict[str, Dict[str, Any]]:
+    """Bootstrap agreement statistics for every variant, fanned out over a process pool when workers > 1"""
+    variants = list(long_df['variant'].cat.categories)
+    tasks = [(*_variant_arrays(merged_df, long_df, variant), resamples) for variant in variants]
+    logger.info(f"Bootstrapping agreement statistics for {len(variants)} variants "
+                f"({resamples} resamples, {workers} worker(s))")
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            results = list(pool.map(_variant_task, tasks))
+    else:
+        results = [_variant_task(task) for task in tasks]
+    return dict(zip(variants, results))
+
+def format_agreement_report(statistics: Dict[str, Any]) -> List[str]:
+    """Report lines for one variant's agreement statistics"""
+    if not statistics.get('n'):
+        return ["No proposals with both LLM and human votes."]
+    lines = [f"Agreement Statistics (n={statistics['n']}, {statistics['ci_level']:.0%} bootstrap CI, "
+             f"{statistics['resamples']} resamples):"]
+    for name in ['exact_agreement', 'cohen_kappa', 'weighted_kappa', 'weighted_agreement',
+                 'fleiss_kappa_humans', 'fleiss_kappa_with_llm']:
+        value = statistics[name]
+        lines.append(f"{name}: {value['estimate']:.3f} [{value['ci_low']:.3f}, {value['ci_high']:.3f}]")
+    return lines
@@ -0,0 +1,129 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+from typing import Dict, Any, Optional, Type
+
+from pydantic import BaseModel
+from langchain_core.runnables import RunnableLambda
+
+from src import config
+from src.telemetry import current_call
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """Persistent content-addressed cache of structured LLM responses with LRU eviction"""
+    
+    def __init__(self, path: str = None, max_entries: int = config.CACHE_MAX_ENTRIES, evict_batch: int = config.CACHE_EVICT_BATCH):
+        if path is None:
+            path = config.CACHE_FILE
+        os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.evict_batch = max(1, min(evict_batch, max_entries))
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses (last_access)")
+        # Running entry count, so a write does not scan the table to decide on eviction
+        self._entries = len(self)
+    
+    @staticmethod
+    def make_key(prompt_text: str, model_name: str, temperature: float, schema: Type[BaseModel], context: str = "") -> str:
+        """Hash of everything that determines the response; `context` is prompt text held in a provider cache"""
+        parts = [prompt_text, model_name, temperature, schema.model_json_schema()]
+        if context:
+            parts.append(context)
+        payload = json.dumps(
+            parts,
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+    
+    def put(self, key: str, value: Dict[str, Any]):
+        row = (json.dumps(value, ensure_ascii=False), time.time(), key)
+        if not self._conn.execute("UPDATE responses SET value = ?, last_access = ? WHERE key = ?", row).rowcount:
+            self._conn.execute("INSERT OR REPLACE INTO responses (value, last_access, key) VALUES (?, ?, ?)", row)
+            self._entries += 1
+        if self._entries > self.max_entries:
+            self._evict()
+    
+    def _evict(self):
+        """Drop least recently used entries, down to `evict_batch` below max_entries"""
+        # Recount here only: other processes may share the file, and this runs once per `evict_batch` writes
+        excess = len(self) - self.max_entries + self.evict_batch
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                (excess,)
+            )
+        self._entries = len(self)
+    
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+    
+    def log_stats(self):
+        total = self.hits + self.misses
+        hit_rate = self.hits / total if total else 0.0
+        logger.info(f"Response cache {self.path}: {self.hits} hits, {self.misses} misses "
+                    f"({hit_rate:.1%} hit rate), {len(self)} entries")
+    
+    def close(self):
+        self._conn.close()
+
+def cached(
+    runnable,
+    cache: ResponseCache,
+    model_name: str,
+    temperature: float,
+    schema: Type[BaseModel],
+    context: str = ""
+) -> RunnableLambda:
+    """Wrap a structured-output LLM runnable so identical rendered prompts are answered from the cache"""
+    def _key(prompt_value) -> str:
+        return cache.make_key(prompt_value.to_string(), model_name, temperature, schema, context)
+    
+    def _hit(value: Dict[str, Any]):
+        record = current_call.get()
+        if record is not None:
+            record.cache_hit = True
+        return schema.model_validate(value)
+    
+    def _invoke(prompt_value):
+        key = _key(prompt_value)
+        hit = cache.get(key)
+        if hit is not None:
+            return _hit(hit)
+        response = runnable.invoke(prompt_value)
+        cache.put(key, response.model_dump())
+        return response
+    
+    async def _ainvoke(prompt_value):
+        key = _key(prompt_value)
+        hit = cache.get(key)
+        if hit is not None:
+            return _hit(hit)
+        response = await runnable.ainvoke(prompt_value)
+        cache.put(key, response.model_dump())
+        return response
+    
+    return RunnableLambda(_invoke, afunc=_ainvoke, name="cached_llm")
@@ -0,0 +1,74 @@
+import logging
+from collections import Counter
+from typing import List, Dict, Any, Optional
+
+from pydantic import ValidationError
+from langchain_core.exceptions import OutputParserException
+
+from src import config
+from src.telemetry import Telemetry
+
+logger = logging.getLogger(__name__)
+
+def is_schema_error(error: Exception) -> bool:
+    """Whether an LLM failure is a structured-output validation error rather than a transport error"""
+    return isinstance(error, (OutputParserException, ValidationError))
+
+def escalation_reason(samples: List[Dict[str, Any]], errors: List[Exception] = ()) -> Optional[str]:
+    """Why the flash answers for one proposal need a second opinion from pro, or None to accept them"""
+    if any(is_schema_error(error) for error in errors):
+        return "schema_failure"
+    if errors or not samples:
+        return "flash_failed"
+    votes = [sample['vote'] for sample in samples]
+    if len(set(votes)) > 1:
+        return "disagreement"
+    if votes[0] in config.CASCADE_ESCALATE_VOTES:
+        return "borderline"
+    return None
+
+def cascade_summary(
+    results: List[Dict[str, Any]],
+    pro_telemetry: Telemetry,
+    wall_time: float,
+    concurrency: int,
+    pro_rpm: float = None
+) -> Dict[str, Any]:
+    """Per-tier counts and the time saved against reviewing every proposal with pro at `pro_rpm` (default: from config)"""
+    tiers = Counter(result.get('tier') for result in results)
+    reasons = Counter(result['escalation'] for result in results if result.get('escalation'))
+    summary = {
+        "proposals": len(results),
+        "flash": tiers.get("flash", 0),
+        "pro": tiers.get("pro", 0),
+        "escalations": dict(reasons),
+        "wall_time": wall_time,
+    }
+
+    # 以實際 pro 呼叫的平均延遲推估全部送 pro 所需時間，並考慮 pro 的每分鐘請求上限
+    pro_calls = [r for r in pro_telemetry.records if r.status == "ok" and not r.cache_hit]
+    if pro_calls and results:
+        if pro_rpm is None:
+            pro_rpm = config.MODEL_RATE_LIMITS[config.PRO_MODEL]["rpm"]
+        mean_latency = sum(r.api_latency for r in pro_calls) / len(pro_calls)
+        all_pro = max(
+            len(results) * mean_latency / max(1, concurrency),
+            len(results) / (pro_rpm * config.RATE_LIMIT_HEADROOM) * 60
+        )
+        summary["all_pro_estimate"] = all_pro
+        summary["time_saved"] = all_pro - wall_time
+    return summary
+
+def log_cascade_summary(summary: Dict[str, Any]):
+    logger.info(
+        f"Cascade summary: {summary['proposals']} proposals, {summary['flash']} accepted from flash, "
+        f"{summary['pro']} escalated to pro {summary['escalations']}"
+    )
+    if "time_saved" in summary:
+        logger.info(
+            f"Cascade took {summary['wall_time']:.1f}s "
+            f"vs ~{summary['all_pro_estimate']:.1f}s estimated for pro on everything "
+            f"(saved ~{summary['time_saved']:.1f}s)"
+        )
+    else:
+        logger.info("No pro calls were made, time saved versus pro on everything cannot be estimated")
@@ -0,0 +1,100 @@
+import os
+import re
+import json
+import hashlib
+import logging
+from pathlib import Path
+from typing import List, Dict, Any, Set, Iterable
+
+from src import config
+from src.db_loader import is_database_url
+
+logger = logging.getLogger(__name__)
+
+def journal_path_for(output_file: str) -> str:
+    """Journal file that sits next to an output file"""
+    return os.path.splitext(str(output_file))[0] + ".journal.jsonl"
+
+def source_fingerprint(proposal_file: str = None, conference: str = None) -> str:
+    """Short hash identifying a proposal source: the absolute file path or the database URL, plus the conference"""
+    source = str(proposal_file or config.PROPOSAL_FILE)
+    if not is_database_url(source):
+        source = os.path.abspath(source)
+    return hashlib.sha256(f"{source}\n{conference or ''}".encode("utf-8")).hexdigest()[:12]
+
+def run_journal_path(prompt_file: str, model_name: str, source: str, run: Dict[str, str]) -> Path:
+    """Journal of a (prompt, model, proposal source) run; independent of the dated output file name
+
+    Keyed on the run fingerprints too (see `run_fingerprints`), so a run with other settings never resumes it.
+    """
+    model = re.sub(r"[^\w.-]", "_", model_name)
+    settings = hashlib.sha256(json.dumps(run, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    return config.JOURNAL_DIR / f"{Path(prompt_file).stem}_{model}_{source}_{settings}.journal.jsonl"
+
+class ReviewJournal:
+    """Append-only, fsync'd JSONL journal of completed reviews"""
+    
+    def __init__(self, path: str):
+        self.path = str(path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._repair()
+    
+    def _repair(self):
+        """Drop a torn trailing line left behind by a crash mid-write"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            if not data or data.endswith(b"\n"):
+                return
+            keep = data.rfind(b"\n") + 1
+            logger.warning(f"Discarding incomplete trailing record in journal {self.path}")
+            f.truncate(keep)
+    
+    def append(self, record: Dict[str, Any]):
+        """Durably append one record; returns only after it is on disk"""
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def extend(self, records: Iterable[Dict[str, Any]]):
+        """Durably append many records with a single fsync"""
+        lines = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        if not lines:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def load(self) -> List[Dict[str, Any]]:
+        """Read all records; a later record for the same proposal replaces an earlier one"""
+        if not os.path.exists(self.path):
+            return []
+        records = {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping corrupt journal line {line_no} in {self.path}")
+                    continue
+                records[str(record.get("proposal_id"))] = record
+        return list(records.values())
+    
+    def processed_ids(self) -> Set[str]:
+        return {str(record.get("proposal_id")) for record in self.load()}
+    
+    def reset(self):
+        """Start over with an empty journal"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+def compile_results(records: List[Dict[str, Any]], proposal_ids: Iterable[str]) -> List[Dict[str, Any]]:
+    """Order journal records by proposal order, keeping only the given proposals"""
+    by_id = {str(record.get("proposal_id")): record for record in records}
+    return [by_id[proposal_id] for proposal_id in map(str, proposal_ids) if proposal_id in by_id]
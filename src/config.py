@@ -11,28 +11,126 @@ DATA_DIR = BASE_DIR / "data"
 PROMPT_DIR = BASE_DIR / "prompt"
 OUTPUT_DIR = BASE_DIR / "output"
 LOGS_DIR = BASE_DIR / "logs"
+CACHE_DIR = BASE_DIR / "cache"
+
+# Logging, configured once by the entry point (logs/<entry point>_<date>.log plus the console)
+LOG_LEVEL = "INFO"
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
 # Prompt files
 SIMPLE_PROMPT_FILE = PROMPT_DIR / "simple_prompt.txt"
 FULL_PROMPT_FILE = PROMPT_DIR / "full_prompt.txt"
+BATCH_INSTRUCTION_FILE = PROMPT_DIR / "batch_instruction.txt"
 
 # Model configurations
 FLASH_MODEL = "gemini-2.0-flash"
 PRO_MODEL = "gemini-2.0-pro-exp-02-05"
+TEMPERATURE = 0
 
 # Default settings
-DEFAULT_SLEEP_TIME = 20
+DEFAULT_SLEEP_TIME = 20  # upper bound on the exponential backoff between retries
 MAX_RETRIES = 6
+BACKOFF_BASE = 2
+DEFAULT_CONCURRENCY = 4
+DEFAULT_BATCH_SIZE = 1  # proposals per request; 1 disables batched prompting
+
+# Cascade mode: review with flash, escalate to pro on these votes, schema failures or disagreeing samples
+CASCADE_ESCALATE_VOTES = ['+0', '-0']
+CASCADE_SAMPLES = 1  # flash samples per proposal; more than one enables the disagreement rule
+CASCADE_SAMPLE_TEMPERATURE = 0.7  # flash temperature when sampling more than once
+
+# Self-consistency: sample each proposal up to ENSEMBLE_SAMPLES times (1 disables) and take the
+# majority vote; sampling stops early once the majority is settled or at least ENSEMBLE_MIN_SAMPLES
+# samples agree at ENSEMBLE_STOP_CONFIDENCE
+ENSEMBLE_SAMPLES = 1
+ENSEMBLE_MIN_SAMPLES = 3
+ENSEMBLE_STOP_CONFIDENCE = 1.0  # share of the samples voting with the majority
+ENSEMBLE_TEMPERATURE = 0.7
+ENSEMBLE_LOW_CONFIDENCE = 0.6  # reported in the run summary
+
+# Near-duplicate detection (MinHash/LSH over the proposal text): off, flag, reuse or seed
+DEDUP_MODES = ["off", "flag", "reuse", "seed"]
+DEDUP_MODE = "off"
+DEDUP_THRESHOLD = 0.8  # estimated Jaccard similarity of character shingles
+DEDUP_SHINGLE_SIZE = 5
+DEDUP_NUM_PERM = 64
+DEDUP_BANDS = 16
+
+# Per-model quotas (requests / tokens per minute), shared by all concurrent requests
+MODEL_RATE_LIMITS = {
+    FLASH_MODEL: {"rpm": 2000, "tpm": 4_000_000},
+    PRO_MODEL: {"rpm": 10, "tpm": 1_000_000},
+}
+RATE_LIMIT_HEADROOM = 0.9  # stay just under quota
+ESTIMATED_OUTPUT_TOKENS = 500
+
+# USD per million tokens, for cost estimates in the per-call telemetry
+MODEL_PRICING = {
+    FLASH_MODEL: {"input": 0.10, "cached_input": 0.025, "output": 0.40},
+    PRO_MODEL: {"input": 0.0, "output": 0.0},  # experimental model, free of charge
+}
+
+# Prompt prefix reuse: off, client (render the static instructions once and send them as a
+# system message) or provider (keep them in a Gemini context cache so requests carry only the proposal)
+PREFIX_CACHE_MODES = ["off", "client", "provider"]
+PREFIX_CACHE_MODE = "off"
+CONTEXT_CACHE_TTL = 3600  # seconds; extended while a run is still using the cache
+
+# Review worker (python -m src.worker): SQLite job queue of proposal ids, polled while idle;
+# a job that fails this many times is marked failed until `python -m src.job_queue retry-failed`
+QUEUE_FILE = OUTPUT_DIR / "review_queue.sqlite"
+WORKER_POLL_INTERVAL = 5.0  # seconds
+WORKER_MAX_ATTEMPTS = 3
+
+# Review journals of interrupted runs, one per (prompt, model, proposal source) so a restart after
+# midnight (a new dated output file) still resumes; removed once the run's output is complete
+JOURNAL_DIR = OUTPUT_DIR / "journals"
+
+# Run manifests for --incremental: fingerprints of the prompt, schema, model and every proposal
+# of the last run per (prompt, model, proposal source), so the next run only reviews new or changed proposals
+MANIFEST_DIR = OUTPUT_DIR / "manifests"
+
+# Response cache
+CACHE_FILE = CACHE_DIR / "llm_responses.sqlite"
+CACHE_MAX_ENTRIES = 50_000
+CACHE_EVICT_BATCH = 500  # entries dropped at once when the cache is full, so eviction runs once per this many writes
+
+# Storage format for LLM outputs and the merged table (parquet, feather, csv, jsonl or xlsx);
+# inputs are read by file extension. Excel is kept for the Metabase exports and --export-excel.
+SUPPORTED_FORMATS = ["parquet", "feather", "csv", "jsonl", "xlsx"]
+TABLE_FORMAT = "parquet"
+# LLM results are streamed to the output file as they arrive, at most this many rows buffered
+# (one Parquet row group per flush); CSV/JSONL outputs can be followed while the run is going
+OUTPUT_BUFFER_ROWS = 200
+
+# Database source (used when --proposal-file / --review-file is a sqlite:/// or postgresql:// URL)
+DB_POOL_SIZE = 4
+DB_CHUNK_SIZE = 1000
+# Ids per `WHERE id IN (...)` query when fetching selected proposals (e.g. the ids a worker claimed)
+DB_ID_BATCH = 500
+
+# Rows per chunk when streaming review tables in the merge step (--streaming)
+MERGE_CHUNK_SIZE = 100_000
+
+# Agreement analysis: bootstrap resamples for confidence intervals, resampled in blocks of
+# at most BOOTSTRAP_BLOCK_CELLS (resamples x proposals) weights, one process per variant
+BOOTSTRAP_RESAMPLES = 2000
+BOOTSTRAP_CI_LEVEL = 0.95
+BOOTSTRAP_BLOCK_CELLS = 2_000_000
+ANALYSIS_WORKERS = 1
 
 # Data files
 PROPOSAL_FILE = DATA_DIR / "pycon_2024_proposal.xlsx"
 REVIEW_FILE = DATA_DIR / "pycon_2024_review.xlsx"
-SIMPLE_PROMPT_OUTPUT = OUTPUT_DIR / "simple_prompt_gemini_flash_{date}.xlsx"
-FULL_PROMPT_OUTPUT = OUTPUT_DIR / "full_prompt_gemini_flash_{date}.xlsx"
-MERGED_OUTPUT = OUTPUT_DIR / "pycon_2024_proposal_with_llm_and_review_{date}.xlsx"
+SIMPLE_PROMPT_OUTPUT = OUTPUT_DIR / "simple_prompt_gemini_flash_{date}.{ext}"
+FULL_PROMPT_OUTPUT = OUTPUT_DIR / "full_prompt_gemini_flash_{date}.{ext}"
+MERGED_OUTPUT = OUTPUT_DIR / "pycon_2024_proposal_with_llm_and_review_{date}.{ext}"
 ANALYSIS_OUTPUT = OUTPUT_DIR / "vote_analysis_{date}.json"
 ANALYSIS_REPORT = OUTPUT_DIR / "vote_analysis_{date}.txt"
 
+# Memory-mapped proposal text stores (python -m src.text_store), usable wherever a proposal file is
+TEXT_STORE_SUFFIX = ".texts"
+
 # Proposal info columns to extract
 PROPOSAL_INFO_COLUMNS = [
     'title',
@@ -40,4 +138,15 @@ PROPOSAL_INFO_COLUMNS = [
     'detailed_description',
     'outline',
     'objective'
-] 
\ No newline at end of file
+]
+
+# Per-proposal token budget for the PROPOSAL_INFO payload (None disables truncation);
+# fields are cut in this order until the payload fits, title is never cut
+PAYLOAD_TOKEN_BUDGET = 2000
+PAYLOAD_TRUNCATION_PRIORITY = [
+    'detailed_description',
+    'outline',
+    'objective',
+    'abstract'
+]
+PAYLOAD_MIN_FIELD_TOKENS = 50  # a field that would be cut below this is dropped instead 
\ No newline at end of file
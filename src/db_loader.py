@@ -0,0 +1,187 @@
+import queue
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import pandas as pd
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+# Placeholder abstracts excluded from review (see pycon_llm_sql)
+EMPTY_ABSTRACTS = ('', 'None', '<empty content>', '(No content) - processed by the program team', 'na', 'test')
+
+PROPOSAL_COLUMNS = ['id', 'conference'] + config.PROPOSAL_INFO_COLUMNS
+REVIEW_COLUMNS = ['id', 'proposal_id', 'reviewer_id', 'vote', 'comment']
+
+def is_database_url(path) -> bool:
+    """Whether a data source is a database URL rather than a file path"""
+    return urlparse(str(path)).scheme in ("sqlite", "postgres", "postgresql")
+
+def _connect(url: str):
+    """Open a DB-API connection for a sqlite:/// or postgresql:// URL"""
+    parsed = urlparse(url)
+    if parsed.scheme == "sqlite":
+        # sqlite:///relative.db 或 sqlite:////absolute/path.db
+        return sqlite3.connect(parsed.path[1:] if parsed.path.startswith("/") else parsed.path, check_same_thread=False)
+    try:
+        import psycopg2
+    except ImportError as e:
+        raise ImportError("psycopg2 is required for PostgreSQL sources: pip install psycopg2-binary") from e
+    return psycopg2.connect(url)
+
+class ConnectionPool:
+    """Small thread-safe pool of DB-API connections to one database"""
+    
+    def __init__(self, url: str, size: int = config.DB_POOL_SIZE):
+        self.url = url
+        self.scheme = urlparse(url).scheme
+        self.paramstyle = "qmark" if self.scheme == "sqlite" else "format"
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._slots = threading.BoundedSemaphore(size)
+    
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = _connect(self.url)
+            try:
+                yield conn
+            finally:
+                # Read-only use: end the transaction so the connection is clean for reuse
+                conn.rollback()
+                self._idle.put_nowait(conn)
+        finally:
+            self._slots.release()
+    
+    def placeholder(self) -> str:
+        return "?" if self.paramstyle == "qmark" else "%s"
+    
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+_pools = {}
+
+def get_pool(url: str) -> ConnectionPool:
+    if url not in _pools:
+        _pools[url] = ConnectionPool(url)
+    return _pools[url]
+
+def stream_query(pool: ConnectionPool, sql: str, params: Tuple = (), chunk_size: int = config.DB_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Run a query and yield its rows as DataFrame chunks without fetching the whole result"""
+    with pool.connection() as conn:
+        # PostgreSQL 需要具名 (server-side) cursor 才會真正分批取資料
+        cursor = conn.cursor("pycon_llm_stream") if pool.scheme != "sqlite" else conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            columns = None
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if columns is None and cursor.description is not None:
+                    columns = [d[0] for d in cursor.description]
+                if not rows:
+                    break
+                yield pd.DataFrame.from_records(rows, columns=columns)
+        finally:
+            cursor.close()
+
+def _proposal_filters(
+    pool: ConnectionPool,
+    conference: Optional[str],
+    exclude_empty: bool,
+    proposal_ids: Optional[List[str]] = None
+) -> Tuple[str, List]:
+    """WHERE clause shared by the proposal and review queries"""
+    ph = pool.placeholder()
+    clauses, params = ["1=1"], []
+    if conference:
+        clauses.append(f"pt.conference = {ph}")
+        params.append(conference)
+    if proposal_ids is not None:
+        clauses.append(f"pt.id IN ({', '.join([ph] * len(proposal_ids))})")
+        params.extend(proposal_ids)
+    if exclude_empty:
+        clauses.append(f"pt.abstract NOT IN ({', '.join([ph] * len(EMPTY_ABSTRACTS))})")
+        params.extend(EMPTY_ABSTRACTS)
+        clauses.append("length(pt.abstract) <> 1")
+    return " AND ".join(clauses), params
+
+def iter_proposals(
+    url: str,
+    conference: Optional[str] = None,
+    exclude_empty: bool = True,
+    chunk_size: int = config.DB_CHUNK_SIZE,
+    proposal_ids: Optional[List[str]] = None,
+    columns: List[str] = PROPOSAL_COLUMNS
+) -> Iterator[pd.DataFrame]:
+    """Stream the `columns` of proposals_talkproposal rows in chunks, optionally only those with the given ids"""
+    pool = get_pool(url)
+    if proposal_ids is None:
+        id_batches = [None]
+    else:
+        # Bounded IN lists keep every query under the driver's bound-parameter limit
+        proposal_ids = list(proposal_ids)
+        id_batches = [proposal_ids[i:i + config.DB_ID_BATCH] for i in range(0, len(proposal_ids), config.DB_ID_BATCH)]
+    select = ', '.join(f'pt.{col}' for col in columns)
+    for ids in id_batches:
+        where, params = _proposal_filters(pool, conference, exclude_empty, ids)
+        sql = f"SELECT {select} FROM proposals_talkproposal pt WHERE {where} ORDER BY pt.id"
+        for chunk in stream_query(pool, sql, tuple(params), chunk_size):
+            chunk['id'] = chunk['id'].astype(str)
+            yield chunk
+
+def iter_reviews(
+    url: str,
+    conference: Optional[str] = None,
+    exclude_empty: bool = True,
+    chunk_size: int = config.DB_CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """Stream reviews_review rows for the selected proposals in chunks"""
+    pool = get_pool(url)
+    where, params = _proposal_filters(pool, conference, exclude_empty)
+    sql = (
+        f"SELECT {', '.join(f'rr.{col}' for col in REVIEW_COLUMNS)} "
+        f"FROM reviews_review rr JOIN proposals_talkproposal pt ON pt.id = rr.proposal_id "
+        f"WHERE {where} ORDER BY rr.proposal_id"
+    )
+    for chunk in stream_query(pool, sql, tuple(params), chunk_size):
+        chunk['proposal_id'] = chunk['proposal_id'].astype(str)
+        chunk['vote'] = chunk['vote'].astype(str)
+        yield chunk
+
+def load_proposals(
+    url: str,
+    conference: Optional[str] = None,
+    limit: int = None,
+    proposal_ids: Optional[List[str]] = None,
+    columns: List[str] = PROPOSAL_COLUMNS
+) -> pd.DataFrame:
+    """Load the `columns` of proposals from the database (only `proposal_ids` if given), stopping early once `limit` rows are read"""
+    if proposal_ids is None:
+        logger.info(f"Loading proposals from database (conference={conference})")
+    chunks, total = [], 0
+    for chunk in iter_proposals(url, conference, proposal_ids=proposal_ids, columns=columns):
+        chunks.append(chunk)
+        total += len(chunk)
+        if limit is not None and limit > 0 and total >= limit:
+            break
+    if not chunks:
+        return pd.DataFrame(columns=columns)
+    df = pd.concat(chunks, ignore_index=True)
+    return df.head(limit) if limit is not None and limit > 0 else df
+
+def load_reviews(url: str, conference: Optional[str] = None) -> pd.DataFrame:
+    """Load reviews from the database"""
+    logger.info(f"Loading reviews from database (conference={conference})")
+    chunks = list(iter_reviews(url, conference))
+    if not chunks:
+        return pd.DataFrame(columns=REVIEW_COLUMNS)
+    return pd.concat(chunks, ignore_index=True)
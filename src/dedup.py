@@ -0,0 +1,159 @@
+import logging
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Tuple, Union, Mapping
+
+import numpy as np
+import pandas as pd
+
+from src import config
+from src.text_utils import normalize_text
+from src.text_store import TextStore, JoinedTexts
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_SHINGLE_BASE = np.uint64(1_000_003)
+
+def proposal_texts(proposal_df: pd.DataFrame, columns: List[str] = config.PROPOSAL_INFO_COLUMNS) -> Dict[str, str]:
+    """Normalized, lower-cased proposal text keyed by id, the input of the near-duplicate index"""
+    texts = {}
+    for proposal_id, record in zip(proposal_df['id'], proposal_df[columns].to_dict(orient='records')):
+        if proposal_id not in texts:
+            texts[proposal_id] = " ".join(text for value in record.values() if (text := normalize_text(value))).lower()
+    return texts
+
+def shingle_hashes(text: str, size: int = config.DEDUP_SHINGLE_SIZE) -> np.ndarray:
+    """Distinct 32-bit hashes of the character n-grams of a text (character shingles work for Chinese and English alike)"""
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    if len(codes) < size:
+        size = max(1, len(codes))
+        if not len(codes):
+            return np.zeros(1, dtype=np.uint64)
+    # Polynomial rolling hash over each window, wrapping mod 2^64
+    hashes = np.zeros(len(codes) - size + 1, dtype=np.uint64)
+    for offset in range(size):
+        hashes = hashes * _SHINGLE_BASE + codes[offset:offset + len(hashes)]
+    return np.unique((hashes ^ (hashes >> np.uint64(32))) & np.uint64(0xFFFFFFFF))
+
+class NearDuplicateIndex:
+    """MinHash signatures with LSH banding, for finding proposals above a Jaccard similarity threshold"""
+
+    def __init__(
+        self,
+        num_perm: int = config.DEDUP_NUM_PERM,
+        bands: int = config.DEDUP_BANDS,
+        threshold: float = config.DEDUP_THRESHOLD,
+        seed: int = 0
+    ):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.signatures: Dict[str, np.ndarray] = {}
+        self.buckets = [defaultdict(list) for _ in range(bands)]
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature: per permutation, the minimum of ((a*x + b) mod p) mod 2^32 over the shingle hashes"""
+        shingles = shingle_hashes(text)
+        # uint64 overflow wraps a*x the same way datasketch does; the low 32 bits are the permuted hash
+        permuted = ((self.a[:, None] * shingles[None, :] + self.b[:, None]) % _MERSENNE_PRIME) & _MAX_HASH
+        return permuted.min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def add(self, key: str, text: str = None, signature: np.ndarray = None):
+        if signature is None:
+            signature = self.signature(text)
+        self.signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self.buckets[band][band_key].append(key)
+
+    def query(self, text: str = None, signature: np.ndarray = None) -> List[Tuple[str, float]]:
+        """Indexed keys whose estimated Jaccard similarity reaches the threshold, most similar first"""
+        if signature is None:
+            signature = self.signature(text)
+        candidates = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self.buckets[band].get(band_key, ()))
+        matches = []
+        for key in candidates:
+            similarity = float(np.mean(self.signatures[key] == signature))
+            if similarity >= self.threshold:
+                matches.append((key, similarity))
+        return sorted(matches, key=lambda match: -match[1])
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+def find_near_duplicates(
+    texts: Dict[str, str],
+    prior_texts: Optional[Dict[str, str]] = None,
+    threshold: float = config.DEDUP_THRESHOLD
+) -> Dict[str, Tuple[str, float]]:
+    """Map each proposal to the earlier (prior-run or same-run) proposal it nearly duplicates"""
+    index = NearDuplicateIndex(threshold=threshold)
+    for key, text in (prior_texts or {}).items():
+        index.add(key, text)
+
+    # 只把非重複的 proposal 加入索引，讓每組重複投稿都指向同一篇代表
+    matches = {}
+    for proposal_id, text in texts.items():
+        signature = index.signature(text)
+        found = [match for match in index.query(signature=signature) if match[0] != proposal_id]
+        if found:
+            matches[proposal_id] = found[0]
+        else:
+            index.add(proposal_id, signature=signature)
+
+    prior = sum(match_id in (prior_texts or {}) for match_id, _ in matches.values())
+    logger.info(f"Found {len(matches)} near-duplicate proposals at similarity >= {threshold} "
+                f"({prior} of prior runs, {len(matches) - prior} within this run)")
+    return matches
+
+def load_prior_reviews(
+    prior_proposals: Union[pd.DataFrame, TextStore],
+    prior_review_df: pd.DataFrame
+) -> Tuple[Mapping[str, str], Dict[str, Dict[str, Any]]]:
+    """Texts and LLM reviews of earlier proposals, keyed 'prior:<id>' so they never clash with this run's ids
+    
+    With a text store the texts are joined on access instead of held in memory.
+    """
+    reviews = {
+        f"prior:{review['proposal_id']}": review
+        for review in prior_review_df.drop_duplicates('proposal_id').to_dict(orient='records')
+    }
+    if isinstance(prior_proposals, TextStore):
+        texts = JoinedTexts(prior_proposals, [key[len("prior:"):] for key in reviews], prefix="prior:")
+    else:
+        texts = {
+            f"prior:{proposal_id}": text
+            for proposal_id, text in proposal_texts(prior_proposals).items()
+            if f"prior:{proposal_id}" in reviews
+        }
+    logger.info(f"Indexed {len(texts)} reviewed prior proposals for near-duplicate lookup")
+    return texts, reviews
+
+def format_prior_review(review: Dict[str, Any]) -> str:
+    """Prior review text appended to a proposal payload in seed mode"""
+    return f"(review of a near-identical earlier submission) vote {review['vote']}. {review['comment']}"
+
+# Columns set on flagged or reused near-duplicates only, with their types for fixed-schema outputs
+DUPLICATE_COLUMNS = {"duplicate_of": str, "similarity": float, "reused": bool}
+
+def annotate_duplicate(review_dict: Dict[str, Any], matches: Dict[str, Tuple[str, float]]) -> Dict[str, Any]:
+    """Add duplicate_of / similarity to a review of a flagged proposal"""
+    match = matches.get(review_dict['proposal_id'])
+    if match is not None:
+        review_dict.update(duplicate_of=match[0], similarity=round(match[1], 3))
+    return review_dict
+
+def reused_review(review: Dict[str, Any], proposal_id: str, match: Tuple[str, float]) -> Dict[str, Any]:
+    """Copy of an earlier review standing in for a near-duplicate proposal, without a new LLM call"""
+    return dict(review, proposal_id=proposal_id, duplicate_of=match[0], similarity=round(match[1], 3), reused=True)
@@ -0,0 +1,72 @@
+import logging
+from collections import Counter
+from typing import List, Dict, Any
+
+import pandas as pd
+
+from src import config
+from src.agreement import VOTE_ORDER
+from src.merge_data import vote_statistics_from_counts
+
+logger = logging.getLogger(__name__)
+
+def should_stop(votes: List[str], samples: int, min_samples: int = config.ENSEMBLE_MIN_SAMPLES) -> bool:
+    """Whether a proposal needs no more samples: all K drawn, the majority can no longer change, or it is confident enough"""
+    remaining = samples - len(votes)
+    if remaining <= 0:
+        return True
+    if not votes:
+        return False
+    counts = [count for _, count in Counter(votes).most_common(2)] + [0]
+    # 剩下的樣本全投給第二名也追不上，多數決已確定
+    if counts[0] - counts[1] > remaining:
+        return True
+    return len(votes) >= min_samples and counts[0] / len(votes) >= config.ENSEMBLE_STOP_CONFIDENCE
+
+def sample_vote_statistics(votes: List[str]) -> Dict[str, Any]:
+    """Mode, counts, mean, std and median of one proposal's sampled votes, computed like the human vote statistics"""
+    counts = pd.DataFrame(
+        [[votes.count(vote) for vote in VOTE_ORDER]],
+        index=pd.Index(['_'], name='proposal_id'),
+        columns=pd.Index(VOTE_ORDER, name='vote')
+    )
+    stats = vote_statistics_from_counts(counts).iloc[0]
+    result = {
+        'vote': stats['vote_most_common_vote'],
+        'samples': int(stats['vote_int_count']),
+        'sample_mean': float(stats['vote_int_mean']),
+        'sample_std': float(stats['vote_int_std']),
+        'sample_median': float(stats['vote_int_median']),
+    }
+    for vote in VOTE_ORDER:
+        result[f'sample_counts_{vote}'] = int(stats[f'vote_counts_{vote}'])
+    # Confidence: share of the samples that agree with the majority vote
+    result['confidence'] = result[f"sample_counts_{result['vote']}"] / result['samples']
+    return result
+
+def aggregate_samples(reviews: List[Dict[str, Any]], samples: int) -> Dict[str, Any]:
+    """One review from K sampled reviews: the majority vote with the text of a sample that voted it"""
+    stats = sample_vote_statistics([review['vote'] for review in reviews])
+    representative = next(review for review in reviews if review['vote'] == stats['vote'])
+    return dict(representative, **stats, early_stopped=len(reviews) < samples)
+
+def ensemble_summary(results: List[Dict[str, Any]], samples: int) -> Dict[str, Any]:
+    """Calls made against the full K per proposal, early stops and confidence across a run"""
+    drawn = [result['samples'] for result in results if 'samples' in result]
+    confidence = [result['confidence'] for result in results if 'confidence' in result]
+    return {
+        "proposals": len(drawn),
+        "calls": sum(drawn),
+        "max_calls": len(drawn) * samples,
+        "early_stopped": sum(bool(result.get('early_stopped')) for result in results),
+        "mean_confidence": sum(confidence) / len(confidence) if confidence else float('nan'),
+        "low_confidence": sum(value < config.ENSEMBLE_LOW_CONFIDENCE for value in confidence),
+    }
+
+def log_ensemble_summary(summary: Dict[str, Any]):
+    saved = summary['max_calls'] - summary['calls']
+    logger.info(
+        f"Self-consistency summary: {summary['proposals']} proposals, {summary['calls']}/{summary['max_calls']} samples drawn "
+        f"({saved} saved by {summary['early_stopped']} early stops), mean confidence {summary['mean_confidence']:.2f}, "
+        f"{summary['low_confidence']} below {config.ENSEMBLE_LOW_CONFIDENCE}"
+    )
@@ -0,0 +1,255 @@
+import json
+import time
+import zlib
+import random
+import asyncio
+from types import SimpleNamespace
+from typing import List, Dict, Any, Optional, Callable
+
+from pydantic import ValidationError, PrivateAttr
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+from src.models import ProposalReview
+from src.rate_limit import estimate_tokens
+
+class FakeReviewChain:
+    """Offline stand-in for the chain returned by setup_llm_chain, with injected latency
+    
+    `vote_sampler(inputs, rng)` draws the vote per call instead of the fixed `vote`, e.g. to mimic sampling noise.
+    """
+    
+    def __init__(
+        self,
+        latency: float = 0.5,
+        jitter: float = 0.0,
+        vote: str = '+0',
+        seed: int = None,
+        vote_sampler: Optional[Callable[[Dict[str, Any], random.Random], str]] = None
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.vote = vote
+        self.vote_sampler = vote_sampler
+        self.calls = 0
+        self._random = random.Random(seed)
+    
+    def _delay(self) -> float:
+        return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+    
+    def _review(self, inputs: Dict[str, Any]) -> ProposalReview:
+        self.calls += 1
+        return ProposalReview(
+            summary=str(inputs.get("PROPOSAL_INFO", ""))[:50],
+            comment="fake review",
+            vote=self.vote_sampler(inputs, self._random) if self.vote_sampler else self.vote
+        )
+    
+    def invoke(self, inputs: Dict[str, Any], config=None) -> ProposalReview:
+        time.sleep(self._delay())
+        return self._review(inputs)
+    
+    async def ainvoke(self, inputs: Dict[str, Any], config=None) -> ProposalReview:
+        await asyncio.sleep(self._delay())
+        return self._review(inputs)
+    
+    async def abatch(self, inputs: List[Dict[str, Any]], config=None, **kwargs) -> List[ProposalReview]:
+        return list(await asyncio.gather(*(self.ainvoke(item) for item in inputs)))
+
+class _FakeCaches:
+    """The `caches` service of FakeGenAIClient"""
+    
+    def __init__(self, min_tokens: int = 0):
+        self.min_tokens = min_tokens
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.uploads = 0
+        self.uploaded_tokens = 0
+    
+    def create(self, model: str, config):
+        tokens = estimate_tokens(config.system_instruction)
+        if tokens < self.min_tokens:
+            raise ValueError(f"Cached content is too small: {tokens} tokens, minimum is {self.min_tokens}")
+        name = f"cachedContents/fake-{len(self.entries)}"
+        self.entries[name] = {"model": model, "tokens": tokens, "expires": time.time() + float(config.ttl.rstrip("s"))}
+        self.uploads += 1
+        self.uploaded_tokens += tokens
+        return SimpleNamespace(name=name)
+    
+    def update(self, name: str, config):
+        self.entries[name]["expires"] = time.time() + float(config.ttl.rstrip("s"))
+    
+    def delete(self, name: str):
+        self.entries.pop(name, None)
+
+class FakeGenAIClient:
+    """Offline stand-in for google.genai.Client: a context-cache registry plus counters of what was sent"""
+    
+    def __init__(self, min_cache_tokens: int = 0):
+        self.caches = _FakeCaches(min_cache_tokens)
+        self.requests = 0
+        self.tokens_sent = 0
+        self.prefix_sends = 0
+    
+    def cached_tokens(self, name: str) -> int:
+        entry = self.caches.entries.get(name)
+        if entry is None or entry["expires"] < time.time():
+            raise ValueError(f"Cached content {name} not found or expired")
+        return entry["tokens"]
+    
+    def record_request(self, tokens: int, cached: bool):
+        """Count one request; without cached content the static instructions travel inline"""
+        self.requests += 1
+        self.tokens_sent += tokens
+        if not cached:
+            self.prefix_sends += 1
+    
+    @property
+    def total_prefix_sends(self) -> int:
+        """Times the static prefix went over the wire: cache uploads plus requests that carried it inline"""
+        return self.caches.uploads + self.prefix_sends
+
+LATENCY_DISTRIBUTIONS = ["constant", "uniform", "exponential", "lognormal"]
+
+class FakeAPIError(Exception):
+    """Transport error raised by FakeGeminiChat, shaped like a Gemini API error (status code, retry hint)"""
+    
+    def __init__(self, status_code: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+def load_recorded_responses(path: str) -> List[Dict[str, Any]]:
+    """Recorded reviews (summary, comment, vote) from an LLM review output file, for FakeGeminiChat to replay"""
+    from src.storage import read_table
+    df = read_table(path, dtype={'vote': str, 'proposal_id': str})
+    df = df[df['vote'].isin(['+1', '+0', '-0', '-1'])]
+    return df[['summary', 'comment', 'vote']].fillna("").to_dict(orient='records')
+
+class FakeGeminiChat(BaseChatModel):
+    """Offline chat model returning a JSON review with Gemini-style usage metadata, honouring cached_content
+    
+    Replays `responses` (recorded reviews, picked by a hash of the prompt so a prompt always gets the same
+    one) after a latency drawn from `latency_distribution` around the median `latency`. Faults are injected
+    as transient 503s (`error_rate`), reviews failing schema validation (`invalid_rate`) and 429 bursts: the
+    last `burst_duration` seconds of every `burst_interval` answer 429 with a retry hint.
+    """
+    
+    latency: float = 0.05
+    latency_distribution: str = "constant"
+    latency_sigma: float = 0.5  # lognormal shape, or the relative half-width of the uniform distribution
+    vote: str = '+0'
+    responses: Optional[List[Dict[str, Any]]] = None
+    error_rate: float = 0.0
+    invalid_rate: float = 0.0
+    burst_interval: float = 0.0
+    burst_duration: float = 0.0
+    seed: Optional[int] = None
+    cached_content: Optional[str] = None
+    client: Any = None
+    calls: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    invalid: int = 0
+    _random: Optional[random.Random] = PrivateAttr(default=None)
+    _started: Optional[float] = PrivateAttr(default=None)
+    
+    @property
+    def _llm_type(self) -> str:
+        return "fake-gemini"
+    
+    @property
+    def rng(self) -> random.Random:
+        if self._random is None:
+            self._random = random.Random(self.seed)
+        return self._random
+    
+    def _delay(self) -> float:
+        if self.latency_distribution == "uniform":
+            return self.rng.uniform(self.latency * (1 - self.latency_sigma), self.latency * (1 + self.latency_sigma))
+        if self.latency_distribution == "exponential":
+            return self.rng.expovariate(1 / self.latency) if self.latency > 0 else 0.0
+        if self.latency_distribution == "lognormal":
+            return self.latency * self.rng.lognormvariate(0, self.latency_sigma)
+        return self.latency
+    
+    def _fault(self) -> Optional[FakeAPIError]:
+        """A 429 inside a burst window, else a transient server error at `error_rate`"""
+        now = time.monotonic()
+        if self._started is None:
+            self._started = now
+        if self.burst_interval > 0:
+            phase = (now - self._started) % self.burst_interval
+            if phase >= self.burst_interval - self.burst_duration:
+                self.rate_limited += 1
+                wait = self.burst_interval - phase
+                return FakeAPIError(429, f"429 RESOURCE_EXHAUSTED: quota exceeded, retry in {wait:.2f}s", retry_after=wait)
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.errors += 1
+            return FakeAPIError(503, "503 UNAVAILABLE: the model is overloaded")
+        return None
+    
+    def _review_json(self, prompt: str) -> str:
+        if self.invalid_rate and self.rng.random() < self.invalid_rate:
+            self.invalid += 1
+            return json.dumps({"summary": "fake summary", "comment": "fake review", "vote": "maybe"})
+        if self.responses:
+            review = self.responses[zlib.crc32(prompt.encode("utf-8")) % len(self.responses)]
+            return json.dumps({key: review[key] for key in ("summary", "comment", "vote")}, ensure_ascii=False)
+        return json.dumps({"summary": "fake summary", "comment": "fake review", "vote": self.vote})
+    
+    def _respond(self, messages) -> ChatResult:
+        prompt = "\n".join(str(message.content) for message in messages)
+        prompt_tokens = sum(estimate_tokens(str(message.content)) for message in messages)
+        cached_tokens = 0
+        if self.client is not None:
+            if self.cached_content:
+                cached_tokens = self.client.cached_tokens(self.cached_content)
+            self.client.record_request(prompt_tokens, cached=bool(self.cached_content))
+        
+        content = self._review_json(prompt)
+        output_tokens = estimate_tokens(content)
+        message = AIMessage(content=content, usage_metadata={
+            "input_tokens": prompt_tokens + cached_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": prompt_tokens + cached_tokens + output_tokens,
+            "input_token_details": {"cache_read": cached_tokens},
+        })
+        return ChatResult(generations=[ChatGeneration(message=message)])
+    
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.calls += 1
+        fault = self._fault()
+        # 429 responses come back at once; server errors after the usual latency
+        if fault is not None and fault.status_code == 429:
+            raise fault
+        time.sleep(self._delay())
+        if fault is not None:
+            raise fault
+        return self._respond(messages)
+    
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.calls += 1
+        fault = self._fault()
+        if fault is not None and fault.status_code == 429:
+            raise fault
+        await asyncio.sleep(self._delay())
+        if fault is not None:
+            raise fault
+        return self._respond(messages)
+    
+    def with_structured_output(self, schema, include_raw: bool = False, **kwargs):
+        """Parse the JSON reply into `schema`, in the same {raw, parsed, parsing_error} shape as Gemini"""
+        def _parse(message: AIMessage):
+            try:
+                parsed, error = schema.model_validate_json(message.content), None
+            except ValidationError as e:
+                if not include_raw:
+                    raise
+                parsed, error = None, e
+            if include_raw:
+                return {"raw": message, "parsed": parsed, "parsing_error": error}
+            return parsed
+        
+        return self | RunnableLambda(_parse)
@@ -0,0 +1,162 @@
+import os
+import time
+import sqlite3
+import logging
+from typing import List, Dict, Optional, Tuple
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ["pending", "running", "done", "failed"]
+
+class ReviewQueue:
+    """SQLite-backed queue of proposal ids waiting for an LLM review, drained by one worker
+
+    Every enqueue bumps the job's version, so a proposal updated while its review is running
+    stays pending and is reviewed again with the new content.
+    """
+
+    def __init__(self, path: str = None):
+        if path is None:
+            path = config.QUEUE_FILE
+        os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+        self.path = str(path)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "proposal_id TEXT PRIMARY KEY, fingerprint TEXT, status TEXT NOT NULL, version INTEGER NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, error TEXT, enqueued_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_status_enqueued ON jobs (status, enqueued_at)")
+
+    def enqueue(self, proposals: Dict[str, Optional[str]]) -> int:
+        """Queue proposals by id; one whose fingerprint matches its last queued one is left alone. Returns the number queued"""
+        now = time.time()
+        before = self._conn.total_changes
+        self._conn.execute("BEGIN IMMEDIATE")
+        self._conn.executemany(
+            "INSERT INTO jobs (proposal_id, fingerprint, status, version, enqueued_at, updated_at) "
+            "VALUES (?, ?, 'pending', 1, ?, ?) "
+            "ON CONFLICT (proposal_id) DO UPDATE SET fingerprint = excluded.fingerprint, status = 'pending', "
+            "version = version + 1, attempts = 0, error = NULL, enqueued_at = excluded.enqueued_at, updated_at = excluded.updated_at "
+            "WHERE excluded.fingerprint IS NULL OR jobs.fingerprint IS NOT excluded.fingerprint OR jobs.status = 'failed'",
+            [(str(proposal_id), fingerprint, now, now) for proposal_id, fingerprint in proposals.items()]
+        )
+        self._conn.execute("COMMIT")
+        queued = self._conn.total_changes - before
+        if queued:
+            logger.info(f"Queued {queued} of {len(proposals)} proposals for review")
+        return queued
+
+    def claim(self, limit: int) -> List[Tuple[str, int]]:
+        """Mark up to `limit` pending jobs running, oldest first; returns (proposal_id, version) pairs"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        jobs = self._conn.execute(
+            "SELECT proposal_id, version FROM jobs WHERE status = 'pending' ORDER BY enqueued_at LIMIT ?", (limit,)
+        ).fetchall()
+        self._conn.executemany(
+            "UPDATE jobs SET status = 'running', updated_at = ? WHERE proposal_id = ?",
+            [(time.time(), proposal_id) for proposal_id, _ in jobs]
+        )
+        self._conn.execute("COMMIT")
+        return jobs
+
+    def complete(self, proposal_id: str, version: int):
+        # No-op when the proposal was queued again meanwhile; it stays pending
+        self._conn.execute(
+            "UPDATE jobs SET status = 'done', error = NULL, updated_at = ? "
+            "WHERE proposal_id = ? AND version = ? AND status = 'running'",
+            (time.time(), proposal_id, version)
+        )
+
+    def fail(self, proposal_id: str, version: int, error: str, max_attempts: int = config.WORKER_MAX_ATTEMPTS):
+        """Put a job back in the queue, or mark it failed after `max_attempts`"""
+        self._conn.execute(
+            "UPDATE jobs SET attempts = attempts + 1, error = ?, updated_at = ?, "
+            "status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END "
+            "WHERE proposal_id = ? AND version = ? AND status = 'running'",
+            (error, time.time(), max_attempts, proposal_id, version)
+        )
+
+    def requeue_running(self) -> int:
+        """Return jobs left running by a worker that died to the queue"""
+        count = self._conn.execute(
+            "UPDATE jobs SET status = 'pending', updated_at = ? WHERE status = 'running'", (time.time(),)
+        ).rowcount
+        if count:
+            logger.warning(f"Re-queued {count} jobs left running by an earlier worker")
+        return count
+
+    def retry_failed(self) -> int:
+        return self._conn.execute(
+            "UPDATE jobs SET status = 'pending', attempts = 0, updated_at = ? WHERE status = 'failed'", (time.time(),)
+        ).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        counts.update(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return counts
+
+    def jobs(self, status: str = None) -> List[Tuple[str, str, float, float]]:
+        """(proposal_id, status, enqueued_at, updated_at) of every job, or of the jobs in one status"""
+        query = "SELECT proposal_id, status, enqueued_at, updated_at FROM jobs"
+        if status is not None:
+            return self._conn.execute(query + " WHERE status = ?", (status,)).fetchall()
+        return self._conn.execute(query).fetchall()
+
+    def failures(self) -> List[Tuple[str, int, str]]:
+        return self._conn.execute(
+            "SELECT proposal_id, attempts, error FROM jobs WHERE status = 'failed' ORDER BY updated_at"
+        ).fetchall()
+
+    def close(self):
+        self._conn.close()
+
+def enqueue_from_source(
+    queue: ReviewQueue,
+    proposal_file: str = None,
+    conference: str = None,
+    token_budget: Optional[int] = config.PAYLOAD_TOKEN_BUDGET
+) -> int:
+    """Queue every proposal in the source whose payload changed since it was last queued"""
+    from src.llm_review import load_proposal_data
+    from src.payload import build_proposal_payloads
+    from src.manifest import proposal_fingerprints
+    proposal_df = load_proposal_data(proposal_file, conference=conference)
+    payloads = build_proposal_payloads(proposal_df, config.PROPOSAL_INFO_COLUMNS, token_budget=token_budget)
+    return queue.enqueue(proposal_fingerprints(payloads))
+
+if __name__ == "__main__":
+    import argparse
+    from src.log_setup import setup_logging
+
+    parser = argparse.ArgumentParser(description="Manage the queue of proposals waiting for the review worker")
+    parser.add_argument("--queue", default=str(config.QUEUE_FILE), help="Queue database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    enqueue = commands.add_parser("enqueue", help="Queue proposals by id, e.g. from a CFP webhook")
+    enqueue.add_argument("proposal_ids", nargs="+")
+    scan = commands.add_parser("scan", help="Queue new and edited proposals from the proposal source")
+    scan.add_argument("--proposal-file", help="Proposal file path or database URL (default: from config)")
+    scan.add_argument("--conference", help="Conference filter for database sources, e.g. pycontw-2025")
+    scan.add_argument("--token-budget", type=int, default=config.PAYLOAD_TOKEN_BUDGET,
+                      help="Per-proposal token budget, as passed to the worker")
+    commands.add_parser("status", help="Show job counts and failed jobs")
+    commands.add_parser("retry-failed", help="Queue failed jobs again")
+
+    args = parser.parse_args()
+    setup_logging("job_queue")
+
+    queue = ReviewQueue(args.queue)
+    if args.command == "enqueue":
+        queue.enqueue(dict.fromkeys(args.proposal_ids))
+    elif args.command == "scan":
+        enqueue_from_source(queue, args.proposal_file, args.conference, args.token_budget)
+    elif args.command == "retry-failed":
+        logger.info(f"Re-queued {queue.retry_failed()} failed jobs")
+    print(", ".join(f"{status}: {count}" for status, count in queue.counts().items()))
+    if args.command == "status":
+        for proposal_id, attempts, error in queue.failures():
+            print(f"failed {proposal_id} after {attempts} attempts: {error}")
+    queue.close()
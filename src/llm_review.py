@@ -1,37 +1,65 @@
 import os
 import time
+import asyncio
 import pandas as pd
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Set, Tuple, Iterable
 import logging
+from dataclasses import dataclass
 
 from langchain_core.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
 
-from src.models import ProposalReview
+from src.models import ProposalReview, ProposalReviewBatch
+from src.cache import ResponseCache, cached
+from src.telemetry import Telemetry, instrumented
+from src.prompt_cache import ContextCache, split_prompt_template, build_split_prompt, keep_context_alive
+from src.dedup import (
+    proposal_texts, find_near_duplicates, load_prior_reviews,
+    format_prior_review, annotate_duplicate, reused_review, DUPLICATE_COLUMNS
+)
+from src.cascade import is_schema_error, escalation_reason, cascade_summary, log_cascade_summary
+from src.ensemble import should_stop, aggregate_samples, ensemble_summary, log_ensemble_summary
+from src.db_loader import is_database_url, load_proposals
+from src.storage import read_table, table_format
+from src.sink import OutputSink, open_sink, export_excel_copy
+from src.payload import build_proposal_payloads
+from src.text_store import TextStore, JoinedTexts, is_text_store
+from src.checkpoint import ReviewJournal, source_fingerprint, run_journal_path, compile_results
+from src.manifest import RunManifest, run_fingerprints, proposal_fingerprints, manifest_path_for
+from src.rate_limit import RateLimiter, get_rate_limiter, rate_limited, backoff_delay, is_rate_limit_error, retry_after_seconds
 from src import config
+from src.log_setup import setup_logging
 
-# Configure logging
-log_file = config.LOGS_DIR / f"llm_review_{datetime.now().strftime('%Y%m%d')}.log"
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
-def load_proposal_data(file_path: str = None, limit: int = None) -> pd.DataFrame:
-    """Load proposal data from Excel file"""
+# Output columns of every review, typed for the fixed-schema output formats
+REVIEW_COLUMNS = dict.fromkeys(ProposalReview.model_fields, str)
+
+def load_proposal_data(
+    file_path: str = None,
+    limit: int = None,
+    conference: str = None,
+    columns: List[str] = config.PROPOSAL_INFO_COLUMNS
+) -> pd.DataFrame:
+    """Load the id and the prompt `columns` of proposals from a table file, text store or proposals database URL"""
     if file_path is None:
         file_path = config.PROPOSAL_FILE
     
+    # Query the proposals database directly instead of a manual export
+    if is_database_url(file_path):
+        return load_proposals(str(file_path), conference=conference, limit=limit, columns=['id'] + columns)
+    
     logger.info(f"Loading proposal data from {file_path}")
+    
+    if is_text_store(file_path):
+        store = TextStore(file_path)
+        df = store.to_frame(limit=limit)[['id'] + columns]
+        store.close()
+        return df
 
     # notice if id is int, may cause overflow
-    df = pd.read_excel(file_path, dtype={'id': str})
+    # The export carries many columns the review never reads, leave them on disk
+    df = read_table(file_path, dtype={'id': str}, columns=['id'] + columns)
     
     # Limit the number of proposals if requested
     if limit is not None and limit > 0:
@@ -40,70 +68,858 @@ def load_proposal_data(file_path: str = None, limit: int = None) -> pd.DataFrame
         
     return df
 
-def setup_llm_chain(prompt_file: str, model_name: str):
-    """Set up the LLM chain with the specified prompt and model"""
+def _load_review_proposals(
+    file_path: str = None,
+    limit: int = None,
+    conference: str = None
+) -> Tuple[pd.DataFrame, Optional[TextStore]]:
+    """Proposals to review; from a text store only the ids, with the open store to decode each proposal's texts from"""
+    if file_path is None:
+        file_path = config.PROPOSAL_FILE
+    if not is_text_store(file_path):
+        return load_proposal_data(file_path, limit, conference=conference), None
+    logger.info(f"Reading proposal texts lazily from {file_path}")
+    store = TextStore(file_path)
+    ids = store.ids[:limit] if limit is not None and limit > 0 else store.ids
+    return pd.DataFrame({'id': ids}), store
+
+def setup_llm_chain(
+    prompt_file: str,
+    model_name: str,
+    rate_limiter: Optional[RateLimiter] = None,
+    cache: Optional[ResponseCache] = None,
+    batch: bool = False,
+    temperature: float = config.TEMPERATURE,
+    split_prefix: bool = False,
+    context_cache: Optional[ContextCache] = None,
+    llm=None
+):
+    """Set up the LLM chain with the specified prompt and model; `llm` replaces Gemini (e.g. a fake chat model)"""
     logger.info(f"Setting up LLM chain with prompt {prompt_file} and model {model_name}")
     
     with open(prompt_file, "r", encoding="utf-8") as f:
         prompt_template = f.read()
     
-    prompt = PromptTemplate(input_variables=['PROPOSAL_INFO'], template=prompt_template)
-    llm = ChatGoogleGenerativeAI(model=model_name, temperature=0)
-    structured_llm = llm.with_structured_output(ProposalReview)
+    # 批次模式：一次送出多篇 proposal，輸出為 reviews 清單
+    schema = ProposalReview
+    if batch:
+        with open(config.BATCH_INSTRUCTION_FILE, "r", encoding="utf-8") as f:
+            prompt_template += f.read()
+        schema = ProposalReviewBatch
+    
+    # 固定的說明前段與每篇 proposal 的後段分開，前段可由 provider context cache 保存，不必每次重送
+    cached_content = None
+    if split_prefix or context_cache is not None:
+        prefix_text, suffix_template = split_prompt_template(prompt_template)
+        if context_cache is not None:
+            cached_content = context_cache.create(prefix_text)
+        prompt = build_split_prompt(prefix_text, suffix_template, include_prefix=cached_content is None)
+        if cached_content is not None:
+            prompt = prompt | keep_context_alive(context_cache)
+    else:
+        prompt = PromptTemplate(input_variables=['PROPOSAL_INFO'], template=prompt_template)
+    
+    if llm is None:
+        # 延遲載入 Gemini client（import 約 0.8 秒），使用 fake model 或只跑 merge 時不需要
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        llm = ChatGoogleGenerativeAI(model=model_name, temperature=temperature, cached_content=cached_content)
+    elif cached_content is not None:
+        llm = llm.model_copy(update={"cached_content": cached_content})
+    structured_llm = instrumented(llm.with_structured_output(schema, include_raw=True))
+    
+    if rate_limiter is not None:
+        structured_llm = rate_limited(structured_llm, rate_limiter)
+    
+    # Cache outside the rate limiter so hits cost neither quota nor latency
+    if cache is not None:
+        structured_llm = cached(structured_llm, cache, model_name, temperature, schema,
+                                context=prefix_text if cached_content is not None else "")
     
     return prompt | structured_llm
 
-def process_proposals(
-    proposal_df: pd.DataFrame,
+async def _review_proposal(
     chain,
-    sleep_time: int = config.DEFAULT_SLEEP_TIME,
-    max_retries: int = config.MAX_RETRIES,
-    processed_proposals: Optional[List[str]] = None
-) -> List[Dict[str, Any]]:
-    """Process proposals through the LLM chain"""
-    result = []
-    
-    if processed_proposals is None:
-        processed_proposals = set()
-    else:
-        processed_proposals = set(processed_proposals)
-    
-    for proposal_id in proposal_df.id:
+    proposal_id: str,
+    proposal_info: str,
+    semaphore: asyncio.Semaphore,
+    sleep_time: int,
+    max_retries: int,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    telemetry: Optional[Telemetry] = None,
+    give_up: Optional[Callable[[Exception], bool]] = None
+) -> Dict[str, Any]:
+    """Review a single proposal, retrying with jittered exponential backoff unless `give_up` says the error is final"""
+    telemetry = telemetry or Telemetry()
+    record = telemetry.start(proposal_id)
+    async with semaphore:
+        record.queue_wait = time.time() - record.started
         start_time = time.time()
-        
-        if proposal_id in processed_proposals:
-            logger.info(f"Skipping already processed proposal: {proposal_id}")
-            continue
-            
         logger.info(f"Processing proposal: {proposal_id}")
-        proposal_info = proposal_df[proposal_df.id == proposal_id][config.PROPOSAL_INFO_COLUMNS].to_dict(orient='records')[0]
         
         for attempt in range(max_retries):
+            record.retries = attempt
             try:
-                review = chain.invoke({"PROPOSAL_INFO": str(proposal_info)})
+                review = await chain.ainvoke({"PROPOSAL_INFO": proposal_info})
                 review_dict = review.model_dump()
                 review_dict['proposal_id'] = proposal_id
-                result.append(review_dict)
                 break
             except Exception as e:
                 logger.error(f"LLM invoke failed for proposal {proposal_id} (Attempt {attempt + 1}/{max_retries}): {e}")
+                if give_up is not None and give_up(e):
+                    telemetry.finish(record, status="failed")
+                    raise
                 if attempt == max_retries - 1:
+                    telemetry.finish(record, status="failed")
                     raise Exception(f"Max retries ({max_retries}) exceeded for proposal {proposal_id}")
-                time.sleep(sleep_time)
+                retry_after = retry_after_seconds(e) if is_rate_limit_error(e) else None
+                await asyncio.sleep(backoff_delay(attempt, cap=sleep_time, retry_after=retry_after))
+        
+        if on_result is not None:
+            on_result(review_dict)
+        telemetry.finish(record)
         
         exec_time = time.time() - start_time
         logger.info(f"Execution time for proposal {proposal_id}: {exec_time:.2f} seconds\n")
+        
+        return review_dict
+
+def _format_batch(batch: Dict[str, str]) -> str:
+    """Render several proposals into one PROPOSAL_INFO block, each tagged with its id"""
+    return "\n\n".join(f"### proposal_id: {proposal_id}\n{proposal_info}" for proposal_id, proposal_info in batch.items())
+
+def _match_batch_reviews(response: ProposalReviewBatch, proposal_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Map returned reviews back to the requested proposal ids, dropping unknown or duplicate ids"""
+    matched = {}
+    for review in response.reviews:
+        proposal_id = str(review.proposal_id).strip() if review.proposal_id is not None else None
+        if proposal_id is None and len(proposal_ids) == 1:
+            proposal_id = proposal_ids[0]
+        if proposal_id in proposal_ids and proposal_id not in matched:
+            review_dict = review.model_dump()
+            review_dict['proposal_id'] = proposal_id
+            matched[proposal_id] = review_dict
+    return matched
+
+async def _review_batch(
+    chain,
+    batch: Dict[str, str],
+    semaphore: asyncio.Semaphore,
+    sleep_time: int,
+    max_retries: int,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    telemetry: Optional[Telemetry] = None
+) -> List[Dict[str, Any]]:
+    """Review several proposals in one request, re-splitting partial or mismatched responses"""
+    proposal_ids = list(batch)
+    matched = {}
+    
+    telemetry = telemetry or Telemetry()
+    record = telemetry.start(",".join(proposal_ids))
+    async with semaphore:
+        record.queue_wait = time.time() - record.started
+        start_time = time.time()
+        logger.info(f"Processing batch of {len(proposal_ids)} proposals: {proposal_ids}")
+        
+        for attempt in range(max_retries):
+            record.retries = attempt
+            try:
+                response = await chain.ainvoke({"PROPOSAL_INFO": _format_batch(batch)})
+                matched = _match_batch_reviews(response, proposal_ids)
+                if not matched:
+                    raise ValueError("response contains no review for the requested proposals")
+                break
+            except Exception as e:
+                logger.error(f"LLM invoke failed for batch {proposal_ids} (Attempt {attempt + 1}/{max_retries}): {e}")
+                # A bad multi-proposal answer is cheaper to split than to retry whole
+                if len(proposal_ids) > 1 and not is_rate_limit_error(e):
+                    break
+                if attempt == max_retries - 1:
+                    telemetry.finish(record, status="failed")
+                    raise Exception(f"Max retries ({max_retries}) exceeded for batch {proposal_ids}")
+                retry_after = retry_after_seconds(e) if is_rate_limit_error(e) else None
+                await asyncio.sleep(backoff_delay(attempt, cap=sleep_time, retry_after=retry_after))
+        
+        if on_result is not None:
+            for review_dict in matched.values():
+                on_result(review_dict)
+        record.reviews = len(matched)
+        telemetry.finish(record, status="ok" if matched else "split")
+        
+        exec_time = time.time() - start_time
+        logger.info(f"Execution time for batch of {len(proposal_ids)}: {exec_time:.2f} seconds\n")
+    
+    # 缺漏或對不上的 proposal 拆成兩半重新送出，直到單篇為止
+    missing = [proposal_id for proposal_id in proposal_ids if proposal_id not in matched]
+    if missing:
+        logger.warning(f"Batch returned {len(matched)}/{len(proposal_ids)} reviews, re-splitting {len(missing)} proposals")
+        half = max(1, len(missing) // 2)
+        halves = [missing[:half], missing[half:]] if len(missing) > 1 else [missing]
+        for part in await asyncio.gather(*(
+            _review_batch(chain, {proposal_id: batch[proposal_id] for proposal_id in ids}, semaphore, sleep_time, max_retries, on_result, telemetry)
+            for ids in halves if ids
+        )):
+            for review_dict in part:
+                matched[review_dict['proposal_id']] = review_dict
+    
+    return [matched[proposal_id] for proposal_id in proposal_ids]
+
+async def _review_cascade(
+    flash_chain,
+    pro_chain,
+    proposal_id: str,
+    proposal_info: str,
+    flash_semaphore: asyncio.Semaphore,
+    pro_semaphore: asyncio.Semaphore,
+    sleep_time: int,
+    max_retries: int,
+    samples: int = config.CASCADE_SAMPLES,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    flash_telemetry: Optional[Telemetry] = None,
+    pro_telemetry: Optional[Telemetry] = None
+) -> Dict[str, Any]:
+    """Review with flash and escalate to pro on a borderline vote, a schema failure or disagreeing samples"""
+    outcomes = await asyncio.gather(*(
+        _review_proposal(flash_chain, proposal_id, proposal_info, flash_semaphore, sleep_time, max_retries,
+                         telemetry=flash_telemetry, give_up=is_schema_error)
+        for _ in range(max(1, samples))
+    ), return_exceptions=True)
+    reviews = [outcome for outcome in outcomes if not isinstance(outcome, BaseException)]
+    errors = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+    
+    reason = escalation_reason(reviews, errors)
+    if reason is None:
+        review_dict = dict(reviews[0], tier="flash", escalation=None)
+    else:
+        logger.info(f"Escalating proposal {proposal_id} to pro: {reason}")
+        review_dict = await _review_proposal(pro_chain, proposal_id, proposal_info, pro_semaphore, sleep_time, max_retries,
+                                             telemetry=pro_telemetry)
+        review_dict.update(tier="pro", escalation=reason)
+    
+    if on_result is not None:
+        on_result(review_dict)
+    return review_dict
+
+async def _review_ensemble(
+    chain,
+    proposal_id: str,
+    proposal_info: str,
+    semaphore: asyncio.Semaphore,
+    sleep_time: int,
+    max_retries: int,
+    samples: int,
+    min_samples: int = config.ENSEMBLE_MIN_SAMPLES,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    telemetry: Optional[Telemetry] = None
+) -> Dict[str, Any]:
+    """Draw up to `samples` reviews concurrently in rounds, stop once the majority is settled, and aggregate them"""
+    reviews = []
+    errors = []
+    round_size = max(1, min(min_samples, samples))
+    while not should_stop([review['vote'] for review in reviews], samples - len(errors), min_samples):
+        size = min(round_size, samples - len(reviews) - len(errors))
+        outcomes = await asyncio.gather(*(
+            _review_proposal(chain, proposal_id, proposal_info, semaphore, sleep_time, max_retries, telemetry=telemetry)
+            for _ in range(size)
+        ), return_exceptions=True)
+        reviews += [outcome for outcome in outcomes if not isinstance(outcome, BaseException)]
+        errors += [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+    
+    # Failed samples only shrink the ensemble; a proposal fails only when every sample did
+    if not reviews:
+        raise errors[0]
+    if errors:
+        logger.warning(f"{len(errors)} of {samples} samples failed for proposal {proposal_id}, aggregating {len(reviews)}")
+    review_dict = aggregate_samples(reviews, samples - len(errors))
+    
+    if on_result is not None:
+        on_result(review_dict)
+    return review_dict
+
+def _drop_failures(outcomes: List[Any], labels: List[str]) -> List[Any]:
+    """Successful outcomes in order; a failure is logged and left out, and the next run reviews it again"""
+    results = []
+    for label, outcome in zip(labels, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error(f"Giving up on {label} for this run: {outcome}")
+        elif isinstance(outcome, BaseException):
+            raise outcome
+        else:
+            results.append(outcome)
+    return results
+
+def _payload_columns(proposal_df: pd.DataFrame) -> List[str]:
+    # Seed mode adds a prior_review column holding the earlier review of a near-duplicate
+    return config.PROPOSAL_INFO_COLUMNS + [column for column in ['prior_review'] if column in proposal_df.columns]
+
+def _pending_payloads(
+    proposal_df: pd.DataFrame,
+    processed_proposals: Optional[List[str]],
+    token_budget: Optional[int] = config.PAYLOAD_TOKEN_BUDGET,
+    payloads: Optional[Dict[str, str]] = None
+) -> Dict[str, str]:
+    """Payloads of the proposals not reviewed yet, keyed by id in proposal order; `payloads` reuses prebuilt ones"""
+    processed_proposals = set(processed_proposals or [])
+    if payloads is None:
+        payloads = build_proposal_payloads(proposal_df, _payload_columns(proposal_df), token_budget=token_budget)
+    pending = {}
+    for proposal_id, proposal_info in payloads.items():
+        if proposal_id in processed_proposals:
+            logger.info(f"Skipping already processed proposal: {proposal_id}")
+            continue
+        pending[proposal_id] = proposal_info
+    return pending
+
+async def aprocess_proposals(
+    proposal_df: pd.DataFrame,
+    chain,
+    sleep_time: int = config.DEFAULT_SLEEP_TIME,
+    max_retries: int = config.MAX_RETRIES,
+    processed_proposals: Optional[List[str]] = None,
+    concurrency: int = config.DEFAULT_CONCURRENCY,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    batch_size: int = config.DEFAULT_BATCH_SIZE,
+    telemetry: Optional[Telemetry] = None,
+    token_budget: Optional[int] = config.PAYLOAD_TOKEN_BUDGET,
+    samples: int = config.ENSEMBLE_SAMPLES,
+    min_samples: int = config.ENSEMBLE_MIN_SAMPLES,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    payloads: Optional[Dict[str, str]] = None
+) -> List[Dict[str, Any]]:
+    """Process proposals concurrently through the LLM chain, returning results in proposal order
+    
+    A proposal that still fails after `max_retries` is left out instead of aborting the others.
+    `semaphore` shares the in-flight slots with other runs in the same event loop, `payloads` skips rebuilding them.
+    """
+    # 同時進行中的請求數量上限，避免一次對 API 送出全部 proposal
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        logger.info(f"Reviewing proposals with concurrency {max(1, concurrency)}")
+    
+    pending = _pending_payloads(proposal_df, processed_proposals, token_budget, payloads)
+    
+    # gather keeps the input order regardless of completion order
+    if batch_size > 1:
+        ids = list(pending)
+        batches = [ids[i:i + batch_size] for i in range(0, len(ids), batch_size)]
+        results = await asyncio.gather(*(
+            _review_batch(chain, {proposal_id: pending[proposal_id] for proposal_id in batch_ids}, semaphore, sleep_time, max_retries, on_result, telemetry)
+            for batch_ids in batches
+        ), return_exceptions=True)
+        results = _drop_failures(results, [f"batch {batch_ids}" for batch_ids in batches])
+        return [review_dict for batch_results in results for review_dict in batch_results]
+    
+    # Self-consistency: several samples per proposal, aggregated by majority vote
+    if samples > 1:
+        results = await asyncio.gather(*(
+            _review_ensemble(chain, proposal_id, proposal_info, semaphore, sleep_time, max_retries,
+                             samples, min_samples, on_result, telemetry)
+            for proposal_id, proposal_info in pending.items()
+        ), return_exceptions=True)
+    else:
+        results = await asyncio.gather(*(
+            _review_proposal(chain, proposal_id, proposal_info, semaphore, sleep_time, max_retries, on_result, telemetry)
+            for proposal_id, proposal_info in pending.items()
+        ), return_exceptions=True)
+    return _drop_failures(results, [f"proposal {proposal_id}" for proposal_id in pending])
+
+def process_proposals(
+    proposal_df: pd.DataFrame,
+    chain,
+    sleep_time: int = config.DEFAULT_SLEEP_TIME,
+    max_retries: int = config.MAX_RETRIES,
+    processed_proposals: Optional[List[str]] = None,
+    concurrency: int = config.DEFAULT_CONCURRENCY,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    batch_size: int = config.DEFAULT_BATCH_SIZE,
+    telemetry: Optional[Telemetry] = None,
+    token_budget: Optional[int] = config.PAYLOAD_TOKEN_BUDGET,
+    samples: int = config.ENSEMBLE_SAMPLES,
+    min_samples: int = config.ENSEMBLE_MIN_SAMPLES
+) -> List[Dict[str, Any]]:
+    """Process proposals through the LLM chain"""
+    return asyncio.run(aprocess_proposals(
+        proposal_df=proposal_df,
+        chain=chain,
+        sleep_time=sleep_time,
+        max_retries=max_retries,
+        processed_proposals=processed_proposals,
+        concurrency=concurrency,
+        on_result=on_result,
+        batch_size=batch_size,
+        telemetry=telemetry,
+        token_budget=token_budget,
+        samples=samples,
+        min_samples=min_samples
+    ))
+
+async def aprocess_cascade(
+    proposal_df: pd.DataFrame,
+    flash_chain,
+    pro_chain,
+    sleep_time: int = config.DEFAULT_SLEEP_TIME,
+    max_retries: int = config.MAX_RETRIES,
+    processed_proposals: Optional[List[str]] = None,
+    concurrency: int = config.DEFAULT_CONCURRENCY,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    samples: int = config.CASCADE_SAMPLES,
+    flash_telemetry: Optional[Telemetry] = None,
+    pro_telemetry: Optional[Telemetry] = None,
+    token_budget: Optional[int] = config.PAYLOAD_TOKEN_BUDGET,
+    payloads: Optional[Dict[str, str]] = None,
+    fallback: Optional[Callable[[], Set[str]]] = None
+) -> List[Dict[str, Any]]:
+    """Review proposals through the flash -> pro cascade, returning results in proposal order; `payloads` skips rebuilding them
     
-    return result
+    `fallback` names the skipped proposals to review after all, in a second pass once the first one is done.
+    """
+    # Separate slots per tier so proposals waiting on the slow pro quota don't block flash reviews
+    flash_semaphore = asyncio.Semaphore(max(1, concurrency))
+    pro_semaphore = asyncio.Semaphore(max(1, concurrency))
+    logger.info(f"Reviewing proposals in cascade mode with concurrency {max(1, concurrency)} and {samples} flash sample(s)")
+    
+    async def _review(pending: Dict[str, str]) -> List[Dict[str, Any]]:
+        results = await asyncio.gather(*(
+            _review_cascade(flash_chain, pro_chain, proposal_id, proposal_info, flash_semaphore, pro_semaphore,
+                            sleep_time, max_retries, samples, on_result, flash_telemetry, pro_telemetry)
+            for proposal_id, proposal_info in pending.items()
+        ), return_exceptions=True)
+        return _drop_failures(results, [f"proposal {proposal_id}" for proposal_id in pending])
+    
+    if payloads is None:
+        payloads = build_proposal_payloads(proposal_df, _payload_columns(proposal_df), token_budget=token_budget)
+    results = await _review(_pending_payloads(proposal_df, processed_proposals, payloads=payloads))
+    retry = fallback() if fallback is not None else set()
+    if retry:
+        results += await _review(_pending_payloads(proposal_df, set(payloads) - retry, payloads=payloads))
+    return results
 
-def save_results(results: List[Dict[str, Any]], output_file: str):
-    """Save results to Excel file"""
+def save_results(results: List[Dict[str, Any]], output_file: str, export_excel: bool = False):
+    """Save results in the format given by the output file extension"""
     logger.info(f"Saving {len(results)} results to {output_file}")
-    df = pd.DataFrame(results)
-    df['proposal_id'] = df['proposal_id'].astype(str)
-    df.to_excel(output_file, index=False)
+    with open_sink(output_file, column_types=REVIEW_COLUMNS) as sink:
+        for review_dict in results:
+            sink.write(dict(review_dict, proposal_id=str(review_dict['proposal_id'])))
+    if export_excel and table_format(output_file) != "xlsx":
+        export_excel_copy(output_file)
     logger.info(f"Results saved to {output_file}")
 
+def _run_cascade(
+    proposal_df: pd.DataFrame,
+    prompt_file: str,
+    flash_model: str,
+    flash_limiter: RateLimiter,
+    pro_limiter: RateLimiter,
+    cache: Optional[ResponseCache],
+    sleep_time: int,
+    max_retries: int,
+    processed_proposals: Optional[List[str]],
+    concurrency: int,
+    on_result: Callable[[Dict[str, Any]], None],
+    samples: int,
+    flash_telemetry: Telemetry,
+    pro_telemetry: Telemetry,
+    prefix_cache: str = config.PREFIX_CACHE_MODE,
+    token_budget: Optional[int] = config.PAYLOAD_TOKEN_BUDGET,
+    llm=None,
+    pro_llm=None,
+    payloads: Optional[Dict[str, str]] = None,
+    fallback: Optional[Callable[[], Set[str]]] = None
+) -> List[Dict[str, Any]]:
+    """Set up both tiers, review through the cascade and log per-tier counts and time saved"""
+    # 多次取樣需要非零溫度，且不能共用快取，否則每次取樣都會得到相同答案
+    flash_temperature = config.TEMPERATURE
+    flash_cache = cache
+    if samples > 1:
+        flash_temperature = config.CASCADE_SAMPLE_TEMPERATURE
+        flash_cache = None
+        logger.info(f"Sampling flash {samples} times at temperature {flash_temperature}, bypassing the response cache for flash")
+    context_caches = {model: ContextCache(model) for model in (flash_model, config.PRO_MODEL)} if prefix_cache == "provider" else {}
+    flash_chain = setup_llm_chain(
+        prompt_file, flash_model, rate_limiter=flash_limiter, cache=flash_cache, temperature=flash_temperature,
+        split_prefix=prefix_cache != "off", context_cache=context_caches.get(flash_model), llm=llm
+    )
+    pro_chain = setup_llm_chain(
+        prompt_file, config.PRO_MODEL, rate_limiter=pro_limiter, cache=cache,
+        split_prefix=prefix_cache != "off", context_cache=context_caches.get(config.PRO_MODEL), llm=pro_llm
+    )
+    
+    start_time = time.time()
+    results = asyncio.run(aprocess_cascade(
+        proposal_df=proposal_df,
+        flash_chain=flash_chain,
+        pro_chain=pro_chain,
+        sleep_time=sleep_time,
+        max_retries=max_retries,
+        processed_proposals=processed_proposals,
+        concurrency=concurrency,
+        on_result=on_result,
+        samples=samples,
+        flash_telemetry=flash_telemetry,
+        pro_telemetry=pro_telemetry,
+        token_budget=token_budget,
+        payloads=payloads,
+        fallback=fallback
+    ))
+    log_cascade_summary(cascade_summary(results, pro_telemetry, time.time() - start_time, concurrency, pro_rpm=pro_limiter.rpm))
+    for context_cache in context_caches.values():
+        context_cache.close()
+    return results
+
+def _find_duplicates(
+    proposal_df: pd.DataFrame,
+    dedup: str,
+    prior_proposal_file: str = None,
+    prior_review_file: str = None,
+    store: Optional[TextStore] = None
+) -> Tuple[pd.DataFrame, Dict[str, Tuple[str, float]], Dict[str, Dict[str, Any]]]:
+    """Find near-duplicates once per run; returns the proposals (seeded in seed mode), the matches and the prior reviews
+
+    With a `store` the texts of this run's proposals are read from it one at a time.
+    """
+    prior_texts, prior_reviews = {}, {}
+    prior_store = None
+    if prior_review_file:
+        # Earlier conferences from a text store are read lazily, one proposal at a time
+        if prior_proposal_file and is_text_store(prior_proposal_file):
+            prior_proposals = prior_store = TextStore(prior_proposal_file)
+        else:
+            prior_proposals = load_proposal_data(prior_proposal_file)
+        prior_texts, prior_reviews = load_prior_reviews(
+            prior_proposals,
+            read_table(prior_review_file, dtype={'vote': str, 'proposal_id': str})
+        )
+    texts = proposal_texts(proposal_df) if store is None else JoinedTexts(store, proposal_df['id'])
+    duplicates = find_near_duplicates(texts, prior_texts)
+    if prior_store is not None:
+        prior_store.close()
+    
+    if dedup == "seed":
+        seeds = {
+            proposal_id: format_prior_review(prior_reviews[match[0]])
+            for proposal_id, match in duplicates.items() if match[0] in prior_reviews
+        }
+        proposal_df = proposal_df.assign(prior_review=proposal_df['id'].map(seeds))
+        logger.info(f"Seeding {len(seeds)} near-duplicate proposals with their prior review")
+    return proposal_df, duplicates, prior_reviews
+
+def _reuse_prior_reviews(
+    journal: ReviewJournal,
+    processed_proposals: Set[str],
+    duplicates: Dict[str, Tuple[str, float]],
+    prior_reviews: Dict[str, Dict[str, Any]]
+) -> Set[str]:
+    """Reuse mode: journal the prior-run review of each near-duplicate; returns the ids not to send"""
+    skipped = set()
+    for proposal_id, match in duplicates.items():
+        skipped.add(proposal_id)
+        if match[0] in prior_reviews and proposal_id not in processed_proposals:
+            journal.append(reused_review(prior_reviews[match[0]], proposal_id, match))
+    logger.info(f"Reusing earlier reviews for {len(skipped)} near-duplicate proposals instead of new LLM calls")
+    return skipped
+
+def _orphaned_duplicates(
+    journal: ReviewJournal,
+    duplicates: Dict[str, Tuple[str, float]],
+    prior_reviews: Dict[str, Dict[str, Any]]
+) -> Set[str]:
+    """Reuse mode: near-duplicates still without a review whose representative has none to copy either"""
+    reviewed = journal.processed_ids()
+    orphans = {
+        proposal_id for proposal_id, match in duplicates.items()
+        if proposal_id not in reviewed and match[0] not in reviewed and match[0] not in prior_reviews
+    }
+    if orphans:
+        logger.warning(f"{len(orphans)} near-duplicate proposals have no review to reuse, reviewing them directly")
+    return orphans
+
+def _open_journal(journal_path: str, resume: bool) -> Tuple[ReviewJournal, Set[str]]:
+    """The review journal of a run and the proposals it already holds"""
+    # Every finished review goes to the journal first, so a crash only loses in-flight calls
+    journal = ReviewJournal(journal_path)
+    if not resume:
+        journal.reset()
+    processed_proposals = journal.processed_ids()
+    if processed_proposals:
+        logger.info(f"Resuming from {journal.path}: {len(processed_proposals)} proposals already reviewed")
+    return journal, processed_proposals
+
+def _carry_forward(
+    manifest: RunManifest,
+    fingerprints: Dict[str, str],
+    proposal_fps: Dict[str, str],
+    journal: ReviewJournal,
+    processed_proposals: Set[str]
+) -> Set[str]:
+    """Incremental mode: journal the last run's review of every unchanged proposal; returns the ids not to send"""
+    unchanged, reason = manifest.diff(fingerprints, proposal_fps)
+    reviews = manifest.previous_reviews(unchanged - processed_proposals)
+    journal.extend(reviews)
+    carried = {str(review['proposal_id']) for review in reviews}
+    logger.info(f"Incremental review against {manifest.path}: carrying forward {len(carried)} unchanged reviews "
+                f"({len(unchanged)} unchanged in total), {reason}")
+    return processed_proposals | carried
+
+def _close_journal(journal: ReviewJournal, results: List[Dict[str, Any]], proposal_ids: Iterable[str]):
+    """Remove the journal once every proposal has a review; otherwise keep it so the next run retries only the rest"""
+    missing = set(map(str, proposal_ids)) - {str(result['proposal_id']) for result in results}
+    if missing:
+        logger.warning(f"{len(missing)} proposals have no review, keeping {journal.path} so the next run reviews only those")
+        return
+    journal.reset()
+
+def _save_manifest(manifest: RunManifest, fingerprints: Dict[str, str], proposal_fps: Dict[str, str],
+                   results: List[Dict[str, Any]], output_file: str):
+    # Only proposals with a review in the output; failed ones are retried by the next run
+    reviewed = {str(result['proposal_id']) for result in results}
+    manifest.save(fingerprints, {proposal_id: value for proposal_id, value in proposal_fps.items() if proposal_id in reviewed}, output_file)
+
+def _open_sink(journal: ReviewJournal, proposal_df: pd.DataFrame, output_file: str, dedup: str = config.DEDUP_MODE) -> OutputSink:
+    """Streaming writer for the output file, starting with the reviews the journal already holds"""
+    column_types = dict(REVIEW_COLUMNS, **(DUPLICATE_COLUMNS if dedup != "off" else {}))
+    sink = open_sink(output_file, column_types=column_types)
+    # Resumed, reused and carried-forward reviews first; new ones follow in completion order
+    for record in compile_results(journal.load(), proposal_df.id):
+        sink.write(record)
+    return sink
+
+def _recorder(
+    journal: ReviewJournal,
+    sink: OutputSink,
+    duplicates: Optional[Dict[str, Tuple[str, float]]] = None
+) -> Callable[[Dict[str, Any]], None]:
+    """Result callback: the journal first, so a crash loses nothing, then the streaming output"""
+    def on_result(review_dict: Dict[str, Any]):
+        if duplicates:
+            annotate_duplicate(review_dict, duplicates)
+        journal.append(review_dict)
+        sink.write(review_dict)
+    return on_result
+
+def _save_output(
+    journal: ReviewJournal,
+    sink: OutputSink,
+    proposal_df: pd.DataFrame,
+    output_file: str,
+    export_excel: bool = False,
+    dedup: str = config.DEDUP_MODE,
+    duplicates: Optional[Dict[str, Tuple[str, float]]] = None
+) -> List[Dict[str, Any]]:
+    """Finish the streamed output file; returns the reviews in proposal order"""
+    # 同一批內的重複投稿等代表篇審完後再複製其結果
+    if dedup == "reuse":
+        reviewed = {record['proposal_id']: record for record in journal.load()}
+        for proposal_id, match in (duplicates or {}).items():
+            if proposal_id not in reviewed and match[0] in reviewed:
+                review_dict = reused_review(reviewed[match[0]], proposal_id, match)
+                journal.append(review_dict)
+                sink.write(review_dict)
+    
+    sink.close()
+    if export_excel and table_format(output_file) != "xlsx":
+        export_excel_copy(output_file)
+    return compile_results(journal.load(), proposal_df.id)
+
+@dataclass
+class ReviewVariant:
+    """One (prompt, model) review of the proposals and the file its results go to"""
+    name: str
+    prompt_file: str
+    model_name: str
+    output_file: str
+
+@dataclass
+class _VariantRun:
+    """Per-variant state of a multi-variant run"""
+    variant: ReviewVariant
+    chain: Any
+    journal: ReviewJournal
+    sink: OutputSink
+    processed_proposals: Set[str]
+    on_result: Callable[[Dict[str, Any]], None]
+    telemetry: Telemetry
+    context_cache: Optional[ContextCache] = None
+    manifest: Optional[RunManifest] = None
+    fingerprints: Optional[Dict[str, str]] = None
+
+class _VariantSlots:
+    """One of a variant's own in-flight slots plus one of the slots shared by every variant, taken in that order"""
+    
+    def __init__(self, own: asyncio.Semaphore, shared: asyncio.Semaphore):
+        self.own = own
+        self.shared = shared
+    
+    async def __aenter__(self):
+        await self.own.acquire()
+        try:
+            await self.shared.acquire()
+        except BaseException:
+            self.own.release()
+            raise
+    
+    async def __aexit__(self, *exc_info):
+        self.shared.release()
+        self.own.release()
+
+async def aprocess_variants(
+    proposal_df: pd.DataFrame,
+    runs: List[_VariantRun],
+    payloads: Dict[str, str],
+    on_complete: Callable[[_VariantRun, List[Dict[str, Any]]], None],
+    sleep_time: int = config.DEFAULT_SLEEP_TIME,
+    max_retries: int = config.MAX_RETRIES,
+    concurrency: int = config.DEFAULT_CONCURRENCY,
+    batch_size: int = config.DEFAULT_BATCH_SIZE,
+    samples: int = config.ENSEMBLE_SAMPLES,
+    min_samples: int = config.ENSEMBLE_MIN_SAMPLES,
+    max_in_flight: int = None,
+    fallback: Optional[Callable[[_VariantRun], Set[str]]] = None
+) -> List[List[Dict[str, Any]]]:
+    """Review every variant side by side; `on_complete` runs for each variant as it finishes
+    
+    Each variant has at most `concurrency` requests in flight and all variants together at most `max_in_flight`
+    (default: `concurrency` per variant). A variant queues for a shared slot only while holding one of its own,
+    so under a tighter total cap the shared slots go round-robin across the variants.
+    `fallback` names the skipped proposals a variant reviews after all, in a second pass once its first one is done.
+    """
+    per_variant = max(1, concurrency)
+    total = max(1, max_in_flight) if max_in_flight else per_variant * len(runs)
+    shared = asyncio.Semaphore(total)
+    logger.info(f"Reviewing {len(runs)} variants with {per_variant} in-flight requests each, {total} in total")
+    
+    async def _run(run: _VariantRun) -> List[Dict[str, Any]]:
+        slots = _VariantSlots(asyncio.Semaphore(per_variant), shared)
+        
+        async def _review(processed_proposals: Set[str]) -> List[Dict[str, Any]]:
+            return await aprocess_proposals(
+                proposal_df, run.chain, sleep_time=sleep_time, max_retries=max_retries,
+                processed_proposals=processed_proposals, on_result=run.on_result, batch_size=batch_size,
+                telemetry=run.telemetry, samples=samples, min_samples=min_samples, semaphore=slots, payloads=payloads
+            )
+        
+        results = await _review(run.processed_proposals)
+        retry = fallback(run) if fallback is not None else set()
+        if retry:
+            results += await _review(set(payloads) - retry)
+        # Writing one variant's output must not stall the requests of the others
+        await asyncio.to_thread(on_complete, run, results)
+        return results
+    
+    return list(await asyncio.gather(*(_run(run) for run in runs)))
+
+def run_llm_review_variants(
+    variants: List[ReviewVariant],
+    proposal_file: str = None,
+    sleep_time: int = config.DEFAULT_SLEEP_TIME,
+    max_retries: int = config.MAX_RETRIES,
+    limit: int = None,
+    concurrency: int = config.DEFAULT_CONCURRENCY,
+    rpm: float = None,
+    tpm: float = None,
+    resume: bool = True,
+    use_cache: bool = True,
+    batch_size: int = config.DEFAULT_BATCH_SIZE,
+    export_excel: bool = False,
+    conference: str = None,
+    prefix_cache: str = config.PREFIX_CACHE_MODE,
+    token_budget: Optional[int] = config.PAYLOAD_TOKEN_BUDGET,
+    dedup: str = config.DEDUP_MODE,
+    prior_proposal_file: str = None,
+    prior_review_file: str = None,
+    samples: int = config.ENSEMBLE_SAMPLES,
+    min_samples: int = config.ENSEMBLE_MIN_SAMPLES,
+    incremental: bool = False,
+    llm=None,
+    max_in_flight: int = None
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Review proposals with several (prompt, model) variants in one pass, keyed by variant name
+    
+    Proposals are loaded, deduplicated and rendered into payloads once; the variants run side by side with
+    `concurrency` in-flight requests each, at most `max_in_flight` in total, sharing their model's rate limiter,
+    and each output is written when its variant finishes.
+    `incremental` only sends proposals that are new or changed since the variant's last run manifest.
+    `llm` replaces Gemini for every variant (e.g. a fake chat model).
+    """
+    proposal_df, store = _load_review_proposals(proposal_file, limit, conference=conference)
+    source = source_fingerprint(proposal_file, conference)
+    cache = ResponseCache() if use_cache else None
+    
+    if samples > 1 and batch_size > 1:
+        logger.warning("Batched prompting is not supported with self-consistency sampling, reviewing one proposal per request")
+        batch_size = 1
+    # 多次取樣需要非零溫度，且不能共用快取，否則每次取樣都會得到相同答案
+    temperature = config.TEMPERATURE
+    chain_cache = cache
+    if samples > 1:
+        temperature = config.ENSEMBLE_TEMPERATURE
+        chain_cache = None
+        logger.info(f"Sampling up to {samples} reviews per proposal at temperature {temperature}, bypassing the response cache")
+    
+    # Near-duplicates of earlier proposals are flagged, answered from the earlier review, or seeded with it
+    duplicates, prior_reviews = {}, {}
+    if dedup != "off":
+        proposal_df, duplicates, prior_reviews = _find_duplicates(proposal_df, dedup, prior_proposal_file, prior_review_file, store)
+    payloads = build_proposal_payloads(proposal_df, _payload_columns(proposal_df), token_budget=token_budget, texts=store)
+    if store is not None:
+        store.close()
+    proposal_fps = proposal_fingerprints(payloads)
+    
+    runs = []
+    for variant in variants:
+        # Sharing the model's quota with every other variant (and run) in this process
+        context_cache = ContextCache(variant.model_name) if prefix_cache == "provider" else None
+        chain = setup_llm_chain(
+            variant.prompt_file, variant.model_name, rate_limiter=get_rate_limiter(variant.model_name, rpm=rpm, tpm=tpm),
+            cache=chain_cache, batch=batch_size > 1, temperature=temperature,
+            split_prefix=prefix_cache != "off", context_cache=context_cache, llm=llm
+        )
+        fingerprints = run_fingerprints(
+            variant.prompt_file, variant.model_name, ProposalReview, temperature, samples,
+            min_samples=min_samples, batch_size=batch_size, dedup=dedup, prefix_cache=prefix_cache
+        )
+        journal, processed_proposals = _open_journal(
+            run_journal_path(variant.prompt_file, variant.model_name, source, fingerprints), resume
+        )
+        if dedup == "reuse":
+            processed_proposals = processed_proposals | _reuse_prior_reviews(journal, processed_proposals, duplicates, prior_reviews)
+        
+        # The manifest is written either way, so a later --incremental run has something to diff against
+        manifest = RunManifest(manifest_path_for(variant.prompt_file, variant.model_name, source))
+        if incremental:
+            processed_proposals = _carry_forward(manifest, fingerprints, proposal_fps, journal, processed_proposals)
+        sink = _open_sink(journal, proposal_df, variant.output_file, dedup)
+        on_result = _recorder(journal, sink, duplicates)
+        
+        # Per-call latency, token and cost records next to the output file
+        telemetry_file = os.path.splitext(variant.output_file)[0] + ".calls.jsonl"
+        telemetry = Telemetry(telemetry_file, model_name=variant.model_name)
+        runs.append(_VariantRun(variant, chain, journal, sink, processed_proposals, on_result, telemetry, context_cache,
+                                manifest, fingerprints))
+    
+    outputs = {}
+    
+    def _complete(run: _VariantRun, reviewed: List[Dict[str, Any]]):
+        outputs[run.variant.name] = _save_output(run.journal, run.sink, proposal_df, run.variant.output_file, export_excel, dedup, duplicates)
+        logger.info(f"Variant {run.variant.name} finished, {len(outputs[run.variant.name])} reviews in {run.variant.output_file}")
+        _save_manifest(run.manifest, run.fingerprints, proposal_fps, outputs[run.variant.name], run.variant.output_file)
+        _close_journal(run.journal, outputs[run.variant.name], payloads)
+        run.telemetry.log_summary()
+        if samples > 1:
+            log_ensemble_summary(ensemble_summary(reviewed, samples))
+        if run.context_cache is not None:
+            run.context_cache.close()
+    
+    asyncio.run(aprocess_variants(
+        proposal_df, runs, payloads, _complete, sleep_time=sleep_time, max_retries=max_retries,
+        concurrency=concurrency, batch_size=batch_size, samples=samples, min_samples=min_samples,
+        max_in_flight=max_in_flight,
+        fallback=(lambda run: _orphaned_duplicates(run.journal, duplicates, prior_reviews)) if dedup == "reuse" else None
+    ))
+    
+    if cache is not None:
+        cache.log_stats()
+        cache.close()
+    return {variant.name: outputs[variant.name] for variant in variants}
+
 def run_llm_review(
     prompt_file: str,
     model_name: str,
@@ -111,25 +927,107 @@ def run_llm_review(
     proposal_file: str = None,
     sleep_time: int = config.DEFAULT_SLEEP_TIME,
     max_retries: int = config.MAX_RETRIES,
-    limit: int = None
+    limit: int = None,
+    concurrency: int = config.DEFAULT_CONCURRENCY,
+    rpm: float = None,
+    tpm: float = None,
+    resume: bool = True,
+    use_cache: bool = True,
+    batch_size: int = config.DEFAULT_BATCH_SIZE,
+    export_excel: bool = False,
+    conference: str = None,
+    cascade: bool = False,
+    cascade_samples: int = config.CASCADE_SAMPLES,
+    prefix_cache: str = config.PREFIX_CACHE_MODE,
+    token_budget: Optional[int] = config.PAYLOAD_TOKEN_BUDGET,
+    dedup: str = config.DEDUP_MODE,
+    prior_proposal_file: str = None,
+    prior_review_file: str = None,
+    samples: int = config.ENSEMBLE_SAMPLES,
+    min_samples: int = config.ENSEMBLE_MIN_SAMPLES,
+    incremental: bool = False,
+    pro_rpm: float = None,
+    pro_tpm: float = None,
+    llm=None,
+    pro_llm=None
 ):
-    """Run the LLM review process end-to-end"""
+    """Run the LLM review process end-to-end; in cascade mode `model_name` is the first tier and pro the second
+    
+    `rpm`/`tpm` override the quota of `model_name`, `pro_rpm`/`pro_tpm` that of the pro tier of a cascade.
+    `llm` replaces Gemini (e.g. a fake chat model), `pro_llm` the pro tier of a cascade (default: `llm`).
+    """
+    if not cascade:
+        variant = ReviewVariant("review", prompt_file, model_name, output_file)
+        return run_llm_review_variants(
+            [variant], proposal_file=proposal_file, sleep_time=sleep_time, max_retries=max_retries, limit=limit,
+            concurrency=concurrency, rpm=rpm, tpm=tpm, resume=resume, use_cache=use_cache, batch_size=batch_size,
+            export_excel=export_excel, conference=conference, prefix_cache=prefix_cache, token_budget=token_budget,
+            dedup=dedup, prior_proposal_file=prior_proposal_file, prior_review_file=prior_review_file,
+            samples=samples, min_samples=min_samples, incremental=incremental, llm=llm
+        )[variant.name]
+    
+    if batch_size > 1:
+        logger.warning("Batched prompting is not supported in cascade mode, reviewing one proposal per request")
+    if samples > 1:
+        logger.warning("Self-consistency sampling is not supported in cascade mode, use --cascade-samples instead")
+    
     # Load proposal data
-    proposal_df = load_proposal_data(proposal_file, limit)
+    proposal_df, store = _load_review_proposals(proposal_file, limit, conference=conference)
     
-    # Set up LLM chain
-    chain = setup_llm_chain(prompt_file, model_name)
+    # Share each tier's quota with any other run in this process; the tiers have separate quotas
+    rate_limiter = get_rate_limiter(model_name, rpm=rpm, tpm=tpm)
+    pro_limiter = get_rate_limiter(config.PRO_MODEL, rpm=pro_rpm, tpm=pro_tpm)
+    cache = ResponseCache() if use_cache else None
+    # Both tiers and the flash sampling shape a cascade review, so they all go into its journal and fingerprints
+    cascade_model = f"cascade:{model_name}>{config.PRO_MODEL}"
+    source = source_fingerprint(proposal_file, conference)
+    fingerprints = run_fingerprints(
+        prompt_file, cascade_model, ProposalReview,
+        config.CASCADE_SAMPLE_TEMPERATURE if cascade_samples > 1 else config.TEMPERATURE, cascade_samples,
+        # The cascade draws every flash sample and reviews one proposal per request
+        min_samples=cascade_samples, batch_size=1, dedup=dedup, prefix_cache=prefix_cache
+    )
+    journal, processed_proposals = _open_journal(run_journal_path(prompt_file, cascade_model, source, fingerprints), resume)
     
-    # Process proposals
-    results = process_proposals(
-        proposal_df=proposal_df,
-        chain=chain,
-        sleep_time=sleep_time,
-        max_retries=max_retries
+    # Near-duplicates of earlier proposals are flagged, answered from the earlier review, or seeded with it
+    duplicates, prior_reviews = {}, {}
+    if dedup != "off":
+        proposal_df, duplicates, prior_reviews = _find_duplicates(proposal_df, dedup, prior_proposal_file, prior_review_file, store)
+        if dedup == "reuse":
+            processed_proposals = processed_proposals | _reuse_prior_reviews(journal, processed_proposals, duplicates, prior_reviews)
+    
+    manifest = RunManifest(manifest_path_for(prompt_file, cascade_model, source))
+    payloads = build_proposal_payloads(proposal_df, _payload_columns(proposal_df), token_budget=token_budget, texts=store)
+    if store is not None:
+        store.close()
+    proposal_fps = proposal_fingerprints(payloads)
+    if incremental:
+        processed_proposals = _carry_forward(manifest, fingerprints, proposal_fps, journal, processed_proposals)
+    sink = _open_sink(journal, proposal_df, output_file, dedup)
+    on_result = _recorder(journal, sink, duplicates)
+    
+    # Per-call latency, token and cost records next to the output file
+    telemetry_file = os.path.splitext(output_file)[0] + ".calls.jsonl"
+    telemetry = Telemetry(telemetry_file, model_name=model_name)
+    pro_telemetry = Telemetry(telemetry_file, model_name=config.PRO_MODEL)
+    
+    _run_cascade(
+        proposal_df, prompt_file, model_name, rate_limiter, pro_limiter, cache, sleep_time, max_retries,
+        processed_proposals, concurrency, on_result, cascade_samples, telemetry, pro_telemetry,
+        prefix_cache=prefix_cache, token_budget=token_budget, llm=llm, pro_llm=pro_llm if pro_llm is not None else llm,
+        payloads=payloads,
+        fallback=(lambda: _orphaned_duplicates(journal, duplicates, prior_reviews)) if dedup == "reuse" else None
     )
     
-    # Save results
-    save_results(results, output_file)
+    results = _save_output(journal, sink, proposal_df, output_file, export_excel, dedup, duplicates)
+    _save_manifest(manifest, fingerprints, proposal_fps, results, output_file)
+    _close_journal(journal, results, payloads)
+    
+    telemetry.log_summary()
+    pro_telemetry.log_summary()
+    if cache is not None:
+        cache.log_stats()
+        cache.close()
     
     return results
 
@@ -138,20 +1036,49 @@ if __name__ == "__main__":
     
     parser = argparse.ArgumentParser(description="Run LLM review on PyCon proposals")
     parser.add_argument("--prompt", choices=["simple", "full"], default="full", help="Prompt type to use")
-    parser.add_argument("--model", choices=["flash", "pro"], default="flash", help="Model to use")
+    parser.add_argument("--model", choices=["flash", "pro", "cascade"], default="flash",
+                        help="Model to use; cascade reviews with flash and escalates uncertain proposals to pro")
+    parser.add_argument("--cascade-samples", type=int, default=config.CASCADE_SAMPLES,
+                        help="Flash samples per proposal in cascade mode; disagreeing samples escalate to pro")
+    parser.add_argument("--samples", type=int, default=config.ENSEMBLE_SAMPLES,
+                        help="Self-consistency: sample each proposal up to N times and take the majority vote (1 disables)")
+    parser.add_argument("--min-samples", type=int, default=config.ENSEMBLE_MIN_SAMPLES,
+                        help="Samples drawn before a unanimous proposal may stop early (set to --samples to disable early stopping)")
     parser.add_argument("--output", help="Output file path (default: auto-generated based on prompt and date)")
-    parser.add_argument("--proposal-file", help="Proposal file path (default: from config)")
-    parser.add_argument("--sleep-time", type=int, default=config.DEFAULT_SLEEP_TIME, help="Sleep time between retries")
+    parser.add_argument("--proposal-file", help="Proposal file path or database URL (default: from config)")
+    parser.add_argument("--conference", help="Conference filter for database sources, e.g. pycontw-2024")
+    parser.add_argument("--format", choices=config.SUPPORTED_FORMATS, default=config.TABLE_FORMAT, help="Output format when --output is not given")
+    parser.add_argument("--export-excel", action="store_true", help="Also export an .xlsx copy of the results")
+    parser.add_argument("--sleep-time", type=int, default=config.DEFAULT_SLEEP_TIME, help="Maximum backoff between retries")
     parser.add_argument("--max-retries", type=int, default=config.MAX_RETRIES, help="Maximum number of retries")
     parser.add_argument("--limit", type=int, help="Limit the number of proposals to process")
+    parser.add_argument("--concurrency", type=int, default=config.DEFAULT_CONCURRENCY, help="Maximum number of in-flight LLM requests")
+    parser.add_argument("--batch-size", type=int, default=config.DEFAULT_BATCH_SIZE, help="Proposals packed into one LLM request (1 disables batching)")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore the existing journal and review every proposal again")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk LLM response cache")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only review proposals that are new or changed since the last run; carry the rest forward")
+    parser.add_argument("--prefix-cache", choices=config.PREFIX_CACHE_MODES, default=config.PREFIX_CACHE_MODE,
+                        help="Reuse the static prompt instructions: client (render once) or provider (Gemini context cache)")
+    parser.add_argument("--token-budget", type=int, default=config.PAYLOAD_TOKEN_BUDGET,
+                        help="Per-proposal token budget for the proposal info (0 disables truncation)")
+    parser.add_argument("--dedup", choices=config.DEDUP_MODES, default=config.DEDUP_MODE,
+                        help="Near-duplicate proposals: flag them, reuse the earlier review, or seed the prompt with it")
+    parser.add_argument("--prior-proposal-file", help="Earlier proposals (file or database URL) to match near-duplicates against")
+    parser.add_argument("--prior-review-file", help="LLM review output of the earlier proposals")
+    parser.add_argument("--rpm", type=float, help="Requests-per-minute quota (default: from config per model)")
+    parser.add_argument("--tpm", type=float, help="Tokens-per-minute quota (default: from config per model)")
+    parser.add_argument("--pro-rpm", type=float, help="Requests-per-minute quota of the pro tier in cascade mode")
+    parser.add_argument("--pro-tpm", type=float, help="Tokens-per-minute quota of the pro tier in cascade mode")
     
     args = parser.parse_args()
+    setup_logging("llm_review")
     
     # Determine prompt file
     prompt_file = config.FULL_PROMPT_FILE if args.prompt == "full" else config.SIMPLE_PROMPT_FILE
     
-    # Determine model
-    model_name = config.FLASH_MODEL if args.model == "flash" else config.PRO_MODEL
+    # Determine model (cascade starts with flash)
+    model_name = config.PRO_MODEL if args.model == "pro" else config.FLASH_MODEL
     
     # Determine output file
     if args.output:
@@ -159,9 +1086,9 @@ if __name__ == "__main__":
     else:
         date_str = datetime.now().strftime("%Y%m%d")
         if args.prompt == "full":
-            output_file = str(config.FULL_PROMPT_OUTPUT).format(date=date_str)
+            output_file = str(config.FULL_PROMPT_OUTPUT).format(date=date_str, ext=args.format)
         else:
-            output_file = str(config.SIMPLE_PROMPT_OUTPUT).format(date=date_str)
+            output_file = str(config.SIMPLE_PROMPT_OUTPUT).format(date=date_str, ext=args.format)
     
     # Run LLM review
     run_llm_review(
@@ -171,5 +1098,25 @@ if __name__ == "__main__":
         proposal_file=args.proposal_file,
         sleep_time=args.sleep_time,
         max_retries=args.max_retries,
-        limit=args.limit
+        limit=args.limit,
+        concurrency=args.concurrency,
+        rpm=args.rpm,
+        tpm=args.tpm,
+        resume=not args.no_resume,
+        use_cache=not args.no_cache,
+        batch_size=args.batch_size,
+        export_excel=args.export_excel,
+        conference=args.conference,
+        cascade=args.model == "cascade",
+        cascade_samples=args.cascade_samples,
+        prefix_cache=args.prefix_cache,
+        token_budget=args.token_budget,
+        dedup=args.dedup,
+        prior_proposal_file=args.prior_proposal_file,
+        prior_review_file=args.prior_review_file,
+        samples=args.samples,
+        min_samples=args.min_samples,
+        incremental=args.incremental,
+        pro_rpm=args.pro_rpm,
+        pro_tpm=args.pro_tpm
     ) 
\ No newline at end of file
@@ -0,0 +1,21 @@
+import os
+import logging
+from datetime import datetime
+
+from src import config
+
+def setup_logging(name: str, level: str = config.LOG_LEVEL):
+    """Configure root logging once for an entry point: logs/<name>_<date>.log plus the console"""
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    os.makedirs(config.LOGS_DIR, exist_ok=True)
+    log_file = config.LOGS_DIR / f"{name}_{datetime.now().strftime('%Y%m%d')}.log"
+    logging.basicConfig(
+        level=level,
+        format=config.LOG_FORMAT,
+        handlers=[
+            logging.FileHandler(log_file),
+            logging.StreamHandler()
+        ]
+    )
@@ -4,20 +4,11 @@ import argparse
 from datetime import datetime
 import logging
 
-from src.llm_review import run_llm_review
-from src.merge_data import run_merge_and_analyze
 from src import config
+from src.log_setup import setup_logging
 
-# Configure logging
-log_file = config.LOGS_DIR / f"main_{datetime.now().strftime('%Y%m%d')}.log"
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler()
-    ]
-)
+# The LLM stack (langchain) and the analysis stack (pandas, numpy) are imported in main()
+# only on the code paths that use them, so --help and merge-only runs start quickly
 logger = logging.getLogger(__name__)
 
 def parse_args():
@@ -31,30 +22,76 @@ def parse_args():
     # LLM review options
     parser.add_argument("--prompt", choices=["simple", "full", "both"], default="full",
                         help="Prompt type to use for LLM review")
-    parser.add_argument("--model", choices=["flash", "pro"], default="flash",
-                        help="Model to use for LLM review")
+    parser.add_argument("--model", choices=["flash", "pro", "cascade"], default="flash",
+                        help="Model to use for LLM review; cascade reviews with flash and escalates uncertain proposals to pro")
+    parser.add_argument("--cascade-samples", type=int, default=config.CASCADE_SAMPLES,
+                        help="Flash samples per proposal in cascade mode; disagreeing samples escalate to pro")
+    parser.add_argument("--samples", type=int, default=config.ENSEMBLE_SAMPLES,
+                        help="Self-consistency: sample each proposal up to N times and take the majority vote (1 disables)")
+    parser.add_argument("--min-samples", type=int, default=config.ENSEMBLE_MIN_SAMPLES,
+                        help="Samples drawn before a unanimous proposal may stop early (set to --samples to disable early stopping)")
     
     # File paths
-    parser.add_argument("--proposal-file", help="Proposal file path (default: from config)")
-    parser.add_argument("--review-file", help="Review file path (default: from config)")
+    parser.add_argument("--proposal-file", help="Proposal file path or database URL (default: from config)")
+    parser.add_argument("--review-file", help="Review file path or database URL (default: from config)")
+    parser.add_argument("--conference", help="Conference filter for database sources, e.g. pycontw-2024")
     parser.add_argument("--output-dir", help="Output directory (default: data/)")
     parser.add_argument("--simple-llm-file", help="Simple LLM review file path (required for merge mode)")
     parser.add_argument("--complete-llm-file", help="Complete LLM review file path (required for merge mode)")
+    parser.add_argument("--variant", action="append", default=[], metavar="NAME=FILE",
+                        help="Additional LLM run (prompt x model) to compare in merge and analysis (repeatable)")
+    parser.add_argument("--format", choices=config.SUPPORTED_FORMATS, default=config.TABLE_FORMAT,
+                        help="Storage format for LLM outputs and merged data")
+    parser.add_argument("--export-excel", action="store_true",
+                        help="Also export .xlsx copies of LLM outputs and merged data")
     
     # Other options
     parser.add_argument("--sleep-time", type=int, default=config.DEFAULT_SLEEP_TIME,
-                        help="Sleep time between retries")
+                        help="Maximum backoff between retries")
     parser.add_argument("--max-retries", type=int, default=config.MAX_RETRIES,
                         help="Maximum number of retries")
     parser.add_argument("--no-analyze", action="store_true",
                         help="Skip vote distribution analysis")
+    parser.add_argument("--bootstrap-resamples", type=int, default=config.BOOTSTRAP_RESAMPLES,
+                        help="Bootstrap resamples for agreement confidence intervals (0 disables)")
+    parser.add_argument("--analysis-workers", type=int, default=config.ANALYSIS_WORKERS,
+                        help="Processes for per-variant agreement statistics")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Stream reviews in chunks during merge to bound memory on large histories")
+    parser.add_argument("--chunk-size", type=int, default=config.MERGE_CHUNK_SIZE,
+                        help="Review rows per chunk in streaming merge mode")
     parser.add_argument("--limit", type=int, help="Limit the number of proposals to process")
+    parser.add_argument("--concurrency", type=int, default=config.DEFAULT_CONCURRENCY,
+                        help="Maximum number of in-flight LLM requests per prompt variant")
+    parser.add_argument("--max-in-flight", type=int,
+                        help="Maximum number of in-flight LLM requests across all prompt variants (default: --concurrency per variant)")
+    parser.add_argument("--batch-size", type=int, default=config.DEFAULT_BATCH_SIZE,
+                        help="Proposals packed into one LLM request (1 disables batching)")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="Ignore existing review journals and review every proposal again")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Bypass the on-disk LLM response cache")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only review proposals that are new or changed since the last run; carry the rest forward")
+    parser.add_argument("--prefix-cache", choices=config.PREFIX_CACHE_MODES, default=config.PREFIX_CACHE_MODE,
+                        help="Reuse the static prompt instructions: client (render once) or provider (Gemini context cache)")
+    parser.add_argument("--token-budget", type=int, default=config.PAYLOAD_TOKEN_BUDGET,
+                        help="Per-proposal token budget for the proposal info (0 disables truncation)")
+    parser.add_argument("--dedup", choices=config.DEDUP_MODES, default=config.DEDUP_MODE,
+                        help="Near-duplicate proposals: flag them, reuse the earlier review, or seed the prompt with it")
+    parser.add_argument("--prior-proposal-file", help="Earlier proposals (file or database URL) to match near-duplicates against")
+    parser.add_argument("--prior-review-file", help="LLM review output of the earlier proposals")
+    parser.add_argument("--rpm", type=float, help="Requests-per-minute quota (default: from config per model)")
+    parser.add_argument("--tpm", type=float, help="Tokens-per-minute quota (default: from config per model)")
+    parser.add_argument("--pro-rpm", type=float, help="Requests-per-minute quota of the pro tier in cascade mode")
+    parser.add_argument("--pro-tpm", type=float, help="Tokens-per-minute quota of the pro tier in cascade mode")
     
     return parser.parse_args()
 
 def main():
     """Main function to run the pipeline"""
     args = parse_args()
+    setup_logging("main")
     date_str = datetime.now().strftime("%Y%m%d")
     
     # Determine output directory
@@ -64,46 +101,65 @@ def main():
     # File paths
     simple_output = None
     complete_output = None
-    merged_output = os.path.join(output_dir, f"pycon_2024_proposal_with_llm_and_review_{date_str}.xlsx")
+    merged_output = os.path.join(output_dir, f"pycon_2024_proposal_with_llm_and_review_{date_str}.{args.format}")
     analysis_output = os.path.join(output_dir, f"vote_analysis_{date_str}.json")
     
     # Run LLM review if requested
     if args.mode in ["review", "full"]:
         logger.info("Running LLM review")
+        from src.llm_review import ReviewVariant, run_llm_review, run_llm_review_variants
         
-        # Determine which prompts to use
-        run_simple = args.prompt in ["simple", "both"]
-        run_complete = args.prompt in ["full", "both"]
+        # One (prompt, model) variant per requested prompt
+        model_name = config.PRO_MODEL if args.model == "pro" else config.FLASH_MODEL
+        variants = []
+        if args.prompt in ["simple", "both"]:
+            simple_output = os.path.join(output_dir, f"simple_prompt_gemini_{args.model}_{date_str}.{args.format}")
+            variants.append(ReviewVariant("simple", str(config.SIMPLE_PROMPT_FILE), model_name, simple_output))
+        if args.prompt in ["full", "both"]:
+            complete_output = os.path.join(output_dir, f"full_prompt_gemini_{args.model}_{date_str}.{args.format}")
+            variants.append(ReviewVariant("complete", str(config.FULL_PROMPT_FILE), model_name, complete_output))
+        for variant in variants:
+            logger.info(f"Running {variant.name} prompt review with output to {variant.output_file}")
         
-        # Run simple prompt if requested
-        if run_simple:
-            simple_output = os.path.join(output_dir, f"simple_prompt_gemini_{args.model}_{date_str}.xlsx")
-            logger.info(f"Running simple prompt review with output to {simple_output}")
-            
-            run_llm_review(
-                prompt_file=str(config.SIMPLE_PROMPT_FILE),
-                model_name=config.FLASH_MODEL if args.model == "flash" else config.PRO_MODEL,
-                output_file=simple_output,
-                proposal_file=args.proposal_file,
-                sleep_time=args.sleep_time,
-                max_retries=args.max_retries,
-                limit=args.limit
-            )
+        review_options = dict(
+            proposal_file=args.proposal_file,
+            sleep_time=args.sleep_time,
+            max_retries=args.max_retries,
+            limit=args.limit,
+            concurrency=args.concurrency,
+            rpm=args.rpm,
+            tpm=args.tpm,
+            resume=not args.no_resume,
+            use_cache=not args.no_cache,
+            batch_size=args.batch_size,
+            export_excel=args.export_excel,
+            conference=args.conference,
+            prefix_cache=args.prefix_cache,
+            token_budget=args.token_budget,
+            dedup=args.dedup,
+            prior_proposal_file=args.prior_proposal_file,
+            prior_review_file=args.prior_review_file,
+            samples=args.samples,
+            min_samples=args.min_samples,
+            incremental=args.incremental
+        )
         
-        # Run complete prompt if requested
-        if run_complete:
-            complete_output = os.path.join(output_dir, f"full_prompt_gemini_{args.model}_{date_str}.xlsx")
-            logger.info(f"Running complete prompt review with output to {complete_output}")
-            
-            run_llm_review(
-                prompt_file=str(config.FULL_PROMPT_FILE),
-                model_name=config.FLASH_MODEL if args.model == "flash" else config.PRO_MODEL,
-                output_file=complete_output,
-                proposal_file=args.proposal_file,
-                sleep_time=args.sleep_time,
-                max_retries=args.max_retries,
-                limit=args.limit
-            )
+        if args.model == "cascade":
+            # The cascade runs its own two-tier scheduler, one prompt at a time
+            for variant in variants:
+                run_llm_review(
+                    prompt_file=variant.prompt_file,
+                    model_name=variant.model_name,
+                    output_file=variant.output_file,
+                    cascade=True,
+                    cascade_samples=args.cascade_samples,
+                    pro_rpm=args.pro_rpm,
+                    pro_tpm=args.pro_tpm,
+                    **review_options
+                )
+        else:
+            # 兩種 prompt 共用一次載入、payload 與同一組併發上限，交錯送出請求
+            run_llm_review_variants(variants, max_in_flight=args.max_in_flight, **review_options)
     
     # Run merge and analysis if requested
     if args.mode in ["merge", "full"]:
@@ -126,6 +182,8 @@ def main():
                 return
         
         # Run merge and analysis
+        from src.merge_data import run_merge_and_analyze
+        from src.variants import parse_variant_specs
         merged_df, analysis_results = run_merge_and_analyze(
             output_file=merged_output,
             proposal_file=args.proposal_file,
@@ -133,7 +191,14 @@ def main():
             simple_llm_file=simple_output,
             complete_llm_file=complete_output,
             analyze=not args.no_analyze,
-            analysis_output_file=analysis_output if not args.no_analyze else None
+            analysis_output_file=analysis_output if not args.no_analyze else None,
+            export_excel=args.export_excel,
+            conference=args.conference,
+            streaming=args.streaming,
+            chunk_size=args.chunk_size,
+            variant_files=parse_variant_specs(args.variant),
+            bootstrap_resamples=args.bootstrap_resamples,
+            analysis_workers=args.analysis_workers
         )
         
         logger.info(f"Merged data saved to {merged_output}")
@@ -0,0 +1,116 @@
+import os
+import re
+import json
+import hashlib
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Set, Tuple, Type
+
+from pydantic import BaseModel
+
+from src import config
+from src.storage import read_table
+
+logger = logging.getLogger(__name__)
+
+def fingerprint(text: str) -> str:
+    """Short content hash used in run manifests"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+def run_fingerprints(
+    prompt_file: str,
+    model_name: str,
+    schema: Type[BaseModel],
+    temperature: float = config.TEMPERATURE,
+    samples: int = config.ENSEMBLE_SAMPLES,
+    min_samples: int = config.ENSEMBLE_MIN_SAMPLES,
+    batch_size: int = config.DEFAULT_BATCH_SIZE,
+    dedup: str = config.DEDUP_MODE,
+    prefix_cache: str = config.PREFIX_CACHE_MODE
+) -> Dict[str, str]:
+    """Fingerprints of everything besides the proposal that shapes a review; any change invalidates all reviews"""
+    with open(prompt_file, "r", encoding="utf-8") as f:
+        template = f.read()
+    settings = {
+        "temperature": temperature,
+        "samples": samples,
+        # Early stopping only exists with sampling
+        "min_samples": min_samples if samples > 1 else None,
+        "batch_size": batch_size,
+        # Reuse mode copies earlier reviews and every mode but off annotates duplicates
+        "dedup": dedup,
+        "prefix_cache": prefix_cache,
+    }
+    return {
+        "prompt": fingerprint(template),
+        "schema": fingerprint(json.dumps(schema.model_json_schema(), sort_keys=True)),
+        "model": model_name,
+        "settings": fingerprint(json.dumps(settings, sort_keys=True)),
+    }
+
+def proposal_fingerprints(payloads: Dict[str, str]) -> Dict[str, str]:
+    """Per-proposal fingerprints of the PROPOSAL_INFO payload, i.e. the proposal columns exactly as the LLM sees them"""
+    return {proposal_id: fingerprint(payload) for proposal_id, payload in payloads.items()}
+
+def manifest_path_for(prompt_file: str, model_name: str, source: str) -> Path:
+    """Manifest of the last run of a (prompt, model) variant over one proposal source (see `source_fingerprint`)
+
+    Independent of the dated output file name; runs over another proposal file or conference keep their own.
+    """
+    model = re.sub(r"[^\w.-]", "_", model_name)
+    return config.MANIFEST_DIR / f"{Path(prompt_file).stem}_{model}_{source}.json"
+
+class RunManifest:
+    """Fingerprints and output file of the last completed run of one (prompt, model) variant over one proposal source"""
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self.data: Dict[str, Any] = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.data = json.load(f)
+
+    def diff(self, run: Dict[str, str], proposals: Dict[str, str]) -> Tuple[Set[str], str]:
+        """Proposals whose earlier review is still valid, and why the others are not"""
+        if not self.data:
+            return set(), "no earlier manifest"
+        changed = [key for key, value in run.items() if self.data["run"].get(key) != value]
+        if changed:
+            return set(), f"{', '.join(changed)} changed since the last run"
+        previous = self.data["proposals"]
+        unchanged = {proposal_id for proposal_id, value in proposals.items() if previous.get(proposal_id) == value}
+        new = sum(proposal_id not in previous for proposal_id in proposals)
+        return unchanged, f"{new} new and {len(proposals) - len(unchanged) - new} changed proposals"
+
+    def previous_reviews(self, proposal_ids: Set[str]) -> List[Dict[str, Any]]:
+        """Reviews of the given proposals from the output of the last run"""
+        output_file = self.data.get("output_file")
+        if not proposal_ids or not output_file or not os.path.exists(output_file):
+            if proposal_ids:
+                logger.warning(f"Output of the last run ({output_file}) is missing, reviewing every proposal again")
+            return []
+        try:
+            df = read_table(output_file, dtype={'vote': str, 'proposal_id': str})
+        except Exception as e:
+            # e.g. a Parquet output cut short by a crash before its footer was written
+            logger.warning(f"Cannot read the output of the last run ({output_file}: {e}), reviewing every proposal again")
+            return []
+        df = df[df['proposal_id'].isin(proposal_ids)].drop_duplicates('proposal_id')
+        # NaN is not valid JSON for the journal
+        return df.astype(object).where(df.notna(), None).to_dict(orient='records')
+
+    def save(self, run: Dict[str, str], proposals: Dict[str, str], output_file: str):
+        """Record a completed run; written to a temporary file first so a crash never leaves half a manifest"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.data = {
+            "run": run,
+            "output_file": str(output_file),
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "proposals": proposals,
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+        logger.info(f"Saved run manifest {self.path} ({len(proposals)} proposals)")
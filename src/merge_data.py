@@ -3,28 +3,36 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import logging
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Optional, Tuple, Iterable, Iterator
 from collections import Counter
 
 from src import config
+from src.log_setup import setup_logging
+from src.db_loader import is_database_url, load_proposals, load_reviews, iter_reviews
+from src.storage import read_table, write_table, iter_table_chunks
+from src.text_store import TextStore, is_text_store
+from src.variants import read_variants, stack_variants, widen_variants, analyze_variants, parse_variant_specs
+from src.agreement import analyze_agreement, format_agreement_report
 
-# Configure logging
-log_file = config.LOGS_DIR / f"merge_data_{datetime.now().strftime('%Y%m%d')}.log"
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+def _load_proposals(proposal_file: str, conference: str = None) -> pd.DataFrame:
+    """Proposals from a table file, a text store (id and the prompt columns only) or the proposals database"""
+    if is_database_url(proposal_file):
+        return load_proposals(str(proposal_file), conference=conference)
+    if is_text_store(proposal_file):
+        store = TextStore(proposal_file)
+        proposal_df = store.to_frame()
+        store.close()
+        return proposal_df
+    return read_table(proposal_file, dtype={'id': str})
+
 def load_data(
     proposal_file: str = None,
     review_file: str = None,
     simple_llm_file: str = None,
-    complete_llm_file: str = None
+    complete_llm_file: str = None,
+    conference: str = None
 ) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """Load all necessary data files"""
     logger.info("Loading data files")
@@ -35,81 +43,181 @@ def load_data(
     if review_file is None:
         review_file = config.REVIEW_FILE
     
-    # Load proposal and review data
-    proposal_df = pd.read_excel(proposal_file, dtype={'id': str})
-    vote_df = pd.read_excel(review_file, dtype={'vote': str, 'proposal_id': str})
+    # Load proposal and review data, from files or straight from the database
+    proposal_df = _load_proposals(proposal_file, conference)
+    if is_database_url(review_file):
+        vote_df = load_reviews(str(review_file), conference=conference)
+    else:
+        vote_df = read_table(review_file, dtype={'vote': str, 'proposal_id': str})
     vote_df['vote_int'] = vote_df['vote'].astype(int)
     
     # Load LLM data if provided
     simple_df = None
     if simple_llm_file:
-        simple_df = pd.read_excel(simple_llm_file, dtype={'vote': str, 'proposal_id': str})
+        simple_df = read_table(simple_llm_file, dtype={'vote': str, 'proposal_id': str})
     
     complete_df = None
     if complete_llm_file:
-        complete_df = pd.read_excel(complete_llm_file, dtype={'vote': str, 'proposal_id': str})
+        complete_df = read_table(complete_llm_file, dtype={'vote': str, 'proposal_id': str})
     
     return proposal_df, vote_df, simple_df, complete_df
 
-def calculate_vote_statistics(vote_df: pd.DataFrame) -> pd.DataFrame:
-    """Calculate vote statistics for each proposal"""
-    logger.info("Calculating vote statistics")
+def count_votes(vote_df: pd.DataFrame) -> pd.DataFrame:
+    """Count votes per proposal as a (proposal_id x vote) table in one bincount pass"""
+    votes = vote_df['vote']
+    # A missing proposal_id factorizes to -1, which would land in another proposal's cell
+    valid = (votes.notna() & vote_df['proposal_id'].notna()).to_numpy()
     
-    vote_stats = vote_df.groupby('proposal_id', as_index=False).agg({
-        'vote': [
-            ('most_common_vote', lambda x: x.mode().iloc[0] if not x.empty else None),
-            ('vote_counts', lambda x: x.value_counts().to_dict())
-        ],
-        'vote_int': [
-            ('mean', 'mean'),
-            ('std', 'std'),
-            ('count', 'count'),
-            ('median', 'median')
-        ]
-    })
+    # 依字串排序的 vote 類別與 groupby 鍵，與 mode() 的平手規則一致（取排序最前者）
+    proposal_codes, proposal_ids = pd.factorize(vote_df['proposal_id'], sort=True)
+    vote_codes, vote_values = pd.factorize(votes[valid], sort=True)
+    proposal_codes = proposal_codes[valid]
+    
+    n_votes = len(vote_values)
+    if n_votes == 0:
+        return pd.DataFrame(
+            np.zeros((len(proposal_ids), 0), dtype=np.int64),
+            index=pd.Index(proposal_ids, name='proposal_id'),
+            columns=pd.Index([], name='vote')
+        )
+    flat = np.bincount(proposal_codes * n_votes + vote_codes, minlength=len(proposal_ids) * n_votes)
+    return pd.DataFrame(
+        flat.reshape(len(proposal_ids), n_votes),
+        index=pd.Index(proposal_ids, name='proposal_id'),
+        columns=pd.Index(vote_values, name='vote')
+    )
+
+def vote_statistics_from_counts(vote_counts: pd.DataFrame) -> pd.DataFrame:
+    """Mode, per-vote counts, mean, std, median and count from a (proposal_id x vote) count table"""
+    vote_counts = vote_counts.sort_index().sort_index(axis=1)
+    if vote_counts.shape[1] == 0:
+        # No votes at all (e.g. an empty review table): no mode, no vote_counts_* columns
+        return pd.DataFrame({
+            'proposal_id': vote_counts.index.to_numpy(),
+            'vote_most_common_vote': pd.Series([None] * len(vote_counts), dtype=object),
+            'vote_int_mean': np.nan,
+            'vote_int_std': np.nan,
+            'vote_int_count': np.zeros(len(vote_counts), dtype=np.int64),
+            'vote_int_median': np.nan,
+        })
+    counts = vote_counts.to_numpy(dtype=np.int64)
+    vote_values = vote_counts.columns.astype(str)
+    vote_ints = np.array([int(v) for v in vote_values], dtype=np.float64)
+    
+    n = counts.sum(axis=1)
+    total = counts @ vote_ints
+    sum_sq = counts @ (vote_ints ** 2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / n
+        std = np.sqrt(np.maximum(sum_sq - total * mean, 0) / (n - 1))
+    std[n < 2] = np.nan
     
-    # Flatten column names
-    vote_stats.columns = ['proposal_id' if col[0] == 'proposal_id' 
-                         else f'{col[0]}_{col[1]}' for col in vote_stats.columns]
+    # Median from cumulative counts over the votes sorted by their integer value
+    order = np.argsort(vote_ints, kind='stable')
+    cumulative = np.cumsum(counts[:, order], axis=1)
+    sorted_ints = vote_ints[order]
+    lo = (cumulative <= ((n - 1) // 2)[:, None]).sum(axis=1)
+    hi = (cumulative <= (n // 2)[:, None]).sum(axis=1)
+    median = (sorted_ints[np.minimum(lo, len(order) - 1)] + sorted_ints[np.minimum(hi, len(order) - 1)]) / 2
+    
+    vote_stats = pd.DataFrame({
+        'proposal_id': vote_counts.index.to_numpy(),
+        'vote_most_common_vote': vote_values.to_numpy()[counts.argmax(axis=1)],
+    })
+    for i, vote in enumerate(vote_values):
+        vote_stats[f'vote_counts_{vote}'] = counts[:, i]
+    vote_stats['vote_int_mean'] = mean
+    vote_stats['vote_int_std'] = std
+    vote_stats['vote_int_count'] = n
+    vote_stats['vote_int_median'] = median
     
     return vote_stats
 
+def calculate_vote_statistics(vote_df: pd.DataFrame) -> pd.DataFrame:
+    """Calculate vote statistics for each proposal"""
+    logger.info("Calculating vote statistics")
+    return vote_statistics_from_counts(count_votes(vote_df))
+
 def merge_data(
     proposal_df: pd.DataFrame,
     vote_stats: pd.DataFrame,
     simple_df: Optional[pd.DataFrame] = None,
     complete_df: Optional[pd.DataFrame] = None
 ) -> pd.DataFrame:
-    """Merge all data into a single DataFrame"""
+    """Merge all data into a single DataFrame, joining each source onto the proposals by indexed key"""
     logger.info("Merging data")
+    ids = pd.Index(proposal_df['id'])
     
-    # Merge proposal data with vote statistics
-    final_df = proposal_df.merge(vote_stats, left_on='id', right_on='proposal_id', how='left')
-    
-    # Merge with LLM data if provided
-    if simple_df is not None:
-        final_df = final_df.merge(
-            simple_df, 
-            left_on='id', 
-            right_on='proposal_id', 
-            how='left',
-            suffixes=('', '_simple')
-        )
+    # 每個來源以 proposal_id 為索引對齊後一次 concat；欄位名稱與逐一 left merge 相同：
+    # 與已有欄位重名者加上 suffix（如 proposal_id_simple、vote_complete）
+    parts = [proposal_df.reset_index(drop=True)]
+    columns = list(proposal_df.columns)
+    sources = [(vote_stats, ''), (simple_df, '_simple'), (complete_df, '_complete')]
+    for df, suffix in sources:
+        if df is None:
+            continue
+        df = df.drop_duplicates('proposal_id').set_index('proposal_id', drop=False)
+        df = df.reindex(ids).reset_index(drop=True)
+        df.columns = [f'{col}{suffix}' if col in columns else col for col in df.columns]
+        columns += list(df.columns)
+        parts.append(df)
     
-    if complete_df is not None:
-        final_df = final_df.merge(
-            complete_df, 
-            left_on='id', 
-            right_on='proposal_id', 
-            how='left',
-            suffixes=('', '_complete')
-        )
+    final_df = pd.concat(parts, axis=1)
     
     # Add human evaluation column
     final_df['human_eval'] = ''
     
     return final_df
 
+def iter_review_chunks(
+    review_file: str = None,
+    conference: str = None,
+    chunk_size: int = config.MERGE_CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """Stream the proposal_id and vote columns of the review table in chunks"""
+    if review_file is None:
+        review_file = config.REVIEW_FILE
+    if is_database_url(review_file):
+        yield from iter_reviews(str(review_file), conference=conference, chunk_size=chunk_size)
+    else:
+        yield from iter_table_chunks(
+            review_file, chunk_size,
+            dtype={'vote': str, 'proposal_id': str},
+            columns=['proposal_id', 'vote']
+        )
+
+def accumulate_vote_counts(chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """Fold review chunks into a running (proposal_id x vote) count table"""
+    total = None
+    n_rows = 0
+    for chunk in chunks:
+        counts = count_votes(chunk)
+        total = counts if total is None else total.add(counts, fill_value=0)
+        n_rows += len(chunk)
+    
+    logger.info(f"Counted {n_rows} reviews for {0 if total is None else len(total)} proposals")
+    if total is None:
+        return pd.DataFrame(index=pd.Index([], name='proposal_id'))
+    return total.fillna(0).astype(np.int64)
+
+def run_streaming_merge(
+    proposal_file: str = None,
+    review_file: str = None,
+    simple_df: Optional[pd.DataFrame] = None,
+    complete_df: Optional[pd.DataFrame] = None,
+    conference: str = None,
+    chunk_size: int = config.MERGE_CHUNK_SIZE
+) -> pd.DataFrame:
+    """Merge with reviews streamed in chunks, so memory is bounded by proposals rather than reviews"""
+    if proposal_file is None:
+        proposal_file = config.PROPOSAL_FILE
+    proposal_df = _load_proposals(proposal_file, conference)
+    
+    vote_counts = accumulate_vote_counts(iter_review_chunks(review_file, conference, chunk_size))
+    vote_stats = vote_statistics_from_counts(vote_counts)
+    
+    return merge_data(proposal_df, vote_stats, simple_df, complete_df)
+
 def analyze_vote_distribution(merged_df: pd.DataFrame, llm_vote_column: str = 'vote') -> Dict[str, Any]:
     """Analyze vote distribution and agreement between human and LLM votes"""
     logger.info("Analyzing vote distribution")
@@ -151,41 +259,65 @@ def run_merge_and_analyze(
     simple_llm_file: str = None,
     complete_llm_file: str = None,
     analyze: bool = True,
-    analysis_output_file: str = None
+    analysis_output_file: str = None,
+    export_excel: bool = False,
+    conference: str = None,
+    streaming: bool = False,
+    chunk_size: int = config.MERGE_CHUNK_SIZE,
+    variant_files: Optional[Dict[str, str]] = None,
+    bootstrap_resamples: int = config.BOOTSTRAP_RESAMPLES,
+    analysis_workers: int = config.ANALYSIS_WORKERS
 ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
     """Run the full merge and analysis process"""
-    # Load data
-    proposal_df, vote_df, simple_df, complete_df = load_data(
-        proposal_file, review_file, simple_llm_file, complete_llm_file
-    )
+    # 所有 LLM 結果（simple、complete 與其他 prompt x model 組合）只載入一次，疊成長表
+    registry = {}
+    if simple_llm_file:
+        registry['simple'] = simple_llm_file
+    if complete_llm_file:
+        registry['complete'] = complete_llm_file
+    registry.update(variant_files or {})
+    variant_dfs = read_variants(registry)
+    llm_long = stack_variants(variant_dfs)
+    
+    def variant_df(name: str) -> Optional[pd.DataFrame]:
+        # The full output of the run, including cascade, sampling and dedup columns
+        return variant_dfs.get(name)
     
-    # Calculate vote statistics
-    vote_stats = calculate_vote_statistics(vote_df)
+    if streaming:
+        merged_df = run_streaming_merge(
+            proposal_file, review_file, variant_df('simple'), variant_df('complete'), conference, chunk_size
+        )
+    else:
+        # Load data
+        proposal_df, vote_df, _, _ = load_data(proposal_file, review_file, conference=conference)
+        
+        # Calculate vote statistics
+        vote_stats = calculate_vote_statistics(vote_df)
+        
+        # Merge data
+        merged_df = merge_data(proposal_df, vote_stats, variant_df('simple'), variant_df('complete'))
     
-    # Merge data
-    merged_df = merge_data(proposal_df, vote_stats, simple_df, complete_df)
+    # Other variants are joined as suffixed columns (vote_<name>, ...)
+    extra_variants = [name for name in registry if name not in ('simple', 'complete')]
+    if extra_variants:
+        merged_df = merged_df.join(widen_variants(variant_dfs, extra_variants), on='id')
     
     # Save merged data if output file is provided
     if output_file:
         logger.info(f"Saving merged data to {output_file}")
-        merged_df.to_excel(output_file, index=False)
+        write_table(merged_df, output_file, excel_copy=export_excel)
     
     # Analyze vote distribution if requested
     analysis_results = {}
-    if analyze:
-        if simple_df is not None:
-            # 注意：在合併後的 merged_df 中，列名已經是 'vote'，而不是 'vote_x' 或其他
-            # 因此我們需要確保分析函數使用正確的列名
-            logger.info(f"Merged DataFrame columns: {merged_df.columns.tolist()}")
-            
-            # 直接使用 merged_df 進行分析，而不是再次合併
-            simple_analysis = analyze_vote_distribution(merged_df, llm_vote_column='vote')
-            analysis_results['simple'] = simple_analysis
+    if analyze and registry:
+        # 所有 variant 在同一次 groupby 中計算分佈、一致率與混淆矩陣
+        analysis_results = analyze_variants(merged_df, llm_long)
         
-        if complete_df is not None:
-            # 直接使用 merged_df 進行分析，使用 vote_complete 列
-            complete_analysis = analyze_vote_distribution(merged_df, llm_vote_column='vote_complete')
-            analysis_results['complete'] = complete_analysis
+        # Bootstrap intervals, kappa and weighted agreement, one process per variant if requested
+        if bootstrap_resamples > 0:
+            agreement = analyze_agreement(merged_df, llm_long, resamples=bootstrap_resamples, workers=analysis_workers)
+            for variant, statistics in agreement.items():
+                analysis_results[variant]['agreement_statistics'] = statistics
         
         # 保存分析結果到 JSON 文件
         if analysis_results and analysis_output_file:
@@ -216,6 +348,9 @@ def run_merge_and_analyze(
                     if 'agreement_rate' in results:
                         f.write(f"\nOverall Agreement Rate: {results['agreement_rate']:.3f}\n")
                     
+                    if 'agreement_statistics' in results:
+                        f.write("\n" + "\n".join(format_agreement_report(results['agreement_statistics'])) + "\n")
+                    
                     if 'confusion_matrix' in results:
                         f.write("\nConfusion Matrix:\n")
                         confusion_df = pd.DataFrame(results['confusion_matrix'])
@@ -229,21 +364,30 @@ if __name__ == "__main__":
     
     parser = argparse.ArgumentParser(description="Merge proposal, review, and LLM data")
     parser.add_argument("--output", help="Output file path (default: auto-generated based on date)")
-    parser.add_argument("--proposal-file", help="Proposal file path (default: from config)")
-    parser.add_argument("--review-file", help="Review file path (default: from config)")
+    parser.add_argument("--proposal-file", help="Proposal file path or database URL (default: from config)")
+    parser.add_argument("--review-file", help="Review file path or database URL (default: from config)")
+    parser.add_argument("--conference", help="Conference filter for database sources, e.g. pycontw-2024")
     parser.add_argument("--simple-llm-file", help="Simple LLM review file path")
     parser.add_argument("--complete-llm-file", help="Complete LLM review file path")
+    parser.add_argument("--variant", action="append", default=[], metavar="NAME=FILE", help="Additional LLM run to compare (repeatable)")
     parser.add_argument("--no-analyze", action="store_true", help="Skip vote distribution analysis")
+    parser.add_argument("--format", choices=config.SUPPORTED_FORMATS, default=config.TABLE_FORMAT, help="Output format when --output is not given")
+    parser.add_argument("--export-excel", action="store_true", help="Also export an .xlsx copy of the merged data")
+    parser.add_argument("--streaming", action="store_true", help="Stream reviews in chunks to bound memory on large histories")
+    parser.add_argument("--chunk-size", type=int, default=config.MERGE_CHUNK_SIZE, help="Review rows per chunk in streaming mode")
     parser.add_argument("--analysis-output", help="Analysis output file path (default: auto-generated based on date)")
+    parser.add_argument("--bootstrap-resamples", type=int, default=config.BOOTSTRAP_RESAMPLES, help="Bootstrap resamples for agreement intervals (0 disables)")
+    parser.add_argument("--analysis-workers", type=int, default=config.ANALYSIS_WORKERS, help="Processes for per-variant agreement statistics")
     
     args = parser.parse_args()
+    setup_logging("merge_data")
     
     # Determine output file
     if args.output:
         output_file = args.output
     else:
         date_str = datetime.now().strftime("%Y%m%d")
-        output_file = str(config.MERGED_OUTPUT).format(date=date_str)
+        output_file = str(config.MERGED_OUTPUT).format(date=date_str, ext=args.format)
     
     # Determine analysis output file
     if args.analysis_output:
@@ -260,7 +404,14 @@ if __name__ == "__main__":
         simple_llm_file=args.simple_llm_file,
         complete_llm_file=args.complete_llm_file,
         analyze=not args.no_analyze,
-        analysis_output_file=analysis_output_file if not args.no_analyze else None
+        analysis_output_file=analysis_output_file if not args.no_analyze else None,
+        export_excel=args.export_excel,
+        conference=args.conference,
+        streaming=args.streaming,
+        chunk_size=args.chunk_size,
+        variant_files=parse_variant_specs(args.variant),
+        bootstrap_resamples=args.bootstrap_resamples,
+        analysis_workers=args.analysis_workers
     )
     
     # Print analysis results
@@ -286,6 +437,9 @@ if __name__ == "__main__":
             if 'agreement_rate' in results:
                 print(f"\nOverall Agreement Rate: {results['agreement_rate']:.3f}")
             
+            if 'agreement_statistics' in results:
+                print("\n" + "\n".join(format_agreement_report(results['agreement_statistics'])))
+            
             if 'confusion_matrix' in results:
                 print("\nConfusion Matrix:")
                 confusion_df = pd.DataFrame(results['confusion_matrix'])
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Literal, Dict, Any, Optional
+from typing import Literal, Dict, Any, Optional, List
 
 class ProposalReview(BaseModel):
     """Review for a PyCon proposal"""
@@ -8,6 +8,10 @@ class ProposalReview(BaseModel):
     vote: Literal['+1', '+0', '-0', '-1']
     proposal_id: Optional[str] = None
 
+class ProposalReviewBatch(BaseModel):
+    """Reviews for several PyCon proposals returned by one request"""
+    reviews: List[ProposalReview]
+
 class VoteStats(BaseModel):
     """Statistics for votes on a proposal"""
     proposal_id: str
@@ -0,0 +1,91 @@
+import logging
+from typing import List, Dict, Any, Optional, Mapping
+
+import pandas as pd
+
+from src import config
+from src.rate_limit import estimate_tokens
+from src.text_utils import normalize_text
+
+logger = logging.getLogger(__name__)
+
+def truncate_to_tokens(text: str, tokens: int) -> str:
+    """Cut text to about `tokens` estimated tokens without splitting a UTF-8 character"""
+    cut = text.encode("utf-8")[:tokens * 3].decode("utf-8", errors="ignore").rstrip()
+    return cut + " …" if cut else ""
+
+def fit_token_budget(
+    fields: Dict[str, str],
+    token_budget: Optional[int] = config.PAYLOAD_TOKEN_BUDGET,
+    priority: List[str] = config.PAYLOAD_TRUNCATION_PRIORITY
+) -> bool:
+    """Truncate (or drop) fields in priority order until the total fits the budget; True if anything was cut"""
+    if not token_budget:
+        return False
+    tokens = {column: estimate_tokens(text) for column, text in fields.items()}
+    excess = sum(tokens.values()) - token_budget
+    truncated = False
+    # 依優先順序截短最不重要的長欄位（預設先截 detailed_description、outline）
+    for column in priority:
+        if excess <= 0:
+            break
+        if column not in fields:
+            continue
+        truncated = True
+        keep = tokens[column] - excess
+        if keep < config.PAYLOAD_MIN_FIELD_TOKENS:
+            excess -= tokens[column]
+            del fields[column]
+        else:
+            fields[column] = truncate_to_tokens(fields[column], keep)
+            excess -= tokens[column] - keep
+    return truncated
+
+def _normalized_fields(proposal_info: Dict[str, Any]) -> Dict[str, str]:
+    return {column: text for column, value in proposal_info.items() if (text := normalize_text(value)) is not None}
+
+def _render(fields: Dict[str, str]) -> str:
+    return "\n".join(f"{column}: {text}" for column, text in fields.items())
+
+def build_proposal_payloads(
+    proposal_df: pd.DataFrame,
+    columns: List[str] = config.PROPOSAL_INFO_COLUMNS,
+    token_budget: Optional[int] = config.PAYLOAD_TOKEN_BUDGET,
+    texts: Optional[Mapping[str, Dict[str, Any]]] = None
+) -> Dict[str, str]:
+    """Build the compact per-proposal prompt info in one pass, keyed by proposal id in frame order
+    
+    With `texts` (e.g. a TextStore) the columns it holds are decoded from it one proposal at a time,
+    and only the id and any other `columns` (e.g. prior_review) come from the frame.
+    """
+    payloads = {}
+    raw_tokens = 0
+    compact_tokens = 0
+    truncated = 0
+    frame_columns = columns if texts is None else [column for column in columns if column in proposal_df.columns]
+    # A frame without columns has no records, so an id-only frame gets empty ones
+    records = proposal_df[frame_columns].to_dict(orient='records') if frame_columns else [{}] * len(proposal_df)
+    for proposal_id, proposal_info in zip(proposal_df['id'], records):
+        # 與原本的 proposal_df[proposal_df.id == id] 行為一致：重複 id 取第一筆
+        if proposal_id in payloads:
+            logger.warning(f"Duplicate proposal id {proposal_id}, keeping the first row")
+            continue
+        if texts is not None:
+            record = {**texts[proposal_id], **proposal_info}
+            proposal_info = {column: record.get(column) for column in columns}
+        fields = _normalized_fields(proposal_info)
+        truncated += fit_token_budget(fields, token_budget)
+        payload = _render(fields)
+        payloads[proposal_id] = payload
+        
+        # 與舊版送出的 str(dict) 比較，估算省下的 token
+        raw_tokens += estimate_tokens(str(proposal_info))
+        compact_tokens += estimate_tokens(payload)
+    
+    if payloads:
+        logger.info(
+            f"Built {len(payloads)} proposal payloads: ~{raw_tokens} -> ~{compact_tokens} estimated tokens "
+            f"(saved ~{raw_tokens - compact_tokens}, {1 - compact_tokens / max(1, raw_tokens):.1%}), "
+            f"{truncated} truncated to the {token_budget}-token budget"
+        )
+    return payloads
@@ -0,0 +1,89 @@
+import time
+import logging
+from typing import Tuple, Optional
+
+from langchain_core.messages import SystemMessage
+from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate, PromptTemplate
+from langchain_core.runnables import RunnableLambda
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+def split_prompt_template(template: str, slot: str = "PROPOSAL_INFO") -> Tuple[str, str]:
+    """Split a prompt template at the line holding the per-proposal slot into (rendered static prefix, suffix template)"""
+    marker = "{" + slot + "}"
+    index = template.find(marker)
+    if index < 0:
+        raise ValueError(f"Prompt template has no {marker} slot")
+    line_start = template.rfind("\n", 0, index) + 1
+    prefix, suffix = template[:line_start], template[line_start:]
+    # 前段只有固定的評審說明，渲染一次（處理 {{ }} 跳脫）後每篇 proposal 直接重用
+    return PromptTemplate.from_template(prefix).format(), suffix
+
+def build_split_prompt(prefix_text: str, suffix_template: str, include_prefix: bool = True) -> ChatPromptTemplate:
+    """Chat prompt with the rendered prefix as a fixed system message and the suffix as the human turn"""
+    messages = [HumanMessagePromptTemplate.from_template(suffix_template)]
+    if include_prefix:
+        messages.insert(0, SystemMessage(content=prefix_text))
+    return ChatPromptTemplate.from_messages(messages)
+
+class ContextCache:
+    """Provider-side cached content holding the static prompt prefix, kept alive for the length of a run"""
+
+    def __init__(self, model_name: str, ttl: int = config.CONTEXT_CACHE_TTL, client=None):
+        self.model_name = model_name
+        self.ttl = ttl
+        self.client = client
+        self.name = None
+        self.expires_at = 0.0
+        self.uploads = 0
+
+    def _client(self):
+        if self.client is None:
+            from google import genai
+            self.client = genai.Client()
+        return self.client
+
+    def create(self, prefix_text: str) -> Optional[str]:
+        """Upload the prefix as cached content; None when the provider refuses it (e.g. below its minimum size)"""
+        from google.genai import types
+        try:
+            cache = self._client().caches.create(
+                model=self.model_name,
+                config=types.CreateCachedContentConfig(system_instruction=prefix_text, ttl=f"{self.ttl}s")
+            )
+        except Exception as e:
+            logger.warning(f"Context cache unavailable for {self.model_name}, reusing the prefix client-side only: {e}")
+            return None
+        self.name = cache.name
+        self.expires_at = time.time() + self.ttl
+        self.uploads += 1
+        logger.info(f"Created context cache {self.name} for {self.model_name} (ttl {self.ttl}s)")
+        return self.name
+
+    def keep_alive(self):
+        """Extend the TTL once less than half of it is left, so the prefix is never uploaded again mid-run"""
+        if self.name is None or self.expires_at - time.time() > self.ttl / 2:
+            return
+        from google.genai import types
+        self.expires_at = time.time() + self.ttl
+        self._client().caches.update(name=self.name, config=types.UpdateCachedContentConfig(ttl=f"{self.ttl}s"))
+
+    def close(self):
+        """Delete the cached content so it stops accruing storage cost"""
+        if self.name is None:
+            return
+        try:
+            self._client().caches.delete(name=self.name)
+        except Exception as e:
+            logger.warning(f"Failed to delete context cache {self.name}: {e}")
+        self.name = None
+
+def keep_context_alive(context_cache: ContextCache) -> RunnableLambda:
+    """Pass-through chain step that refreshes the context cache TTL before each request"""
+    def _keep_alive(prompt_value):
+        context_cache.keep_alive()
+        return prompt_value
+
+    return RunnableLambda(_keep_alive, name="keep_context_alive")
@@ -0,0 +1,204 @@
+import re
+import time
+import random
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from langchain_core.runnables import RunnableLambda
+
+from src import config
+from src.telemetry import current_call
+
+logger = logging.getLogger(__name__)
+
+# Patterns for retry hints found in Gemini / HTTP error messages
+_RETRY_HINT_PATTERNS = [
+    re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+(?:\.\d+)?)", re.IGNORECASE),
+    re.compile(r"retryDelay['\"]?\s*[:=]\s*['\"]?(\d+(?:\.\d+)?)s", re.IGNORECASE),
+    re.compile(r"retry[- ]after['\"]?\s*[:=]?\s*['\"]?(\d+(?:\.\d+)?)", re.IGNORECASE),
+    re.compile(r"retry in (\d+(?:\.\d+)?)\s*s", re.IGNORECASE),
+]
+
+_RATE_LIMIT_PATTERN = re.compile(r"\b429\b|resource[_ ]exhausted|quota|rate limit", re.IGNORECASE)
+
+def estimate_tokens(text: str) -> int:
+    """Rough, conservative token estimate of one token per three UTF-8 bytes, i.e. one per CJK character or three ASCII characters"""
+    return max(1, len(text.encode("utf-8")) // 3)
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Whether an exception looks like a quota / 429 response"""
+    if getattr(error, "status_code", None) == 429 or getattr(error, "code", None) == 429:
+        return True
+    return bool(_RATE_LIMIT_PATTERN.search(f"{type(error).__name__} {error}"))
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Extract a server retry hint (in seconds) from an exception, if any"""
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is not None:
+        return float(retry_after)
+
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    for key, value in dict(headers).items():
+        if key.lower() == "retry-after":
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                pass
+
+    text = str(error)
+    for pattern in _RETRY_HINT_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return float(match.group(1))
+    return None
+
+def backoff_delay(
+    attempt: int,
+    base: float = config.BACKOFF_BASE,
+    cap: float = config.DEFAULT_SLEEP_TIME,
+    retry_after: Optional[float] = None
+) -> float:
+    """Exponential backoff with full jitter; a server retry hint takes precedence over the cap"""
+    if retry_after is not None:
+        return retry_after + random.uniform(0, base)
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+class TokenBucket:
+    """Continuously refilling token bucket"""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` is available"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.refill_per_second
+
+    def consume(self, amount: float):
+        self.level -= min(amount, self.capacity)
+
+    def drain(self):
+        self.level = min(self.level, 0.0)
+
+class RateLimiter:
+    """Shared requests-per-minute and tokens-per-minute budget for one model"""
+
+    def __init__(self, rpm: float, tpm: float, name: str = "", headroom: float = config.RATE_LIMIT_HEADROOM):
+        self.name = name
+        self.headroom = headroom
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = TokenBucket(rpm * headroom, rpm * headroom / 60)
+        self.tokens = TokenBucket(tpm * headroom, tpm * headroom / 60)
+        self.blocked_until = 0.0
+
+    def set_rates(self, rpm: float = None, tpm: float = None):
+        """Change the quota in place; budget already used stays used"""
+        for bucket, attr, rate in ((self.requests, "rpm", rpm), (self.tokens, "tpm", tpm)):
+            if rate is None or rate == getattr(self, attr):
+                continue
+            logger.info(f"Changing the {attr} quota of {self.name} from {getattr(self, attr):g} to {rate:g}")
+            setattr(self, attr, rate)
+            bucket._refill(time.monotonic())
+            bucket.capacity = rate * self.headroom
+            bucket.refill_per_second = rate * self.headroom / 60
+            bucket.level = min(bucket.level, bucket.capacity)
+
+    def _reserve(self, tokens: int) -> float:
+        """Consume budget and return 0, or return how long to wait before trying again"""
+        now = time.monotonic()
+        wait = max(
+            self.blocked_until - now,
+            self.requests.wait_time(1, now),
+            self.tokens.wait_time(tokens, now)
+        )
+        if wait <= 0:
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+            return 0.0
+        return wait
+
+    async def acquire(self, tokens: int) -> float:
+        """Wait until one request of `tokens` fits in the budget; returns the time waited"""
+        start_time = time.monotonic()
+        while (wait := self._reserve(tokens)) > 0:
+            await asyncio.sleep(wait)
+        return time.monotonic() - start_time
+
+    def acquire_sync(self, tokens: int) -> float:
+        """Blocking variant of acquire"""
+        start_time = time.monotonic()
+        while (wait := self._reserve(tokens)) > 0:
+            time.sleep(wait)
+        return time.monotonic() - start_time
+
+    def throttle(self, delay: float):
+        """Server pushed back: pause every caller sharing this limiter for `delay` seconds"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+        self.requests.drain()
+        logger.warning(f"Rate limited on {self.name}, pausing all requests for {delay:.1f} seconds")
+
+_limiters: Dict[str, RateLimiter] = {}
+
+def get_rate_limiter(model_name: str, rpm: float = None, tpm: float = None) -> RateLimiter:
+    """Return the process-wide limiter for a model, creating it from config on first use
+
+    An `rpm`/`tpm` override given later changes the existing limiter's quota for every run sharing it.
+    """
+    if model_name not in _limiters:
+        limits = config.MODEL_RATE_LIMITS.get(model_name, config.MODEL_RATE_LIMITS[config.FLASH_MODEL])
+        _limiters[model_name] = RateLimiter(
+            rpm=rpm or limits["rpm"],
+            tpm=tpm or limits["tpm"],
+            name=model_name
+        )
+    elif rpm or tpm:
+        _limiters[model_name].set_rates(rpm=rpm or None, tpm=tpm or None)
+    return _limiters[model_name]
+
+def reset_rate_limiters():
+    """Forget the process-wide limiters, so the next run starts with full quotas (benchmarks, tests)"""
+    _limiters.clear()
+
+def rate_limited(runnable, limiter: RateLimiter) -> RunnableLambda:
+    """Wrap an LLM runnable so every call first acquires budget from the limiter"""
+    def _tokens(prompt_value) -> int:
+        return estimate_tokens(prompt_value.to_string()) + config.ESTIMATED_OUTPUT_TOKENS
+
+    def _on_error(error: Exception):
+        if is_rate_limit_error(error):
+            limiter.throttle(retry_after_seconds(error) or config.BACKOFF_BASE)
+
+    def _record_wait(waited: float):
+        record = current_call.get()
+        if record is not None:
+            record.queue_wait += waited
+
+    def _invoke(prompt_value):
+        _record_wait(limiter.acquire_sync(_tokens(prompt_value)))
+        try:
+            return runnable.invoke(prompt_value)
+        except Exception as e:
+            _on_error(e)
+            raise
+
+    async def _ainvoke(prompt_value):
+        _record_wait(await limiter.acquire(_tokens(prompt_value)))
+        try:
+            return await runnable.ainvoke(prompt_value)
+        except Exception as e:
+            _on_error(e)
+            raise
+
+    return RunnableLambda(_invoke, afunc=_ainvoke, name="rate_limited_llm")
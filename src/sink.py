@@ -0,0 +1,176 @@
+import os
+import csv
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional
+
+from src import config
+from src.storage import table_format, with_format, iter_table_chunks
+
+logger = logging.getLogger(__name__)
+
+class OutputSink(ABC):
+    """Streams review records to an output file as they arrive, holding at most `buffer_rows` in memory
+
+    Fixed-schema formats take their columns from the first flushed batch plus `column_types`, which
+    also types columns that are still empty then (e.g. duplicate_of, set on a few records only).
+    """
+    fixed_columns = True
+
+    def __init__(self, path: str, buffer_rows: int = config.OUTPUT_BUFFER_ROWS, column_types: Optional[Dict[str, type]] = None):
+        self.path = str(path)
+        self.buffer_rows = max(1, buffer_rows)
+        self.column_types = column_types or {}
+        self.columns: Optional[List[str]] = None
+        self.rows = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._dropped = set()
+
+    def write(self, record: Dict[str, Any]):
+        self._buffer.append(record)
+        if len(self._buffer) >= self.buffer_rows:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered records to disk"""
+        if not self._buffer:
+            return
+        if self.columns is None:
+            self._start(self._buffer)
+        if self.fixed_columns:
+            dropped = {key for record in self._buffer for key in record} - set(self.columns) - self._dropped
+            if dropped:
+                logger.warning(f"Columns {sorted(dropped)} appeared after the header of {self.path} was written, leaving them out")
+                self._dropped |= dropped
+        self._write_batch(self._buffer)
+        self.rows += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+        if self.columns is None:
+            self._start([])
+        self._close()
+        logger.info(f"Wrote {self.rows} results to {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _start(self, records: List[Dict[str, Any]]):
+        # 欄位順序：第一批出現的順序，再補上尚未出現的已知欄位
+        columns = list(dict.fromkeys(key for record in records for key in record))
+        self.columns = columns + [column for column in self.column_types if column not in columns]
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._open(records)
+
+    @abstractmethod
+    def _open(self, records: List[Dict[str, Any]]):
+        """Create the file once the columns are known; `records` is the first batch (empty for an empty output)"""
+
+    @abstractmethod
+    def _write_batch(self, records: List[Dict[str, Any]]):
+        """Append one batch of records"""
+
+    @abstractmethod
+    def _close(self):
+        """Finish the file"""
+
+class JsonlSink(OutputSink):
+    """One JSON object per line; readable while the run is still going"""
+    fixed_columns = False
+
+    def _open(self, records):
+        self._file = open(self.path, "w", encoding="utf-8")
+
+    def _write_batch(self, records):
+        self._file.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+class CsvSink(OutputSink):
+    """CSV with the header fixed by the first batch; readable while the run is still going"""
+
+    def _open(self, records):
+        self._file = open(self.path, "w", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=self.columns, extrasaction="ignore")
+        self._writer.writeheader()
+
+    def _write_batch(self, records):
+        self._writer.writerows(records)
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+class ArrowSink(OutputSink):
+    """Parquet (one row group per batch) or Feather (one record batch per batch); readable once closed"""
+
+    def _open(self, records):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        arrow_types = {str: pa.string(), float: pa.float64(), int: pa.int64(), bool: pa.bool_()}
+        inferred = pa.Table.from_pylist(records).schema if records else pa.schema([])
+        fields = []
+        for column in self.columns:
+            arrow_type = inferred.field(column).type if column in inferred.names else pa.null()
+            # A column that is still empty gets its declared type, or string
+            if pa.types.is_null(arrow_type):
+                arrow_type = arrow_types.get(self.column_types.get(column), pa.string())
+            fields.append(pa.field(column, arrow_type))
+        self._schema = pa.schema(fields)
+        if table_format(self.path) == "parquet":
+            self._writer = pq.ParquetWriter(self.path, self._schema)
+        else:
+            self._writer = pa.ipc.new_file(self.path, self._schema)
+
+    def _write_batch(self, records):
+        import pyarrow as pa
+        table = pa.Table.from_pylist(records)
+        # Cast each column to the file schema, e.g. a column that was empty in the first batch (string)
+        # and holds numbers now, or one absent from this batch
+        self._writer.write_table(pa.Table.from_arrays([
+            table.column(field.name).cast(field.type) if field.name in table.column_names else pa.nulls(len(records), field.type)
+            for field in self._schema
+        ], schema=self._schema))
+
+    def _close(self):
+        self._writer.close()
+
+class ExcelSink(OutputSink):
+    """Excel through openpyxl's write-only mode, which keeps rows on disk until the workbook is saved"""
+
+    def _open(self, records):
+        from openpyxl import Workbook
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet("Sheet1")
+        self._sheet.append(self.columns)
+
+    def _write_batch(self, records):
+        for record in records:
+            self._sheet.append([record.get(column) for column in self.columns])
+
+    def _close(self):
+        self._workbook.save(self.path)
+
+SINKS = {"jsonl": JsonlSink, "csv": CsvSink, "parquet": ArrowSink, "feather": ArrowSink, "xlsx": ExcelSink}
+
+def open_sink(path: str, buffer_rows: int = config.OUTPUT_BUFFER_ROWS, column_types: Optional[Dict[str, type]] = None) -> OutputSink:
+    """Streaming writer for an output file, chosen from its extension"""
+    return SINKS[table_format(path)](path, buffer_rows=buffer_rows, column_types=column_types)
+
+def export_excel_copy(path: str, chunk_size: int = config.OUTPUT_BUFFER_ROWS) -> str:
+    """Build an .xlsx copy of a finished output file chunk by chunk; returns its path"""
+    excel_path = with_format(path, "xlsx")
+    logger.info(f"Exporting Excel copy to {excel_path}")
+    with ExcelSink(excel_path, buffer_rows=chunk_size) as sink:
+        for chunk in iter_table_chunks(path, chunk_size):
+            # NaN from the columnar formats becomes an empty cell
+            for record in chunk.astype(object).where(chunk.notna(), None).to_dict(orient="records"):
+                sink.write(record)
+    return excel_path
@@ -0,0 +1,103 @@
+import os
+import logging
+from typing import Dict, List, Optional, Iterator
+
+import pandas as pd
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+def table_format(path: str) -> str:
+    """Storage format of a file, from its extension"""
+    ext = os.path.splitext(str(path))[1].lower().lstrip(".")
+    if ext == "xls":
+        return "xlsx"
+    if ext not in config.SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported table format '{ext}' for {path}, expected one of {config.SUPPORTED_FORMATS}")
+    return ext
+
+def with_format(path: str, fmt: str) -> str:
+    """Swap the extension of a path for the given storage format"""
+    return os.path.splitext(str(path))[0] + f".{fmt}"
+
+def read_table(path: str, dtype: Optional[Dict[str, type]] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Read a table, choosing the reader from the file extension"""
+    fmt = table_format(path)
+    if fmt == "parquet":
+        df = pd.read_parquet(path, columns=columns)
+    elif fmt == "feather":
+        df = pd.read_feather(path, columns=columns)
+    elif fmt == "csv":
+        df = pd.read_csv(path, dtype=dtype, usecols=columns)
+    elif fmt == "jsonl":
+        df = pd.read_json(path, lines=True, dtype=dtype, convert_dates=False)
+        if columns is not None:
+            df = df[columns]
+    else:
+        df = pd.read_excel(path, dtype=dtype, usecols=columns)
+    
+    # 欄式格式本身帶型別，只有在存檔型別不同時才轉換
+    if dtype and fmt in ("parquet", "feather"):
+        df = df.astype({col: t for col, t in dtype.items() if col in df.columns})
+    return df
+
+def iter_table_chunks(
+    path: str,
+    chunk_size: int,
+    dtype: Optional[Dict[str, type]] = None,
+    columns: Optional[List[str]] = None
+) -> Iterator[pd.DataFrame]:
+    """Read a table in chunks of about `chunk_size` rows without loading it whole (except Excel)"""
+    fmt = table_format(path)
+    if fmt == "csv":
+        yield from pd.read_csv(path, dtype=dtype, usecols=columns, chunksize=chunk_size)
+        return
+    
+    if fmt == "jsonl":
+        with pd.read_json(path, lines=True, dtype=dtype, convert_dates=False, chunksize=chunk_size) as reader:
+            for df in reader:
+                yield df[columns] if columns is not None else df
+        return
+    
+    if fmt == "xlsx":
+        logger.warning(f"Excel files cannot be streamed, loading {path} whole")
+        df = read_table(path, dtype=dtype, columns=columns)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+        return
+    
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    if fmt == "parquet":
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns)
+    else:
+        reader = pa.ipc.open_file(pa.memory_map(str(path)))
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    
+    for batch in batches:
+        df = batch.to_pandas()
+        if columns is not None:
+            df = df[columns]
+        if dtype:
+            df = df.astype({col: t for col, t in dtype.items() if col in df.columns})
+        yield df
+
+def write_table(df: pd.DataFrame, path: str, excel_copy: bool = False):
+    """Write a table, choosing the writer from the file extension; optionally export an .xlsx copy"""
+    fmt = table_format(path)
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    elif fmt == "feather":
+        df.reset_index(drop=True).to_feather(path)
+    elif fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "jsonl":
+        df.to_json(path, orient="records", lines=True, force_ascii=False)
+    else:
+        df.to_excel(path, index=False)
+    
+    if excel_copy and fmt != "xlsx":
+        excel_path = with_format(path, "xlsx")
+        logger.info(f"Exporting Excel copy to {excel_path}")
+        df.to_excel(excel_path, index=False)
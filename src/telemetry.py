@@ -0,0 +1,134 @@
+import json
+import time
+import logging
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+from langchain_core.runnables import RunnableLambda
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CallRecord:
+    """Telemetry for one proposal (or one batch) review; `reviews` is how many proposals it reviewed"""
+    proposal_id: str
+    model: str
+    started: float
+    queue_wait: float = 0.0
+    api_latency: float = 0.0
+    total_time: float = 0.0
+    retries: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
+    cache_hit: bool = False
+    reviews: int = 1
+    status: str = "ok"
+
+# The record of the review running in the current asyncio task; chain wrappers annotate it
+current_call: ContextVar[Optional[CallRecord]] = ContextVar("current_call", default=None)
+
+def estimate_cost(model_name: str, input_tokens: int, output_tokens: int, cached_tokens: int = 0) -> float:
+    """USD cost from the per-million-token prices in config; `cached_tokens` of the input are billed at the cache rate"""
+    pricing = config.MODEL_PRICING.get(model_name, {"input": 0.0, "output": 0.0})
+    cached_price = pricing.get("cached_input", pricing["input"])
+    return ((input_tokens - cached_tokens) * pricing["input"] + cached_tokens * cached_price
+            + output_tokens * pricing["output"]) / 1_000_000
+
+class Telemetry:
+    """Collects per-call records, appends them to a JSONL file and summarises the run"""
+
+    def __init__(self, path: Optional[str] = None, model_name: str = ""):
+        self.path = str(path) if path else None
+        self.model_name = model_name
+        self.records: List[CallRecord] = []
+
+    def start(self, proposal_id: str) -> CallRecord:
+        """Begin a record and bind it to the current task"""
+        record = CallRecord(proposal_id=proposal_id, model=self.model_name, started=time.time())
+        current_call.set(record)
+        return record
+
+    def finish(self, record: CallRecord, status: str = "ok"):
+        record.status = status
+        record.total_time = time.time() - record.started
+        record.cost = estimate_cost(record.model, record.input_tokens, record.output_tokens, record.cached_tokens)
+        self.records.append(record)
+        if self.path:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(asdict(record), ensure_ascii=False) + "\n")
+
+    def summary(self) -> Dict[str, Any]:
+        """Latency percentiles, throughput, tokens and cost over the finished records"""
+        if not self.records:
+            return {"calls": 0}
+        api_calls = [r for r in self.records if not r.cache_hit and r.status == "ok"]
+        latency = np.array([r.api_latency for r in api_calls]) if api_calls else np.zeros(1)
+        total = np.array([r.total_time for r in self.records])
+        wall_time = max(r.started + r.total_time for r in self.records) - min(r.started for r in self.records)
+        tokens = sum(r.input_tokens + r.output_tokens for r in self.records)
+        proposals = sum(r.reviews for r in self.records if r.status == "ok")
+        return {
+            "calls": len(self.records),
+            "failed": sum(r.status == "failed" for r in self.records),
+            "cache_hits": sum(r.cache_hit for r in self.records),
+            "retries": sum(r.retries for r in self.records),
+            "latency_p50": float(np.percentile(latency, 50)),
+            "latency_p95": float(np.percentile(latency, 95)),
+            "latency_p99": float(np.percentile(latency, 99)),
+            "total_time_p95": float(np.percentile(total, 95)),
+            "queue_wait_mean": float(np.mean([r.queue_wait for r in self.records])),
+            "input_tokens": sum(r.input_tokens for r in self.records),
+            "cached_tokens": sum(r.cached_tokens for r in self.records),
+            "output_tokens": sum(r.output_tokens for r in self.records),
+            "tokens_per_sec": tokens / wall_time if wall_time > 0 else 0.0,
+            "proposals_per_sec": proposals / wall_time if wall_time > 0 else 0.0,
+            "wall_time": wall_time,
+            "cost_usd": sum(r.cost for r in self.records),
+        }
+
+    def log_summary(self):
+        s = self.summary()
+        if not s["calls"]:
+            return
+        logger.info(
+            f"Run summary: {s['calls']} calls ({s['failed']} failed, {s['cache_hits']} cache hits, {s['retries']} retries), "
+            f"API latency p50/p95/p99 {s['latency_p50']:.2f}/{s['latency_p95']:.2f}/{s['latency_p99']:.2f}s, "
+            f"mean queue wait {s['queue_wait_mean']:.2f}s, {s['tokens_per_sec']:.0f} tokens/s, "
+            f"{s['proposals_per_sec']:.2f} proposals/s, tokens in/out {s['input_tokens']}/{s['output_tokens']} "
+            f"({s['cached_tokens']} input tokens from the context cache), "
+            f"estimated cost ${s['cost_usd']:.4f}"
+        )
+
+def instrumented(runnable) -> RunnableLambda:
+    """Wrap an include_raw structured-output runnable: time the API call, record token usage, return the parsed object"""
+    def _unpack(output: Dict[str, Any], latency: float):
+        record = current_call.get()
+        usage = getattr(output.get("raw"), "usage_metadata", None) or {}
+        if record is not None:
+            record.api_latency = latency
+            record.input_tokens += usage.get("input_tokens", 0)
+            record.cached_tokens += (usage.get("input_token_details") or {}).get("cache_read", 0)
+            record.output_tokens += usage.get("output_tokens", 0)
+        if output.get("parsing_error") is not None:
+            raise output["parsing_error"]
+        if output.get("parsed") is None:
+            raise ValueError("LLM returned no structured output")
+        return output["parsed"]
+
+    def _invoke(prompt_value):
+        start_time = time.perf_counter()
+        output = runnable.invoke(prompt_value)
+        return _unpack(output, time.perf_counter() - start_time)
+
+    async def _ainvoke(prompt_value):
+        start_time = time.perf_counter()
+        output = await runnable.ainvoke(prompt_value)
+        return _unpack(output, time.perf_counter() - start_time)
+
+    return RunnableLambda(_invoke, afunc=_ainvoke, name="instrumented_llm")
@@ -0,0 +1,159 @@
+import os
+import mmap
+import json
+import shutil
+import struct
+import logging
+from array import array
+from collections.abc import Mapping
+from typing import List, Dict, Optional, Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from src import config
+from src.text_utils import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# File layout: magic, header length, JSON header (ids, columns), padding to 8 bytes,
+# (proposals x columns + 1) little-endian uint64 offsets, then every text as one UTF-8 blob
+MAGIC = b"PYCTXT01"
+
+def is_text_store(path) -> bool:
+    return str(path).endswith(config.TEXT_STORE_SUFFIX)
+
+def _aligned(size: int) -> int:
+    return (size + 7) // 8 * 8
+
+def write_text_store(path: str, chunks: Iterable[pd.DataFrame], columns: List[str] = config.PROPOSAL_INFO_COLUMNS) -> int:
+    """Write proposals, chunk by chunk, as normalized texts; only the blob of one chunk is in memory. Returns the count"""
+    path = str(path)
+    blob_path = path + ".blob.tmp"
+    ids, seen = [], set()
+    offsets = array("Q", [0])
+    position = 0
+    with open(blob_path, "wb") as blob:
+        for chunk in chunks:
+            for proposal_id, record in zip(chunk['id'].astype(str), chunk[columns].to_dict(orient='records')):
+                # 與 build_proposal_payloads 一致：重複 id 取第一筆
+                if proposal_id in seen:
+                    continue
+                seen.add(proposal_id)
+                ids.append(proposal_id)
+                for column in columns:
+                    data = (normalize_text(record[column]) or "").encode("utf-8")
+                    blob.write(data)
+                    position += len(data)
+                    offsets.append(position)
+
+    header = json.dumps({"columns": columns, "ids": ids}, ensure_ascii=False).encode("utf-8")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(header)) + header)
+        f.write(b"\0" * (_aligned(f.tell()) - f.tell()))
+        np.frombuffer(offsets, dtype=np.uint64).astype("<u8").tofile(f)
+        with open(blob_path, "rb") as blob:
+            shutil.copyfileobj(blob, f)
+    os.replace(tmp_path, path)
+    os.remove(blob_path)
+    logger.info(f"Wrote {len(ids)} proposals ({position / 2**20:.1f} MiB of text) to {path}")
+    return len(ids)
+
+class TextStore(Mapping):
+    """Read-only, memory-mapped proposal texts: proposal id -> {column: text or None}, decoded on access
+
+    Only the ids and the offsets live in memory; the texts stay in the page cache until read.
+    """
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a proposal text store")
+        header_start = len(MAGIC) + 8
+        header_length = struct.unpack("<Q", self._mmap[len(MAGIC):header_start])[0]
+        header = json.loads(self._mmap[header_start:header_start + header_length].decode("utf-8"))
+        self.columns: List[str] = header["columns"]
+        self.ids: List[str] = header["ids"]
+        self._rows = {proposal_id: row for row, proposal_id in enumerate(self.ids)}
+        offsets_start = _aligned(header_start + header_length)
+        count = len(self.ids) * len(self.columns) + 1
+        self._offsets = np.frombuffer(self._mmap, dtype="<u8", count=count, offset=offsets_start)
+        self._blob_start = offsets_start + count * 8
+
+    def text(self, proposal_id: str, column: str) -> Optional[str]:
+        cell = self._rows[proposal_id] * len(self.columns) + self.columns.index(column)
+        start, end = self._offsets[cell:cell + 2]
+        return self._mmap[self._blob_start + start:self._blob_start + end].decode("utf-8") or None
+
+    def __getitem__(self, proposal_id: str) -> Dict[str, Optional[str]]:
+        return {column: self.text(proposal_id, column) for column in self.columns}
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, proposal_id) -> bool:
+        return proposal_id in self._rows
+
+    def to_frame(self, proposal_ids: Optional[Iterable[str]] = None, limit: int = None) -> pd.DataFrame:
+        """The given (default: all) proposals as a frame of id plus the text columns, in store order"""
+        ids = self.ids if proposal_ids is None else [proposal_id for proposal_id in proposal_ids if proposal_id in self._rows]
+        if limit is not None and limit > 0:
+            ids = ids[:limit]
+        return pd.DataFrame([{'id': proposal_id, **self[proposal_id]} for proposal_id in ids], columns=['id'] + self.columns)
+
+    def close(self):
+        # The offsets view pins the mapping, release it first
+        self._offsets = None
+        self._mmap.close()
+        self._file.close()
+
+class JoinedTexts(Mapping):
+    """Lower-cased text of each proposal in a store, as `proposal_texts` builds it, joined on access"""
+
+    def __init__(self, store: TextStore, proposal_ids: Optional[Iterable[str]] = None, prefix: str = ""):
+        self.store = store
+        self.prefix = prefix
+        self._ids = list(store) if proposal_ids is None else [proposal_id for proposal_id in proposal_ids if proposal_id in store]
+        self._id_set = set(self._ids)
+
+    def __getitem__(self, key: str) -> str:
+        if key not in self:
+            raise KeyError(key)
+        texts = self.store[key[len(self.prefix):]].values()
+        return " ".join(text for text in texts if text).lower()
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.prefix + proposal_id for proposal_id in self._ids)
+
+    def __contains__(self, key) -> bool:
+        # Membership without decoding, and never for keys outside the prefix
+        return str(key).startswith(self.prefix) and str(key)[len(self.prefix):] in self._id_set
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+if __name__ == "__main__":
+    import argparse
+    from src.log_setup import setup_logging
+
+    parser = argparse.ArgumentParser(description="Build a memory-mapped proposal text store")
+    parser.add_argument("source", help="Proposal file or database URL")
+    parser.add_argument("output", help=f"Text store file (*{config.TEXT_STORE_SUFFIX})")
+    parser.add_argument("--conference", help="Conference filter for database sources (default: every conference)")
+    parser.add_argument("--chunk-size", type=int, default=config.DB_CHUNK_SIZE, help="Rows per chunk while building")
+    args = parser.parse_args()
+    setup_logging("text_store")
+
+    from src.db_loader import is_database_url, iter_proposals
+    from src.storage import iter_table_chunks
+    if is_database_url(args.source):
+        chunks = iter_proposals(args.source, args.conference, chunk_size=args.chunk_size)
+    else:
+        chunks = iter_table_chunks(args.source, args.chunk_size, dtype={'id': str}, columns=['id'] + config.PROPOSAL_INFO_COLUMNS)
+    write_text_store(args.output, chunks)
@@ -0,0 +1,17 @@
+import re
+from typing import Any, Optional
+
+import pandas as pd
+
+_INVISIBLE = re.compile("[\u200b\u200c\u200d\u2060\ufeff]")
+_INLINE_SPACE = re.compile("[ \t\f\v\u00a0\u3000]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+def normalize_text(value: Any) -> Optional[str]:
+    """Collapse whitespace and strip invisible characters; None for NaN or empty values"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    text = _INVISIBLE.sub("", str(value)).replace("\r\n", "\n").replace("\r", "\n")
+    text = "\n".join(_INLINE_SPACE.sub(" ", line).strip() for line in text.split("\n"))
+    text = _BLANK_LINES.sub("\n\n", text).strip()
+    return text or None
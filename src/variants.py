@@ -0,0 +1,102 @@
+import logging
+from typing import Dict, Any, List
+
+import pandas as pd
+
+from src.storage import read_table
+
+logger = logging.getLogger(__name__)
+
+LLM_COLUMNS = ['proposal_id', 'summary', 'comment', 'vote']
+
+def parse_variant_specs(specs: List[str]) -> Dict[str, str]:
+    """Parse NAME=FILE pairs from the command line into an ordered variant registry"""
+    variants = {}
+    for spec in specs or []:
+        name, sep, path = spec.partition("=")
+        if not sep or not name or not path:
+            raise ValueError(f"Invalid variant '{spec}', expected NAME=FILE")
+        variants[name] = path
+    return variants
+
+def variant_suffix(name: str) -> str:
+    """Column suffix of a variant in the wide merged table ('simple' keeps the bare column names)"""
+    return '' if name == 'simple' else f'_{name}'
+
+def stack_variants(variant_dfs: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Stack LLM outputs into one long table keyed by (proposal_id, variant), keeping every output column"""
+    frames = []
+    for name, df in variant_dfs.items():
+        frames.append(df.drop_duplicates('proposal_id').assign(variant=name))
+    if not frames:
+        frames = [pd.DataFrame(columns=LLM_COLUMNS + ['variant'])]
+
+    long_df = pd.concat(frames, ignore_index=True)
+    long_df['variant'] = pd.Categorical(long_df['variant'], categories=list(variant_dfs))
+    return long_df
+
+def read_variants(variant_files: Dict[str, str]) -> Dict[str, pd.DataFrame]:
+    """Read every registered LLM run once, with all of its output columns, one review per proposal"""
+    logger.info(f"Loading {len(variant_files)} LLM variants: {list(variant_files)}")
+    return {
+        name: read_table(path, dtype={'vote': str, 'proposal_id': str}).drop_duplicates('proposal_id')
+        for name, path in variant_files.items()
+    }
+
+def widen_variants(variant_dfs: Dict[str, pd.DataFrame], names: List[str]) -> pd.DataFrame:
+    """The chosen variants as suffixed columns (vote_<name>, tier_<name>, ...) indexed by proposal_id
+
+    Each variant brings only its own columns, e.g. tier and escalation of a cascade run or the
+    sample_* columns of a self-consistency run.
+    """
+    return pd.concat([
+        variant_dfs[name].set_index('proposal_id').add_suffix(variant_suffix(name))
+        for name in names
+    ], axis=1)
+
+def analyze_variants(merged_df: pd.DataFrame, long_df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """Distribution, agreement and confusion matrix of every variant against human votes in one pass"""
+    logger.info(f"Analyzing {long_df['variant'].nunique()} variants")
+    human = merged_df.drop_duplicates('id').set_index('id')['vote_most_common_vote']
+    human_distribution = merged_df['vote_most_common_vote'].value_counts(normalize=True).round(3).to_dict()
+
+    # 只保留合併表中存在的 proposal，與逐一 merge 的 left join 行為一致
+    joined = long_df[long_df['proposal_id'].isin(human.index)].copy()
+    joined['human'] = joined['proposal_id'].map(human)
+    joined['agree'] = joined['vote'] == joined['human']
+
+    by_variant = joined.groupby('variant', observed=False)
+    agreement = by_variant['agree'].sum() / len(merged_df)
+    distribution = (
+        joined.groupby(['variant', 'vote'], observed=True).size()
+        .div(by_variant['vote'].count(), level='variant')
+    ).round(3)
+    confusion = (
+        joined.dropna(subset=['vote', 'human'])
+        .groupby(['variant', 'vote', 'human'], observed=True).size()
+        .unstack('human', fill_value=0)
+    )
+
+    results = {}
+    for variant in long_df['variant'].cat.categories:
+        if variant in distribution.index.get_level_values(0):
+            llm_distribution = distribution.loc[variant].sort_values(ascending=False, kind='stable').to_dict()
+        else:
+            llm_distribution = {}
+        results[variant] = {
+            'llm_distribution': llm_distribution,
+            'human_distribution': human_distribution,
+            'agreement_rate': float(agreement.get(variant, 0.0)),
+            'confusion_matrix': _with_margins(confusion, variant)
+        }
+    return results
+
+def _with_margins(confusion: pd.DataFrame, variant: str) -> Dict[str, Dict[str, int]]:
+    """One variant's confusion table with crosstab-style 'All' margins, as a nested dict"""
+    if variant not in confusion.index.get_level_values(0):
+        return {}
+    table = confusion.loc[variant]
+    table = table.loc[:, table.sum() > 0].copy()
+    table['All'] = table.sum(axis=1)
+    table.loc['All'] = table.sum()
+    return table.astype(int).to_dict()
@@ -0,0 +1,220 @@
+import os
+import time
+import signal
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from src import config
+from src.job_queue import ReviewQueue, enqueue_from_source
+from src.db_loader import is_database_url, load_proposals
+from src.llm_review import load_proposal_data, setup_llm_chain, aprocess_proposals, save_results
+from src.cache import ResponseCache
+from src.checkpoint import ReviewJournal, journal_path_for
+from src.payload import build_proposal_payloads
+from src.rate_limit import get_rate_limiter
+from src.telemetry import Telemetry
+
+logger = logging.getLogger(__name__)
+
+class ProposalSource:
+    """Latest proposal rows for queued ids; a file is re-read only when it changes, a database is queried for the claimed ids only"""
+
+    def __init__(self, proposal_file: str = None, conference: str = None):
+        self.proposal_file = str(proposal_file or config.PROPOSAL_FILE)
+        self.conference = conference
+        self._df: Optional[pd.DataFrame] = None
+        self._mtime = None
+
+    def get(self, proposal_ids: List[str]) -> pd.DataFrame:
+        if is_database_url(self.proposal_file):
+            return load_proposals(self.proposal_file, conference=self.conference, proposal_ids=proposal_ids)
+        mtime = os.path.getmtime(self.proposal_file) if os.path.exists(self.proposal_file) else None
+        if self._df is None or mtime is None or mtime != self._mtime:
+            self._df = load_proposal_data(self.proposal_file, conference=self.conference).set_index('id', drop=False)
+            self._mtime = mtime
+        return self._df[self._df.index.isin(proposal_ids)]
+
+class ReviewWorker:
+    """Long-running reviewer: keeps one warm chain and drains the job queue under the concurrency and quota limits
+
+    Reviews go to the journal of `output_file` (a later review of a proposal replaces the earlier one),
+    and the output file is rebuilt from it whenever the queue runs empty.
+    """
+
+    def __init__(
+        self,
+        prompt_file: str,
+        model_name: str,
+        output_file: str,
+        proposal_file: str = None,
+        conference: str = None,
+        queue_file: str = None,
+        concurrency: int = config.DEFAULT_CONCURRENCY,
+        rpm: float = None,
+        tpm: float = None,
+        sleep_time: int = config.DEFAULT_SLEEP_TIME,
+        max_retries: int = config.MAX_RETRIES,
+        max_attempts: int = config.WORKER_MAX_ATTEMPTS,
+        poll_interval: float = config.WORKER_POLL_INTERVAL,
+        use_cache: bool = True,
+        token_budget: Optional[int] = config.PAYLOAD_TOKEN_BUDGET,
+        export_excel: bool = False,
+        llm=None
+    ):
+        self.output_file = output_file
+        self.concurrency = max(1, concurrency)
+        self.sleep_time = sleep_time
+        self.max_retries = max_retries
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.token_budget = token_budget
+        self.export_excel = export_excel
+        self.queue = ReviewQueue(queue_file)
+        self.source = ProposalSource(proposal_file, conference)
+        self.journal = ReviewJournal(journal_path_for(output_file))
+        self.cache = ResponseCache() if use_cache else None
+        self.telemetry = Telemetry(os.path.splitext(output_file)[0] + ".calls.jsonl", model_name=model_name)
+        # 只建立一次 chain，client 連線與 prompt 在整個服務期間重複使用
+        self.chain = setup_llm_chain(
+            prompt_file, model_name, rate_limiter=get_rate_limiter(model_name, rpm=rpm, tpm=tpm),
+            cache=self.cache, llm=llm
+        )
+        self.reviewed = 0
+        self.failed = 0
+        self._unsaved = 0
+        self._stopping = False
+
+    def stop(self):
+        """Finish the reviews in flight, then return from run()"""
+        if not self._stopping:
+            logger.info("Stopping the review worker after the reviews in flight")
+        self._stopping = True
+
+    async def _review(self, proposal_id: str, version: int, payload: str, semaphore: asyncio.Semaphore):
+        try:
+            await aprocess_proposals(
+                None, self.chain, sleep_time=self.sleep_time, max_retries=self.max_retries,
+                on_result=self.journal.append, telemetry=self.telemetry, semaphore=semaphore,
+                payloads={proposal_id: payload}
+            )
+        except Exception as e:
+            self.failed += 1
+            self.queue.fail(proposal_id, version, str(e), self.max_attempts)
+            return
+        self.reviewed += 1
+        self._unsaved += 1
+        self.queue.complete(proposal_id, version)
+
+    def _claim(self, limit: int) -> List[Tuple[str, int, str]]:
+        """Claim jobs and pair them with the latest payload of each proposal"""
+        jobs = self.queue.claim(limit)
+        if not jobs:
+            return []
+        proposal_df = self.source.get([proposal_id for proposal_id, _ in jobs])
+        payloads = build_proposal_payloads(proposal_df, config.PROPOSAL_INFO_COLUMNS, token_budget=self.token_budget)
+        claimed = []
+        for proposal_id, version in jobs:
+            if proposal_id in payloads:
+                claimed.append((proposal_id, version, payloads[proposal_id]))
+            else:
+                self.queue.fail(proposal_id, version, "proposal not found in the proposal source", max_attempts=1)
+        return claimed
+
+    def save(self):
+        """Rebuild the output file from the journal"""
+        records = self.journal.load()
+        if records:
+            save_results(records, self.output_file, export_excel=self.export_excel)
+        self._unsaved = 0
+
+    async def run(self, drain: bool = False):
+        """Review queued proposals until stopped; with `drain`, return once the queue is empty"""
+        self.queue.requeue_running()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        in_flight = set()
+        logger.info(f"Review worker polling {self.queue.path} every {self.poll_interval}s with concurrency {self.concurrency}")
+
+        while True:
+            # Claim only as many jobs as there are free slots, so queued work stays visible and updatable
+            free = self.concurrency - len(in_flight)
+            if not self._stopping and free > 0:
+                for proposal_id, version, payload in self._claim(free):
+                    in_flight.add(asyncio.create_task(self._review(proposal_id, version, payload, semaphore)))
+
+            if not in_flight:
+                if self._unsaved:
+                    self.save()
+                    logger.info(f"Queue empty: {self.reviewed} reviewed, {self.failed} failed so far; {self.queue.counts()}")
+                if self._stopping or drain:
+                    break
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            _, in_flight = await asyncio.wait(in_flight, timeout=self.poll_interval, return_when=asyncio.FIRST_COMPLETED)
+
+    def close(self):
+        self.telemetry.log_summary()
+        if self.cache is not None:
+            self.cache.log_stats()
+            self.cache.close()
+        self.queue.close()
+
+def serve(worker: ReviewWorker, drain: bool = False, scan_proposals: bool = False):
+    """Run a worker until SIGINT/SIGTERM (or until the queue is empty with `drain`)"""
+    async def _main():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, worker.stop)
+        await worker.run(drain=drain)
+
+    if scan_proposals:
+        enqueue_from_source(worker.queue, worker.source.proposal_file, worker.source.conference, worker.token_budget)
+    start_time = time.time()
+    try:
+        asyncio.run(_main())
+    finally:
+        worker.close()
+    logger.info(f"Review worker stopped after {time.time() - start_time:.0f}s: {worker.reviewed} reviewed, {worker.failed} failed")
+
+if __name__ == "__main__":
+    import argparse
+    from src.log_setup import setup_logging
+
+    parser = argparse.ArgumentParser(description="Review proposals from the job queue as they arrive")
+    parser.add_argument("--prompt", choices=["simple", "full"], default="full", help="Prompt type to use")
+    parser.add_argument("--model", choices=["flash", "pro"], default="flash", help="Model to use")
+    parser.add_argument("--output", help="Output file (default: output/<prompt>_prompt_gemini_<model>_live.<format>)")
+    parser.add_argument("--format", choices=config.SUPPORTED_FORMATS, default=config.TABLE_FORMAT, help="Output format when --output is not given")
+    parser.add_argument("--export-excel", action="store_true", help="Also export an .xlsx copy of the results")
+    parser.add_argument("--proposal-file", help="Proposal file path or database URL (default: from config)")
+    parser.add_argument("--conference", help="Conference filter for database sources, e.g. pycontw-2025")
+    parser.add_argument("--queue", default=str(config.QUEUE_FILE), help="Queue database file")
+    parser.add_argument("--scan", action="store_true", help="Queue new and edited proposals from the proposal source at start-up")
+    parser.add_argument("--drain", action="store_true", help="Exit once the queue is empty instead of polling for more")
+    parser.add_argument("--poll-interval", type=float, default=config.WORKER_POLL_INTERVAL, help="Seconds between queue polls when idle")
+    parser.add_argument("--max-attempts", type=int, default=config.WORKER_MAX_ATTEMPTS, help="Attempts per job before it is marked failed")
+    parser.add_argument("--concurrency", type=int, default=config.DEFAULT_CONCURRENCY, help="Maximum number of in-flight LLM requests")
+    parser.add_argument("--sleep-time", type=int, default=config.DEFAULT_SLEEP_TIME, help="Maximum backoff between retries")
+    parser.add_argument("--max-retries", type=int, default=config.MAX_RETRIES, help="Maximum number of retries per attempt")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk LLM response cache")
+    parser.add_argument("--token-budget", type=int, default=config.PAYLOAD_TOKEN_BUDGET,
+                        help="Per-proposal token budget for the proposal info (0 disables truncation)")
+    parser.add_argument("--rpm", type=float, help="Requests-per-minute quota (default: from config per model)")
+    parser.add_argument("--tpm", type=float, help="Tokens-per-minute quota (default: from config per model)")
+
+    args = parser.parse_args()
+    setup_logging("worker")
+
+    prompt_file = config.FULL_PROMPT_FILE if args.prompt == "full" else config.SIMPLE_PROMPT_FILE
+    model_name = config.PRO_MODEL if args.model == "pro" else config.FLASH_MODEL
+    output_file = args.output or str(config.OUTPUT_DIR / f"{args.prompt}_prompt_gemini_{args.model}_live.{args.format}")
+
+    serve(ReviewWorker(
+        str(prompt_file), model_name, output_file, proposal_file=args.proposal_file, conference=args.conference,
+        queue_file=args.queue, concurrency=args.concurrency, rpm=args.rpm, tpm=args.tpm, sleep_time=args.sleep_time,
+        max_retries=args.max_retries, max_attempts=args.max_attempts, poll_interval=args.poll_interval,
+        use_cache=not args.no_cache, token_budget=args.token_budget, export_excel=args.export_excel
+    ), drain=args.drain, scan_proposals=args.scan)
@@ -0,0 +1,98 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import config, db_loader
+from src.db_loader import PROPOSAL_COLUMNS, REVIEW_COLUMNS, EMPTY_ABSTRACTS, load_proposals, load_reviews
+from src.merge_data import run_merge_and_analyze
+from src.storage import write_table
+
+# Placeholder abstracts the queries leave out, plus a one-character one
+EXCLUDED = list(EMPTY_ABSTRACTS) + ['x']
+
+def _proposal_rows(n: int):
+    rows = []
+    for i in range(1, n + 1):
+        conference = 'pycontw-2024' if i % 5 else 'pycontw-2023'
+        abstract = EXCLUDED[i % len(EXCLUDED)] if i % 7 == 0 else f"abstract {i}"
+        rows.append([i, conference, f"title {i}", abstract, f"description {i}", f"outline {i}", f"objective {i}"])
+    return rows
+
+@pytest.fixture
+def database(tmp_path):
+    """SQLite stand-in for the proposals_talkproposal and reviews_review tables"""
+    path = tmp_path / "pycon.sqlite"
+    conn = sqlite3.connect(path)
+    conn.execute(f"CREATE TABLE proposals_talkproposal (id INTEGER PRIMARY KEY, {', '.join(f'{col} TEXT' for col in PROPOSAL_COLUMNS[1:])})")
+    conn.execute("CREATE TABLE reviews_review (id INTEGER PRIMARY KEY, proposal_id INTEGER, reviewer_id INTEGER, vote TEXT, comment TEXT)")
+    conn.executemany(f"INSERT INTO proposals_talkproposal VALUES ({', '.join('?' * len(PROPOSAL_COLUMNS))})", _proposal_rows(60))
+    rng = np.random.default_rng(0)
+    reviews = [
+        (review_id, int(rng.integers(1, 61)), int(rng.integers(1, 12)), str(rng.choice(['+1', '+0', '-0', '-1'])), f"comment {review_id}")
+        for review_id in range(1, 401)
+    ]
+    conn.executemany("INSERT INTO reviews_review VALUES (?, ?, ?, ?, ?)", reviews)
+    conn.commit()
+    conn.close()
+    return f"sqlite:///{path}"
+
+def _expected_ids(conference: str = None):
+    return [
+        str(row[0]) for row in _proposal_rows(60)
+        if (conference is None or row[1] == conference) and row[3] not in EXCLUDED
+    ]
+
+def test_empty_abstracts_and_conference_are_filtered(database):
+    df = load_proposals(database, conference='pycontw-2024')
+    assert list(df.columns) == PROPOSAL_COLUMNS
+    assert df['id'].tolist() == _expected_ids('pycontw-2024')
+    assert not df['abstract'].isin(EXCLUDED).any()
+
+def test_proposal_ids_are_queried_in_batches(database, monkeypatch):
+    monkeypatch.setattr(config, "DB_ID_BATCH", 4)
+    queries = []
+    stream_query = db_loader.stream_query
+    def recording(pool, sql, params, chunk_size):
+        queries.append(sql)
+        return stream_query(pool, sql, params, chunk_size)
+    monkeypatch.setattr(db_loader, "stream_query", recording)
+    wanted = _expected_ids()[:10] + ['7', '9999']
+    df = load_proposals(database, proposal_ids=wanted, columns=['id', 'title'])
+    assert len(queries) == 3
+    assert sorted(df['id'], key=int) == sorted(_expected_ids()[:10], key=int)
+    assert list(df.columns) == ['id', 'title']
+
+def test_limit_stops_reading_early(database, monkeypatch):
+    chunks = []
+    iter_proposals = db_loader.iter_proposals
+    def counting(*args, **kwargs):
+        for chunk in iter_proposals(*args, chunk_size=4, **kwargs):
+            chunks.append(len(chunk))
+            yield chunk
+    monkeypatch.setattr(db_loader, "iter_proposals", counting)
+    df = load_proposals(database, limit=10)
+    assert df['id'].tolist() == _expected_ids()[:10]
+    assert len(chunks) == 3
+
+def test_database_merge_matches_excel_export(database, tmp_path):
+    # The exports the pycon_llm_sql queries used to produce by hand
+    proposal_df = load_proposals(database, conference='pycontw-2024')
+    review_df = load_reviews(database, conference='pycontw-2024')
+    assert set(review_df['proposal_id']) <= set(proposal_df['id'])
+    assert list(review_df.columns) == REVIEW_COLUMNS
+    proposal_file = tmp_path / "proposals.xlsx"
+    review_file = tmp_path / "reviews.xlsx"
+    write_table(proposal_df, proposal_file)
+    write_table(review_df, review_file)
+
+    from_database, _ = run_merge_and_analyze(
+        proposal_file=database, review_file=database, conference='pycontw-2024', analyze=False
+    )
+    from_excel, _ = run_merge_and_analyze(proposal_file=str(proposal_file), review_file=str(review_file), analyze=False)
+    pd.testing.assert_frame_equal(from_database, from_excel)
+    streaming, _ = run_merge_and_analyze(
+        proposal_file=database, review_file=database, conference='pycontw-2024', analyze=False, streaming=True, chunk_size=32
+    )
+    pd.testing.assert_frame_equal(streaming, from_excel)
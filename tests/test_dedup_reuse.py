@@ -0,0 +1,70 @@
+import random
+import string
+
+import pandas as pd
+import pytest
+
+from src import config
+from src.fake_llm import FakeGeminiChat, FakeAPIError
+from src.llm_review import run_llm_review
+
+class FailingChat(FakeGeminiChat):
+    """Fake chat model whose every call about a proposal containing `marker` fails"""
+
+    marker: str = "MARKER"
+
+    def _review_json(self, prompt: str) -> str:
+        if self.marker in prompt:
+            raise FakeAPIError(503, "503 UNAVAILABLE: the model is overloaded")
+        return super()._review_json(prompt)
+
+def _text(rng: random.Random) -> str:
+    return " ".join("".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(60))
+
+def make_proposal_df(marked: str) -> pd.DataFrame:
+    """Ten unrelated proposals where p7 and p8 are copies of p2 and p9 is a copy of p4"""
+    rng = random.Random(0)
+    texts = [_text(rng) for _ in range(7)] + [None, None, None]
+    texts[7] = texts[8] = texts[2]
+    texts[9] = texts[4]
+    ids = [f"p{i}" for i in range(10)]
+    return pd.DataFrame({
+        'id': ids,
+        'title': [marked if proposal_id == marked else "Same title" for proposal_id in ids],
+        'abstract': texts,
+        'detailed_description': None,
+        'outline': None,
+        'objective': None,
+    })
+
+@pytest.fixture
+def run(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "JOURNAL_DIR", tmp_path / "journals")
+    monkeypatch.setattr(config, "MANIFEST_DIR", tmp_path / "manifests")
+
+    def _run(marked: str, **kwargs):
+        proposal_file = tmp_path / "proposals.csv"
+        make_proposal_df(marked).to_csv(proposal_file, index=False)
+        results = run_llm_review(
+            str(config.SIMPLE_PROMPT_FILE), config.FLASH_MODEL, str(tmp_path / "reviews.csv"),
+            proposal_file=str(proposal_file), sleep_time=0, max_retries=1, use_cache=False, resume=False,
+            dedup="reuse", llm=FailingChat(latency=0.0, vote="+1", marker=marked), **kwargs
+        )
+        return {result['proposal_id']: result for result in results}
+    return _run
+
+@pytest.mark.parametrize("cascade", [False, True])
+def test_duplicates_are_copied_from_their_representative(run, cascade):
+    results = run("p0", cascade=cascade)
+    assert sorted(results) == [f"p{i}" for i in range(1, 10)]
+    assert results['p7']['reused'] and results['p7']['duplicate_of'] == 'p2'
+    assert results['p9']['reused'] and results['p9']['duplicate_of'] == 'p4'
+
+@pytest.mark.parametrize("cascade", [False, True])
+def test_duplicates_of_a_failed_representative_are_reviewed(run, cascade):
+    results = run("p2", cascade=cascade)
+    assert sorted(results) == [f"p{i}" for i in range(10) if i != 2]
+    for proposal_id in ("p7", "p8"):
+        assert results[proposal_id]['duplicate_of'] == 'p2'
+        assert not results[proposal_id].get('reused')
+    assert results['p9']['reused']
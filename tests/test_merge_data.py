@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.merge_data import run_merge_and_analyze
+from src.storage import write_table
+from benchmarks.synthetic import make_proposals, make_reviews
+
+@pytest.fixture
+def merge_files(tmp_path):
+    proposal_df = make_proposals(60)
+    review_df = make_reviews(500, n_proposals=55, seed=1)
+    # A review without a proposal id, as in a partial export
+    review_df.loc[0, 'proposal_id'] = None
+    llm_df = pd.DataFrame({
+        'proposal_id': proposal_df['id'][:50],
+        'summary': 'summary',
+        'comment': 'comment',
+        'vote': np.resize(['+1', '+0', '-0', '-1'], 50),
+        'tier': 'flash',
+    })
+    files = {
+        'proposal_file': tmp_path / "proposals.csv",
+        'review_file': tmp_path / "reviews.csv",
+        'simple_llm_file': tmp_path / "simple.csv",
+        'complete_llm_file': tmp_path / "complete.csv",
+    }
+    write_table(proposal_df, files['proposal_file'])
+    write_table(review_df, files['review_file'])
+    write_table(llm_df, files['simple_llm_file'])
+    write_table(llm_df.assign(vote=llm_df['vote'][::-1].to_numpy()), files['complete_llm_file'])
+    return {name: str(path) for name, path in files.items()}
+
+@pytest.mark.parametrize("llm_files", [
+    ('simple_llm_file', 'complete_llm_file'),
+    ('simple_llm_file',),
+    ('complete_llm_file',),
+    (),
+])
+def test_streaming_merge_matches_in_memory_merge(merge_files, llm_files):
+    files = {name: path for name, path in merge_files.items() if name in ('proposal_file', 'review_file') + llm_files}
+    in_memory, _ = run_merge_and_analyze(analyze=False, **files)
+    streaming, _ = run_merge_and_analyze(analyze=False, streaming=True, chunk_size=64, **files)
+    pd.testing.assert_frame_equal(streaming, in_memory)
+
+def test_every_llm_output_column_reaches_merged_table(merge_files, tmp_path):
+    sampled_file = tmp_path / "sampled.csv"
+    sampled_df = pd.read_csv(merge_files['simple_llm_file'], dtype=str).assign(confidence=0.8, early_stopped=True)
+    write_table(sampled_df, sampled_file)
+    merged_df, _ = run_merge_and_analyze(analyze=False, variant_files={'sampled': str(sampled_file)}, **merge_files)
+    for column in ['tier', 'tier_complete', 'vote_sampled', 'tier_sampled', 'confidence_sampled', 'early_stopped_sampled']:
+        assert column in merged_df.columns
+    assert merged_df['confidence_sampled'].notna().sum() == 50
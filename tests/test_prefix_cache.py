@@ -0,0 +1,49 @@
+import pytest
+from langchain_core.prompts import PromptTemplate
+
+from src import config
+from src.fake_llm import FakeGeminiChat, FakeGenAIClient
+from src.llm_review import setup_llm_chain, process_proposals
+from src.prompt_cache import ContextCache, split_prompt_template
+from benchmarks.synthetic import make_proposals
+
+PROPOSALS = 20
+
+def review(mode: str, client: FakeGenAIClient):
+    context_cache = ContextCache(config.FLASH_MODEL, client=client) if mode == "provider" else None
+    chain = setup_llm_chain(
+        str(config.FULL_PROMPT_FILE), config.FLASH_MODEL,
+        split_prefix=mode != "off", context_cache=context_cache,
+        llm=FakeGeminiChat(latency=0.0, vote="+1", client=client)
+    )
+    results = process_proposals(make_proposals(PROPOSALS), chain, sleep_time=0, concurrency=4)
+    if context_cache is not None:
+        context_cache.close()
+    return results
+
+def test_provider_mode_sends_the_prefix_once():
+    client = FakeGenAIClient()
+    assert len(review("provider", client)) == PROPOSALS
+    assert client.requests == PROPOSALS
+    assert client.total_prefix_sends == 1
+
+def test_provider_mode_falls_back_to_inline_below_min_cache_tokens():
+    client = FakeGenAIClient(min_cache_tokens=10**9)
+    assert len(review("provider", client)) == PROPOSALS
+    assert client.caches.uploads == 0
+    assert client.total_prefix_sends == PROPOSALS
+
+@pytest.mark.parametrize("mode", ["off", "client"])
+def test_without_provider_cache_every_request_carries_the_prefix(mode):
+    client = FakeGenAIClient()
+    assert len(review(mode, client)) == PROPOSALS
+    assert client.caches.uploads == 0
+    assert client.total_prefix_sends == PROPOSALS
+
+def test_client_mode_renders_the_same_prompt():
+    with open(config.FULL_PROMPT_FILE, "r", encoding="utf-8") as f:
+        template = f.read()
+    prefix, suffix = split_prompt_template(template)
+    proposal_info = "title: {not a slot}\nabstract: text"
+    expected = PromptTemplate.from_template(template).format(PROPOSAL_INFO=proposal_info)
+    assert prefix + PromptTemplate.from_template(suffix).format(PROPOSAL_INFO=proposal_info) == expected
@@ -0,0 +1,61 @@
+import asyncio
+
+import pandas as pd
+
+from src.fake_llm import FakeReviewChain
+from src.llm_review import aprocess_proposals
+
+class TrackingChain(FakeReviewChain):
+    """Fake chain that records the peak number of concurrent calls and fails proposals marked BAD"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.in_flight = 0
+        self.peak = 0
+
+    async def ainvoke(self, inputs, config=None):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            review = await super().ainvoke(inputs, config)
+        finally:
+            self.in_flight -= 1
+        if "BAD" in inputs["PROPOSAL_INFO"]:
+            raise RuntimeError("503 Service Unavailable")
+        return review
+
+def make_proposal_df(n: int, bad=()) -> pd.DataFrame:
+    return pd.DataFrame({
+        'id': [f"p{i}" for i in range(n)],
+        'title': [f"BAD {i}" if i in bad else f"title {i}" for i in range(n)],
+        'abstract': [f"abstract {i}" for i in range(n)],
+        'detailed_description': None,
+        'outline': None,
+        'objective': None,
+    })
+
+def review(proposal_df, chain, concurrency=4, **kwargs):
+    return asyncio.run(aprocess_proposals(
+        proposal_df, chain, sleep_time=0, max_retries=2, concurrency=concurrency, token_budget=None, **kwargs
+    ))
+
+def test_results_keep_proposal_order():
+    # Jittered latency makes the calls finish out of order
+    chain = TrackingChain(latency=0.01, jitter=0.009, seed=0)
+    proposal_df = make_proposal_df(30)
+    results = review(proposal_df, chain, concurrency=8)
+    assert [result['proposal_id'] for result in results] == proposal_df['id'].tolist()
+
+def test_failing_proposal_does_not_abort_the_others():
+    chain = TrackingChain(latency=0.001)
+    recorded = []
+    results = review(make_proposal_df(10, bad={3}), chain, on_result=recorded.append)
+    assert [result['proposal_id'] for result in results] == [f"p{i}" for i in range(10) if i != 3]
+    assert len(recorded) == 9
+    # The failing proposal used up its retries
+    assert chain.calls == 9 + 2
+
+def test_in_flight_calls_never_exceed_concurrency():
+    chain = TrackingChain(latency=0.01, jitter=0.005, seed=1)
+    review(make_proposal_df(40), chain, concurrency=5)
+    assert chain.peak == 5